@@ -1,19 +1,49 @@
 #!/usr/bin/env
 
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import lru_cache, partial
+import hashlib
+from io import StringIO
 import json
+from multiprocessing import resource_tracker, shared_memory
+import queue
 import networkx as nx
 import numpy
 from math import cos, sin
-from os import path
+from os import cpu_count, getpid, listdir, makedirs, path, remove, replace, sysconf
 import re
+from shutil import disk_usage, rmtree
+import socket
+from tempfile import mkdtemp
+import threading
 import time
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
 
 # constants
 MAXSIZE = 2**31-1  # (replaces maxint due to consistency among devices)
+CALLBACK_INTERVAL = 1024  # number of vertices written between two calls of the progress callback
+MAX_TABLE_ARITY = 16  # maximal in-degree of a vertex with a truth-table update function (64 Kib table)
+MAX_RANDOM_TABLE_ARITY = 10  # expressions of random truth tables grow exponentially, ~20 kB at 10 regulators
+FUNCTION_KINDS = ['chains', 'random', 'canalising', 'monotone']  # engines of the update functions
+# costs measured on a single core for 'estimate_cost': (per vertex, per regulation) or per regulation and per cell of
+# the n×n matrices of the random network
+COST_MODEL = {'sbml_bytes': (590, 214), 'npz_bytes': (3, 1.5), 'npy_bytes': (8, 9),
+              'write_bytes': (600, 60), 'write_seconds': (11e-6, 2.7e-6),
+              'matrix_bytes': 100, 'matrix_seconds': 0.2e-6, 'cell_bytes': 17, 'cell_seconds': 37e-9,
+              'networkx_bytes': 400, 'networkx_seconds': 4e-6, 'arrays_bytes': 150, 'arrays_seconds': 2e-6}
 
 
-def write_vertices_to_sbml(sbml_f, num_of_vertices: int) -> None:
+class GenerationCancelled(Exception):
+    """Raised when the generation is cancelled through the 'cancel' object passed to 'generate_bn'"""
+
+
+def write_vertices_to_sbml(sbml_f, num_of_vertices: int, names=None) -> None:
     """Writes vertices to the sbml file in sbml qual format
 
     Parameters
@@ -22,6 +52,9 @@ def write_vertices_to_sbml(sbml_f, num_of_vertices: int) -> None:
         sbml file
     num_of_vertices : int
         Number of vertices
+    names : list, optional
+        Names of the first vertices (e.g. of an imported topology) written as the names of the species, their ids
+        stay X0, X1, ... Other vertices are named by their ids
 
     Returns
     -------
@@ -29,8 +62,9 @@ def write_vertices_to_sbml(sbml_f, num_of_vertices: int) -> None:
     """
     sbml_f.write('<qual:listOfQualitativeSpecies xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
     for vertex in range(num_of_vertices):
+        name = f'X{vertex}' if names is None or vertex >= len(names) else escape(str(names[vertex]), {'"': '&quot;'})
         sbml_f.write(f'<qual:qualitativeSpecies qual:constant="false" '
-                     f'qual:id="X{vertex}" qual:maxLevel="1" qual:name="X{vertex}"/>')
+                     f'qual:id="X{vertex}" qual:maxLevel="1" qual:name="{name}"/>')
     sbml_f.write('</qual:listOfQualitativeSpecies>')
 
 
@@ -262,49 +296,18 @@ def write_update_function(sbml_f, vertex: int, vertices_for_update_f: list,
         sbml_f.write('</qual:listOfFunctionTerms>')
 
 
-def generate_transitions(num_of_vertices: int, probability_of_edge: float, seed: int, frac_reg: float) -> dict:
-    """Generates transitions for the network when generating fully randomised network
-
-    Parameters
-    ----------
-    num_of_vertices : int
-
-    probability_of_edge : float
-        Probability of an existence of an edge leading from one vertex to another
-    seed : int
-        Seed value
-
-    Returns
-    -------
-    dict
-        Dictionary where vertex is a key and its value is a list of regulations
-    """
-    inc_transitions = {k: [] for k in range(num_of_vertices)}
-    numpy.random.seed(seed)
-    rand_prob_vals = numpy.random.randint(low=1, high=101, size=(num_of_vertices, num_of_vertices))  # 101 off by one
-    numpy.random.seed(seed)
-    rand_reg_types = numpy.random.choice([True, False], p=[frac_reg, 1 - frac_reg],
-                                         size=(num_of_vertices, num_of_vertices))
-    i = 0
-    for vertex in range(num_of_vertices):
-        j = 0
-        for other_vertex in range(num_of_vertices):
-            if rand_prob_vals[i][j] <= probability_of_edge * 100:
-                inc_transitions[other_vertex].append((vertex, rand_reg_types[i][j]))
-            j += 1
-        i += 1
-    return inc_transitions
-
+def plan_update_functions(in_degrees, seed_: int, l_bound: int, u_bound: int) -> tuple:
+    """Draws the random choices of the update functions of the whole network at once
 
-def write_transitions(sbml_f, inc_transitions: dict, seed_: int, l_bound: int, u_bound: int) -> None:
-    """Writes transitions to sbml file
+    Draws the same values as 'write_transitions' does through 'write_update_function', but once per network instead
+    of once per vertex and regulator. All vertices share the seeds and the drawn lists of a vertex are prefixes of the
+    lists drawn for a vertex with more regulators, so apart from the vertex itself an update function is determined
+    by the in-degree and the positions of the regulators (see 'planned_update_function').
 
     Parameters
     ----------
-    sbml_f
-        sbml file
-    inc_transitions : dict
-        Dictionary where vertex is a key and its value is a list of regulations
+    in_degrees
+        In-degree of each vertex
     seed_ : int
         Seed for generating seeds needed in 'write_update_function' function
     l_bound : int
@@ -314,354 +317,4823 @@ def write_transitions(sbml_f, inc_transitions: dict, seed_: int, l_bound: int, u
 
     Returns
     -------
-    None
+    tuple
+        (has_function, plan), where 'has_function' is a bool array determining which vertices get an update function
+        and 'plan' is a dict of arrays indexed by the position of a regulator: 'which' (1 for or, 0 for and
+        operator), 'arr' (1 for a plain variable, read from the last literal), 'arities' of the uninterpreted
+        functions and 'first_ones' (positions of the first 'u_bound' ones of their argument masks)
     """
-    sbml_f.write('<qual:listOfTransitions xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    in_degrees = numpy.asarray(in_degrees, dtype=numpy.int64)
     numpy.random.seed(seed_)
-    seeds = list(numpy.random.randint(MAXSIZE, size=3))
+    seeds = numpy.random.randint(MAXSIZE, size=3)
     numpy.random.seed(seeds[0])
-    rand_ch = numpy.random.choice([0, 1], size=len(inc_transitions))
-    i = 0
-    for vertex in inc_transitions:
-        sbml_f.write(f'<qual:transition qual:id="tr_X{vertex}">')
-        sbml_f.write('<qual:listOfInputs>')
-        for other_vertex in inc_transitions[vertex]:
-            if other_vertex[1]:
-                sign = 'positive'
-            else:
-                sign = 'negative'
-            sbml_f.write(f'<qual:input qual:id="tr_X{other_vertex[0]}_in_X{vertex}" '
-                         f'qual:qualitativeSpecies="X{other_vertex[0]}" '
-                         f'qual:sign="{sign}" qual:transitionEffect="none"/>')
-        sbml_f.write('</qual:listOfInputs>')
-        sbml_f.write('<qual:listOfOutputs>')
-        sbml_f.write(f'<qual:output qual:id="tr_X{vertex}_out" qual:qualitativeSpecies="X{vertex}" '
-                     f'qual:transitionEffect="assignmentLevel"/>')
-        sbml_f.write('</qual:listOfOutputs>')
-        write_update_function(sbml_f, vertex, inc_transitions[vertex], seed_, seeds[1], seeds[2], list(rand_ch)[i],
-                              l_bound, u_bound)
-        sbml_f.write('</qual:transition>')
-        i += 1
-    sbml_f.write('</qual:listOfTransitions>')
+    rand_ch = numpy.random.choice([0, 1], size=len(in_degrees)).astype(bool)
+    has_function = (in_degrees > 4) | (rand_ch & (in_degrees > 0))  # same condition as in 'write_update_function'
+    max_in_degree = int(in_degrees[has_function].max()) if has_function.any() else 0
+    numpy.random.seed(seed_)
+    seed_vals = numpy.random.randint(MAXSIZE, size=max_in_degree)
+    numpy.random.seed(seeds[1])
+    rand_which = numpy.random.choice([0, 1], size=max_in_degree)
+    numpy.random.seed(seeds[2])
+    rand_arr = numpy.random.choice([0, 1], size=max_in_degree)
+    arities = numpy.zeros(max_in_degree, dtype=numpy.int64)
+    first_ones = numpy.full((max_in_degree, max(u_bound, 1)), max_in_degree, dtype=numpy.int64)
+    if max_in_degree >= l_bound:
+        chunk = min(max_in_degree, 8 * first_ones.shape[1] + 32)
+        for idx, seed in enumerate(seed_vals.tolist()):
+            state = numpy.random.RandomState(seed)
+            arities[idx] = state.randint(low=l_bound, high=u_bound + 1)
+            state.seed(seed)  # 'generate_and_write_function' reseeds before drawing the argument mask
+            ones = []
+            drawn = 0
+            while len(ones) < first_ones.shape[1] and drawn < max_in_degree:
+                mask = state.choice([0, 1], size=min(chunk, max_in_degree - drawn))
+                ones.extend((numpy.flatnonzero(mask) + drawn).tolist())
+                drawn += len(mask)
+            ones = ones[:first_ones.shape[1]]
+            first_ones[idx, :len(ones)] = ones
+    plan = {'l_bound': l_bound, 'which': rand_which, 'arr': rand_arr, 'arities': arities, 'first_ones': first_ones,
+            'cache': {}}
+    return has_function, plan
 
 
-def write_transitions_to_dict(graph, num_of_vertices: int, seed: int, bool_seed_trans: int, frac_reg: float) -> dict:
-    """Writes transitions to dictionary for easier usage
+def planned_update_function(plan: dict, in_degree: int) -> tuple:
+    """Returns the shape of the update function of a vertex with 'in_degree' regulators (see 'plan_update_functions')
 
     Parameters
     ----------
-    graph
-        Generated graph
-    num_of_vertices : int
-        Number of vertices
-    seed : int
-        Seed value
-    bool_seed_trans : int
-        Seed value used to generate list of booleans for regulation types
-    frac_reg : float
-        Probability that a regulation is activating
+    plan : dict
+        Plan of the update functions returned by 'plan_update_functions'
+    in_degree : int
+        Number of regulators of the vertex
 
     Returns
     -------
-    dict
-        Dictionary where vertex is a key and its value is a list of its regulators
+    tuple
+        (operators, literals), where 'operators' is the serialized prefix of the opening and/or applications and
+        'literals' contains None for a plain variable and a tuple of positions of the arguments of the uninterpreted
+        function otherwise (the position of the literal's own regulator is the first one)
     """
-    # external graph generator from networkx library generates graph with undirected edges
-    # thus we have to transform the edges
-    # line below taken from https://stackoverflow.com/a/11509759 and it assigns empty list to each vertex
-    transitions = {k: [] for k in range(num_of_vertices)}
-    num_of_edges = len(graph.edges)
-    numpy.random.seed(seed)
-    rand_reg_types = numpy.random.choice([True, False], p=[frac_reg, 1 - frac_reg], size=num_of_edges)
-    # following lines inspired by https://stackoverflow.com/a/19597672
-    # this ensures desired number of activating regulations within the generated network
-    rand_choice = numpy.random.choice([True, False], size=num_of_edges)  # create an array full of zeros
-    i = 0
-    for edge in graph.edges:
-        reg_type = rand_reg_types[i]
-        if rand_choice[i]:
-            transitions[edge[0]].append((edge[1], reg_type))
-        else:
-            transitions[edge[1]].append((edge[0], reg_type))
-        i += 1
-    return transitions
+    shape = plan['cache'].get(in_degree)
+    if shape is None:
+        operators = ''.join('<apply><or/>' if which else '<apply><and/>'
+                            for which in plan['which'][:in_degree - 1].tolist())
+        literals = [None] * in_degree
+        if in_degree >= plan['l_bound']:
+            positions = numpy.arange(in_degree)
+            arities = plan['arities'][:in_degree]
+            is_function = (plan['arr'][in_degree - 1 - positions] == 0) & (arities > 0) & (arities <= in_degree)
+            is_function &= plan['first_ones'][positions, numpy.maximum(arities - 1, 0)] < in_degree
+            for idx in numpy.flatnonzero(is_function).tolist():
+                arity = int(arities[idx])
+                arguments = [pos for pos in plan['first_ones'][idx, :arity].tolist() if pos != idx]
+                literals[idx] = (idx, *arguments[:arity - 1])
+        shape = (operators, literals)
+        plan['cache'][in_degree] = shape
+    return shape
+
+
+def write_planned_transition(sbml_f, vertex: int, regulators: list, signs: list, has_function: bool,
+                             plan: dict) -> None:
+    """Writes transition of one vertex with the update function given by the plan (see 'plan_update_functions')
 
+    Output is identical to 'write_transition'.
 
-def generate_watts_strogatz_graph(sbml_f, num_of_vertices: int, num_of_connections: int, probability: float,
-                                  seed: int, seeds: list, l_bound: int, u_bound: int, frac_reg: float):
-    """Generates a Watts-Strogatz small-world graph, then transforms it to SBML-qual format
-    (Docs taken from the watts_strogatz_graph function in networkx module)
-    
     Parameters
     ----------
     sbml_f
         sbml file
-    num_of_vertices
-        Number of vertices within the network
-    num_of_connections
-        Each node is joined with its `num_of_connections` nearest neighbors in a ring topology
-    probability
-        The probability of rewiring each edge
-    seed
-        Seed value
-    seeds : list
-        List of seeds
-    l_bound : int
-        Lower bound of the arity of the uninterpreted functions
-    u_bound : int
-        Upper bound of the arity of the uninterpreted functions
-    frac_reg : float, optional
-        Fraction of activating regulations within the network
+    vertex : int
+        Vertex
+    regulators : list
+        Regulators of given 'vertex'
+    signs : list
+        Types of the regulations, True for activating
+    has_function : bool
+        Determines if the vertex will have an update function
+    plan : dict
+        Plan of the update functions returned by 'plan_update_functions'
 
     Returns
     -------
     None
     """
-    g = nx.watts_strogatz_graph(num_of_vertices, num_of_connections, probability, seed=seed)
-    generate_layout(sbml_f, num_of_vertices)
-    write_vertices_to_sbml(sbml_f, num_of_vertices)
-    inc_transitions = write_transitions_to_dict(g, num_of_vertices, seed, seeds[0], frac_reg)
-    write_transitions(sbml_f, inc_transitions, seeds[1], l_bound, u_bound)
+    parts = [f'<qual:transition qual:id="tr_X{vertex}"><qual:listOfInputs>']
+    for reg, sign in zip(regulators, signs):
+        parts.append(f'<qual:input qual:id="tr_X{reg}_in_X{vertex}" qual:qualitativeSpecies="X{reg}" '
+                     f'qual:sign="{"positive" if sign else "negative"}" qual:transitionEffect="none"/>')
+    parts.append(f'</qual:listOfInputs><qual:listOfOutputs><qual:output qual:id="tr_X{vertex}_out" '
+                 f'qual:qualitativeSpecies="X{vertex}" qual:transitionEffect="assignmentLevel"/>'
+                 f'</qual:listOfOutputs>')
+    if has_function:
+        operators, literals = planned_update_function(plan, len(regulators))
+        parts.append('<qual:listOfFunctionTerms><qual:defaultTerm qual:resultLevel="0"/>'
+                     '<qual:functionTerm qual:resultLevel="1"><math xmlns="http://www.w3.org/1998/Math/MathML">')
+        parts.append(operators)
+        for idx, literal in enumerate(literals):
+            if literal is not None:
+                parts.append(f'<apply><csymbol>F{vertex}_{idx}</csymbol>')
+                parts.extend(f'<ci>X{regulators[pos]}</ci>' for pos in literal)
+                parts.append('</apply>')
+            elif signs[idx]:
+                parts.append(f'<apply><eq/><ci>X{regulators[idx]}</ci><cn type="integer">1</cn></apply>')
+            else:
+                parts.append(f'<apply><not/><apply><eq/><ci>X{regulators[idx]}</ci><cn type="integer">1</cn>'
+                             f'</apply></apply>')
+            if idx >= 1:
+                parts.append('</apply>')
+        parts.append('</math></qual:functionTerm></qual:listOfFunctionTerms>')
+    parts.append('</qual:transition>')
+    sbml_f.write(''.join(parts))
 
 
-def generate_barabasi_albert_graph(sbml_f, num_of_vertices: int, connections: int,
-                                   seed: int, seeds: list, l_bound: int, u_bound: int, frac_reg: float):
-    """Generates a Barabasi-Albert graph, then transoforms it to SBML-qual format
-    (Docs taken from the barabasi_albert_graph function in networkx module)
+def write_planned_transitions(sbml_f, start: int, indptr, regulators, signs, has_function, plan: dict,
+                              callback=None) -> None:
+    """Writes transitions of a range of vertices given as CSR arrays (see 'write_planned_transition')
 
     Parameters
     ----------
     sbml_f
         sbml file
-    num_of_vertices
-        Number of vertices within the network
-    connections
-        Number of edges to attach from a new node to existing nodes
-    seed : int
-        Seed value
-    seeds : list
-        List of seeds
-    l_bound : int
-        Lower bound of the arity of the uninterpreted functions
-    u_bound : int
-        Upper bound of the arity of the uninterpreted functions
-    frac_reg : float, optional
-        Fraction of activating regulations within the network
+    start : int
+        First vertex of the range
+    indptr
+        Offsets of the regulators of the vertices in the range (the first one doesn't have to be 0)
+    regulators
+        Regulators of the vertices in the range
+    signs
+        Types of the regulations, True for activating
+    has_function
+        Bool values to determine if the vertices will have an update function
+    plan : dict
+        Plan of the update functions returned by 'plan_update_functions'
+    callback : callable, optional
+        See 'write_transitions'
 
     Returns
     -------
     None
     """
-    g = nx.barabasi_albert_graph(num_of_vertices, connections, seed=seed)
-    generate_layout(sbml_f, num_of_vertices)
-    write_vertices_to_sbml(sbml_f, num_of_vertices)
-    inc_transitions = write_transitions_to_dict(g, num_of_vertices, seed, seeds[0], frac_reg)
-    write_transitions(sbml_f, inc_transitions, seeds[1], l_bound, u_bound)
+    offsets = (numpy.asarray(indptr) - indptr[0]).tolist()
+    regs = numpy.asarray(regulators).tolist()
+    types = numpy.asarray(signs, dtype=bool).tolist()
+    has_function = numpy.asarray(has_function).tolist()
+    for offset in range(len(offsets) - 1):
+        vertex = start + offset
+        if callback is not None and vertex % CALLBACK_INTERVAL == 0 and vertex > 0:
+            callback(vertex)
+        write_planned_transition(sbml_f, vertex, regs[offsets[offset]:offsets[offset + 1]],
+                                 types[offsets[offset]:offsets[offset + 1]], has_function[offset], plan)
 
 
-def generate_random_graph(sbml_f, num_of_vertices: int, probability_of_edge: float, seed: int,
-                          seed_trans: int, l_bound: int, u_bound: int, frac_reg: float):
-    """Generates fully randomised network
+def draw_signs(frac_reg, size, random_state=numpy.random):
+    """Draws types of regulations, True for activating
+
+    Draws the same values as choice([True, False], p=[frac_reg, 1 - frac_reg]). If 'frac_reg' is None, the underlying
+    uniform draws are returned instead, so the signs can be derived for any fraction later (see 'signs_from_draws').
 
     Parameters
     ----------
-    sbml_f
-        sbml file
-    num_of_vertices
-        Number of vertices within the network
-    probability_of_edge
+    frac_reg : float
+        Probability that a regulation is activating, or None
+    size
+        Shape of the result
+    random_state : optional
+        numpy.random.RandomState to draw from, the global one by default
+
+    Returns
+    -------
+    numpy.ndarray
+        Signs or uniform draws from [0, 1)
+    """
+    draws = random_state.random_sample(size)
+    return draws if frac_reg is None else signs_from_draws(draws, frac_reg)
+
+
+def signs_from_draws(draws, frac_reg: float):
+    """Converts uniform draws of 'draw_signs' to types of regulations, True for activating"""
+    cdf = numpy.cumsum(numpy.array([frac_reg, 1 - frac_reg], dtype=float))
+    cdf /= cdf[-1]  # the same threshold as in numpy.random.choice
+    return numpy.asarray(draws) < cdf[0]
+
+
+def generate_random_edges(num_of_vertices: int, probability_of_edge: float, seed: int, frac_reg: float) -> tuple:
+    """Generates edges of the fully randomised network as arrays
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    probability_of_edge : float
         Probability of an existence of an edge leading from one vertex to another
     seed : int
         Seed value
-    seed_trans : int
-        Seed used in generation of transitions
-    l_bound : int
-        Lower bound of the arity of the uninterpreted functions
-    u_bound : int
-        Upper bound of the arity of the uninterpreted functions
-    frac_reg : float, optional
-        Fraction of activating regulations within the network
+    frac_reg : float
+        Probability that a regulation is activating
 
     Returns
     -------
-    None
+    tuple
+        (targets, regulators, signs) numpy arrays, ordered by regulator
     """
-    generate_layout(sbml_f, num_of_vertices)
-    write_vertices_to_sbml(sbml_f, num_of_vertices)
-    inc_transitions = generate_transitions(num_of_vertices, probability_of_edge, seed, frac_reg)
-    write_transitions(sbml_f, inc_transitions, seed_trans, l_bound, u_bound)
+    numpy.random.seed(seed)
+    rand_prob_vals = numpy.random.randint(low=1, high=101, size=(num_of_vertices, num_of_vertices))  # 101 off by one
+    numpy.random.seed(seed)
+    rand_reg_types = draw_signs(frac_reg, (num_of_vertices, num_of_vertices))
+    # row is the regulator, column is the regulated vertex
+    regulators, targets = numpy.nonzero(rand_prob_vals <= probability_of_edge * 100)
+    return targets, regulators, rand_reg_types[regulators, targets]
 
 
-def generate_bn(num_of_vertices: int, seed=int(time.time()), probability=0, num_of_connections=0,
-                l_bound=2, u_bound=4, frac_reg=0.8, ba=False, ws=False, random=False, loc="", n=1):
-    # make it possible to generate arbitrary amount of vertices?
-    """Generates random parametrised boolean network in SBML qual format.
-    - http://www.colomoto.org/formats/sbml-qual.html
+def generate_random_edges_blocked(num_of_vertices: int, probability_of_edge: float, seed: int, frac_reg: float,
+                                  block_rows: int, spill_dir=None) -> tuple:
+    """Generates the same edges as 'generate_random_edges' without ever holding the whole n×n matrices
+
+    Random matrices are drawn in blocks of 'block_rows' regulators from the same random streams, so the result is
+    identical. Edges of each block are either kept in memory or appended to files in 'spill_dir', which are then
+    memory-mapped.
 
     Parameters
     ----------
     num_of_vertices : int
-        User-defined size of the boolean network
-    seed : int, optional
-        Seed value for the option to regenerate the same network. Default seed is time.time()
-    probability : float, optional
-        For 'random' network, user-defined probability of an outgoing edge from one vertex to another
-        For the Watts-Strogatz, it is the probability of rewiring each edge
-        Not used in the Barabási-Albert model
-    num_of_connections : int, optional
-        For Barabási-Albert model, it is number of edges to attach from a new node to existing nodes
-        For Watts-Strogatz, each node is joined with its `num_of_connections` nearest neighbors in a ring topology
-        Not used in 'random' network
-    l_bound : int, optional
-        Lower bound of the arity of the uninterpreted functions. Default value is 2
-    u_bound : int, optional
-        Upper bound of the arity of the uninterpreted functions
-        Default value is 4, so AEON doesn't face the state-space explosion
-    frac_reg : float, optional
-        Fraction of activating regulations within the network
-    ba : bool, optional
-        Barabási-Albert model
-    ws : bool, optional
-        Watts-Strogatz model
-    random : bool, optional
-        Fully randomised network
-    loc : str
-        Directory to store the networks in
-    n : int
-        Number of networks to generate. Keep in mind that if 'n' > 1 and 'seed' is not set to default, you will get 'n'
-        same networks
+        Number of vertices
+    probability_of_edge : float
+        Probability of an existence of an edge leading from one vertex to another
+    seed : int
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
+    block_rows : int
+        Number of regulators drawn at once
+    spill_dir : str, optional
+        Directory for the edge files; edges are kept in memory if not set
 
     Returns
     -------
-    None
+    tuple
+        (targets, regulators, signs) numpy arrays (memory-mapped if 'spill_dir' is set), ordered by regulator
     """
-    numpy.random.seed(seed)
-    network_seeds = list(numpy.random.randint(MAXSIZE, size=n))
-    for i in range(n):
-        curr_seed = int(network_seeds[i])
-        if ba or ws:
-            gen = f'ba_{num_of_connections}' if ba else f'ws_{num_of_connections}_{probability}'
-        else:
-            gen = f'rand_{probability}'
-        with open(f'{loc}bn_{gen}_s{seed}_l{l_bound}_u{u_bound}_'
-                  f'f{frac_reg}_n{num_of_vertices}_{i}.sbml', 'w+') as sbml_f:
-            sbml_f.write('<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'no\'?>')
-            sbml_f.write('<sbml xmlns="http://www.sbml.org/sbml/level3/version1/core" '
-                         'layout:required="false" level="3" qual:required="true" '
-                         'xmlns:layout="http://www.sbml.org/sbml/level3/version1/layout/version1" version="1" '
-                         'xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
-            sbml_f.write('<model>')
-            numpy.random.seed(curr_seed)
-            seeds = list(numpy.random.randint(MAXSIZE, size=2))
-            if random:
-                generate_random_graph(sbml_f, num_of_vertices, probability,
-                                      curr_seed, seeds[0], l_bound, u_bound, frac_reg)
-            elif ba:
-                generate_barabasi_albert_graph(sbml_f, num_of_vertices, num_of_connections, curr_seed, seeds, l_bound,
-                                               u_bound, frac_reg)
-            elif ws:
-                generate_watts_strogatz_graph(sbml_f, num_of_vertices, num_of_connections,
-                                              probability, curr_seed, seeds, l_bound, u_bound, frac_reg)
-            sbml_f.write('</model>')
-            sbml_f.write('</sbml>')
+    # the same seed is used for both matrices, so each needs its own stream
+    prob_stream = numpy.random.RandomState(seed)
+    type_stream = numpy.random.RandomState(seed)
+    names = ['targets', 'regulators', 'signs']
+    blocks = {name: [] for name in names}
+    files = {name: open(path.join(spill_dir, f'{name}.bin'), 'wb') for name in names} if spill_dir else None
+    try:
+        for start in range(0, num_of_vertices, block_rows):
+            rows = min(block_rows, num_of_vertices - start)
+            rand_prob_vals = prob_stream.randint(low=1, high=101, size=(rows, num_of_vertices))
+            rand_reg_types = draw_signs(frac_reg, (rows, num_of_vertices), type_stream)
+            regulators, targets = numpy.nonzero(rand_prob_vals <= probability_of_edge * 100)
+            block = {'targets': targets, 'regulators': regulators + start,
+                     'signs': rand_reg_types[regulators, targets]}
+            for name in names:
+                if files:
+                    block[name].tofile(files[name])
+                else:
+                    blocks[name].append(block[name])
+    finally:
+        if files:
+            for f in files.values():
+                f.close()
+    if not files:
+        return tuple(numpy.concatenate(blocks[name]) if blocks[name] else numpy.zeros(0, dtype=numpy.int64)
+                     for name in names)
+    result = []
+    for name, dtype in zip(names, [numpy.int64, numpy.int64, bool if frac_reg is not None else numpy.float64]):
+        file_name = path.join(spill_dir, f'{name}.bin')
+        # numpy can't memory-map an empty file
+        result.append(numpy.memmap(file_name, dtype=dtype, mode='r') if path.getsize(file_name)
+                      else numpy.zeros(0, dtype=dtype))
+    return tuple(result)
 
 
-"""----------------------------------------------FUNCTIONS FOR INPUT CHECK-------------------------------------------"""
+def generate_random_edges_by_degree(num_of_vertices: int, in_degree_dist, seed: int, frac_reg: float) -> tuple:
+    """Generates edges of the fully randomised network with in-degrees drawn from the given distribution
 
+    Each vertex draws its in-degree from 'in_degree_dist' and then the corresponding number of distinct regulators
+    uniformly at random.
 
-def check_number_of_vertices(arg):
-    # https://stackoverflow.com/a/56089296 I have read this discussion to help me decide how to deal with incorrect
-    # arguments.
-    # 'print' in combination with 'exit' statement makes the error message more readable for the user; however,
-    # raising exception has value for the programmer. Not sure which one to keep, print&exit seems more elegant.
-    try:
-        int(arg)
-    except ValueError:
-        # raise ValueError(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
-        print(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
-        exit(1)
-    if int(arg) < 2:  # or > n, after I find the threshold
-        # raise ValueError(f"Number of vertices must be in range [2, n), got {arg}")
-        print(f"Number of vertices must be in range [2, n), got {arg}", file=stderr)
-        exit(1)
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    in_degree_dist
+        Probabilities of in-degrees 0, 1, 2, ...
+    seed : int
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
 
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays, ordered by target
+    """
+    in_degree_dist = numpy.asarray(in_degree_dist, dtype=float)
+    numpy.random.seed(seed)
+    in_degrees = numpy.minimum(numpy.random.choice(len(in_degree_dist), size=num_of_vertices,
+                                                   p=in_degree_dist / in_degree_dist.sum()), num_of_vertices)
+    targets = numpy.repeat(numpy.arange(num_of_vertices), in_degrees)
+    regulators = numpy.random.randint(num_of_vertices, size=len(targets))
+    dense = in_degrees[targets] > num_of_vertices // 2
+    sparse = ~dense
+    while True:  # redraw duplicate regulators of sparse vertices, there are only few of them
+        order = numpy.lexsort((regulators, targets))
+        dup = numpy.zeros(len(targets), dtype=bool)
+        dup[order[1:]] = (targets[order[1:]] == targets[order[:-1]]) & (regulators[order[1:]] == regulators[order[:-1]])
+        dup &= sparse
+        if not dup.any():
+            break
+        regulators[dup] = numpy.random.randint(num_of_vertices, size=int(dup.sum()))
+    for vertex in numpy.unique(targets[dense]):  # sampling without replacement is cheaper for dense vertices
+        regulators[targets == vertex] = numpy.random.choice(num_of_vertices, size=in_degrees[vertex], replace=False)
+    signs = draw_signs(frac_reg, len(targets))
+    return targets, regulators, signs
 
-def check_probability_argument(arg):
-    try:
-        float(arg)
-    except ValueError:
-        # raise ValueError(f"Probability is not in a correct format, expected float, got {type(arg)}")
-        print(f"Probability is not in a correct format, expected float, got {type(arg)}")
-        exit(1)
-    if round(float(arg), 2) <= 0 or round(float(arg), 2) > 1:
-        # raise ValueError(f"Probability must be in range (0, 1> rounded to two decimal places, got {arg}")
-        print(f"Probability rounded to two decimal places must be within (0, 1] range, got {arg}", file=stderr)
-        exit(1)
 
+def drop_duplicate_edges(targets, regulators, signs) -> tuple:
+    """Keeps only the first occurrence of every regulation (pair of target and regulator)
 
-def check_probability_argument_for_ws(arg):
-    try:
-        float(arg)
-    except ValueError:
-        # raise ValueError(f"Probability is not in a correct format, expected float, got {type(arg)}")
-        print(f"Probability is not in a correct format, expected float, got {type(arg)}")
-        exit(1)
-    if round(float(arg), 2) < 0 or round(float(arg), 2) > 1:
-        # raise ValueError(f"Probability must be in range [0, 1> rounded to two decimal places, got {arg}")
-        print(f"Probability rounded to two decimal places must be within [0, 1] range, got {arg}", file=stderr)
-        exit(1)
+    Parameters
+    ----------
+    targets
+        Regulated vertex of each edge
+    regulators
+        Regulator of each edge
+    signs
+        Types of the regulations, True for activating
 
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays in the original order
+    """
+    targets = numpy.asarray(targets, dtype=numpy.int64)
+    regulators = numpy.asarray(regulators, dtype=numpy.int64)
+    if len(targets) == 0:
+        return targets, regulators, numpy.asarray(signs)
+    # one stable sort by the pair, so the first occurrence comes first
+    order = numpy.argsort(targets * (int(regulators.max()) + 1) + regulators, kind='stable')
+    keep = numpy.ones(len(targets), dtype=bool)
+    keep[order[1:]] = (targets[order[1:]] != targets[order[:-1]]) | (regulators[order[1:]] != regulators[order[:-1]])
+    return targets[keep], regulators[keep], numpy.asarray(signs)[keep]
 
-def check_num_of_connections(arg, threshold):
-    # threshold makes the function reusable for different models
-    try:
-        int(arg)
-    except ValueError:
-        # raise ValueError(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
-        print(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
-        exit(1)
-    if int(arg) < threshold:  # or > n, after I find the threshold
-        # raise ValueError(f"Number of vertices must be in range [{threshold}, n), got {arg}")
-        print(f"Number of connections must be within [{threshold}, n) range, got {arg}", file=stderr)
-        exit(1)
 
+def draw_degrees(num_of_vertices: int, degree_dist, mean_degree: float):
+    """Draws degree of each vertex from the given distribution or from the Poisson distribution
 
-"""------------------------------------------------------------------------------------------------------------------"""
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    degree_dist
+        Probabilities of degrees 0, 1, 2, ..., Poisson distribution with mean 'mean_degree' is used if it is None
+    mean_degree : float
+        Mean degree of the Poisson distribution
 
+    Returns
+    -------
+    numpy.ndarray
+        Degrees, at most 'num_of_vertices'
+    """
+    if degree_dist is None:
+        degrees = numpy.random.poisson(mean_degree, size=num_of_vertices)
+    else:
+        degree_dist = numpy.asarray(degree_dist, dtype=float)
+        degrees = numpy.random.choice(len(degree_dist), size=num_of_vertices, p=degree_dist / degree_dist.sum())
+    return numpy.minimum(degrees, num_of_vertices).astype(numpy.int64)
 
-def remove_whitespaces(network):
-    # https://stackoverflow.com/a/43447546
-    try:
-        with open(network, 'r') as n:
-            lines = n.readlines()
-        lines = [line.strip() for line in lines]
-        return ''.join(lines)
-    except FileNotFoundError:
-        print(f"File \'{network}\' not found.", file=stderr)
-        exit(1)
 
+def generate_directed_pa_edges(num_of_vertices: int, mean_degree: float, seed: int, frac_reg: float,
+                               delta_in=1.0, delta_out=0.2, new_regulator_frac=0.1) -> tuple:
+    """Generates edges of the directed preferential attachment network (Bollobás, Borgs, Chayes and Riordan)
 
-def modify_network(network, parametrisation_frac: float, seed: int, loc=""):
-    """Parametrises give network
+    Network grows from a single vertex by one regulation at a time. With probability 1 / 'mean_degree' a new vertex
+    is added together with the regulation: it is a new regulator of an existing vertex chosen with probability
+    proportional to in-degree + 'delta_in' (with probability 'new_regulator_frac'), or it is a new target regulated
+    by an existing vertex chosen with probability proportional to out-degree + 'delta_out'. Otherwise, both
+    endpoints of the regulation are existing vertices chosen the same way. In-degrees and out-degrees follow
+    separate power laws; the defaults give few regulators with many targets and moderate in-degrees, as in
+    regulatory networks. All steps are drawn at once: their positions in the uniform draws are found by
+    'directed_pa_steps' and the endpoints by 'pick_directed_pa_endpoints'. Repeated regulations (mostly of the hubs)
+    are dropped at the end.
 
     Parameters
     ----------
-    network
-        Network to be parametrised
-    parametrisation_frac : float
-        Denotes the fraction of all most-nested binary boolean functions to be replaced for parameters
+    num_of_vertices : int
+        Number of vertices
+    mean_degree : float
+        Expected number of regulations per vertex, at least 1
     seed : int
-        Seed value ensures the same result for the same seed
-    loc : str
-        Directory to store the networks in
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
+    delta_in : float, optional
+        Initial attractiveness of a vertex as a target
+    delta_out : float, optional
+        Initial attractiveness of a vertex as a regulator
+    new_regulator_frac : float, optional
+        Fraction of new vertices added as regulators rather than as targets
 
     Returns
     -------
-    None
+    tuple
+        (targets, regulators, signs) numpy arrays
     """
-    # change all conjunctions to uninterpreted fncs, or disjunctions
-    line = remove_whitespaces(network)
-    i = 0
+    if mean_degree < 1:
+        raise ValueError("Mean degree of the directed preferential attachment network has to be at least 1")
+    numpy.random.seed(seed)
+    new_vertex = 1 / mean_degree
+    alpha = new_vertex * new_regulator_frac
+    chunk = 1 << 16  # uniforms are drawn in chunks of this size
+    state = numpy.random.get_state()
+    # a step takes 2 uniforms if it adds a vertex and 3 otherwise, start with a bit more than expected
+    expected = (num_of_vertices - 1) * mean_degree * (3 - new_vertex)
+    uniforms = numpy.random.random_sample(chunk * (int(expected * 1.02) // chunk + 1))
+    positions = directed_pa_steps(uniforms, new_vertex, num_of_vertices)
+    while positions is None:
+        uniforms = numpy.concatenate([uniforms, numpy.random.random_sample(chunk * (len(uniforms) // chunk // 4 + 1))])
+        positions = directed_pa_steps(uniforms, new_vertex, num_of_vertices)
+    events = uniforms[positions]
+    kind = numpy.where(events < alpha, 0, numpy.where(events < new_vertex, 1, 2))  # new regulator, target or none
+    used = -(-(int(positions[-1]) + (3 if kind[-1] == 2 else 2)) // chunk) if len(positions) else 0
+    if len(uniforms) > chunk * used:  # random state afterwards is as if only the used chunks were drawn
+        numpy.random.set_state(state)
+        for _ in range(used):
+            numpy.random.random_sample(chunk)
+    adds = kind < 2
+    counts = numpy.cumsum(adds) - adds + 1  # number of vertices before each step
+    targets = numpy.where(kind == 1, counts, -1)
+    regulators = numpy.where(kind == 0, counts, -1)
+    pick_directed_pa_endpoints(regulators, kind != 0, uniforms[positions[kind != 0] + 1], counts, delta_out)
+    pick_directed_pa_endpoints(targets, kind != 1, uniforms[positions[kind != 1] + 1 + (kind[kind != 1] == 2)],
+                               counts, delta_in)
+    signs = draw_signs(frac_reg, len(targets))
+    return drop_duplicate_edges(targets, regulators, signs)
+
+
+def directed_pa_steps(uniforms, new_vertex: float, num_of_vertices: int):
+    """Finds positions of the steps of 'generate_directed_pa_edges' in its uniform draws
+
+    Step at position p takes 2 uniforms if uniforms[p] < 'new_vertex' (a new vertex is added) and 3 otherwise, so
+    the position of the next step depends on p alone. Positions of all steps are found by repeated squaring of this
+    jump.
+
+    Parameters
+    ----------
+    uniforms
+        Uniform draws
+    new_vertex : float
+        Probability that a step adds a new vertex
+    num_of_vertices : int
+        Number of vertices
+
+    Returns
+    -------
+    numpy.ndarray
+        Positions of the steps until all vertices are added, None if 'uniforms' aren't enough for them
+    """
+    if num_of_vertices <= 1:
+        return numpy.zeros(0, dtype=numpy.int64)
+    size = len(uniforms)
+    jump = numpy.append(numpy.minimum(numpy.arange(size) + 2 + (uniforms >= new_vertex), size), size)
+    positions = numpy.zeros(1, dtype=numpy.int64)
+    while positions[-1] < size:
+        positions = numpy.concatenate([positions, jump[positions]])
+        jump = jump[jump]
+    positions = positions[positions < size]
+    positions = positions[positions + 2 + (uniforms[positions] >= new_vertex) <= size]  # all its uniforms drawn
+    steps = int(numpy.searchsorted(numpy.cumsum(uniforms[positions] < new_vertex), num_of_vertices - 1)) + 1
+    return positions[:steps] if steps <= len(positions) else None
+
+
+def pick_directed_pa_endpoints(endpoints, picked, draws, counts, delta: float) -> None:
+    """Chooses endpoints of the steps of 'generate_directed_pa_edges' in place
+
+    Vertex is chosen with probability proportional to its degree + 'delta': the draw falls either on one of the
+    endpoints of the previous steps, whose endpoint is then copied, or on the 'delta' share of one of the vertices.
+    Copies of copies are resolved by pointer jumping.
+
+    Parameters
+    ----------
+    endpoints
+        Endpoint of each step, -1 where it is chosen
+    picked
+        Bool values to determine the steps whose endpoint is chosen
+    draws
+        Uniform draw of each chosen endpoint
+    counts
+        Number of vertices before each step
+    delta : float
+        Initial attractiveness of a vertex
+
+    Returns
+    -------
+    None
+    """
+    before = numpy.flatnonzero(picked)  # number of endpoints before the step
+    counts = counts[picked]
+    weight = before + delta * counts
+    value = numpy.where(weight > 0, draws * weight, draws * counts)
+    copied = (weight > 0) & (value < before)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        vertex = numpy.where(weight > 0, (value - before) / delta, value)
+    endpoints[before] = numpy.minimum(counts - 1, numpy.where(copied, 0, vertex).astype(numpy.int64))
+    pending = before[copied]
+    pointers = numpy.full(len(endpoints), -1, dtype=numpy.int64)
+    pointers[pending] = value[copied].astype(numpy.int64)
+    endpoints[pending] = -1
+    while len(pending):
+        found = endpoints[pointers[pending]]
+        endpoints[pending[found >= 0]] = found[found >= 0]
+        pending = pending[found < 0]
+        pointers[pending] = pointers[pointers[pending]]
+
+
+def generate_directed_configuration_edges(num_of_vertices: int, mean_degree: float, seed: int, frac_reg: float,
+                                          in_degree_dist=None, out_degree_dist=None) -> tuple:
+    """Generates edges of the directed configuration model
+
+    In-degree and out-degree of each vertex are drawn from the given distributions (Poisson with mean 'mean_degree'
+    if a distribution isn't given). Random stubs of the larger side are removed so that the sums match, the rest
+    are paired uniformly at random and repeated regulations are dropped.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    mean_degree : float
+        Mean in-degree and out-degree when the corresponding distribution isn't given
+    seed : int
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
+    in_degree_dist : list, optional
+        Probabilities of in-degrees 0, 1, 2, ...
+    out_degree_dist : list, optional
+        Probabilities of out-degrees 0, 1, 2, ...
+
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays, ordered by target
+    """
+    numpy.random.seed(seed)
+    targets = numpy.repeat(numpy.arange(num_of_vertices), draw_degrees(num_of_vertices, in_degree_dist,
+                                                                       mean_degree))
+    regulators = numpy.repeat(numpy.arange(num_of_vertices), draw_degrees(num_of_vertices, out_degree_dist,
+                                                                          mean_degree))
+    excess = len(targets) - len(regulators)
+    if excess > 0:
+        targets = numpy.delete(targets, numpy.random.choice(len(targets), size=excess, replace=False))
+    elif excess < 0:
+        regulators = numpy.delete(regulators, numpy.random.choice(len(regulators), size=-excess, replace=False))
+    regulators = numpy.random.permutation(regulators)
+    signs = draw_signs(frac_reg, len(targets))
+    return drop_duplicate_edges(targets, regulators, signs)
+
+
+def generate_directed_small_world_edges(num_of_vertices: int, num_of_connections: int, probability: float,
+                                        seed: int, frac_reg: float) -> tuple:
+    """Generates edges of the directed small-world network
+
+    Every vertex is regulated by its 'num_of_connections' nearest neighbours in a ring (half of them on each side).
+    Each regulator is then replaced with probability 'probability' by a random vertex, so in-degrees stay the same
+    and out-degrees spread out.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    num_of_connections : int
+        Number of nearest neighbours regulating each vertex, less than 'num_of_vertices'
+    probability : float
+        Probability of rewiring each regulation
+    seed : int
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
+
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays, ordered by target
+    """
+    if num_of_connections >= num_of_vertices:
+        raise ValueError("Number of connections has to be less than the number of vertices")
+    numpy.random.seed(seed)
+    half = num_of_connections // 2
+    offsets = numpy.r_[numpy.arange(-half, 0), numpy.arange(1, num_of_connections - half + 1)]
+    targets = numpy.repeat(numpy.arange(num_of_vertices), len(offsets))
+    regulators = (targets + numpy.tile(offsets, num_of_vertices)) % num_of_vertices
+    rewired = numpy.random.random_sample(len(targets)) < probability
+    regulators[rewired] = numpy.random.randint(num_of_vertices, size=int(rewired.sum()))
+    while True:  # redraw rewired regulators that are repeated or regulate themselves
+        order = numpy.lexsort((rewired, regulators, targets))  # original regulation comes first
+        dup = numpy.zeros(len(targets), dtype=bool)
+        dup[order[1:]] = (targets[order[1:]] == targets[order[:-1]]) & (regulators[order[1:]] == regulators[order[:-1]])
+        dup |= rewired & (regulators == targets)
+        if not dup.any():
+            break
+        regulators[dup] = numpy.random.randint(num_of_vertices, size=int(dup.sum()))
+    signs = draw_signs(frac_reg, len(targets))
+    return targets, regulators, signs
+
+
+def parse_block_model(num_of_vertices: int, block_model) -> tuple:
+    """Checks the blocks of the stochastic block model and returns them as arrays
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    block_model : tuple
+        (sizes, probabilities), see 'generate_block_model_edges'
+
+    Returns
+    -------
+    tuple
+        (sizes, probabilities) numpy arrays, the full matrix of the probabilities
+    """
+    sizes, probabilities = block_model
+    if numpy.ndim(sizes) == 0:  # number of blocks of (almost) equal sizes
+        if not 1 <= int(sizes) <= num_of_vertices:
+            raise ValueError(f"Number of blocks has to be in range [1, {num_of_vertices}], got {sizes}")
+        sizes = numpy.full(int(sizes), num_of_vertices // int(sizes), dtype=numpy.int64)
+        sizes[:num_of_vertices % len(sizes)] += 1
+    sizes = numpy.asarray(sizes, dtype=numpy.int64)
+    if sizes.sum() != num_of_vertices or (sizes < 0).any():
+        raise ValueError(f"Sizes of the blocks have to sum up to the number of vertices {num_of_vertices}")
+    probabilities = numpy.asarray(probabilities, dtype=float)
+    if probabilities.shape == (2,):  # probability within a block and between blocks
+        probabilities = numpy.where(numpy.eye(len(sizes), dtype=bool), probabilities[0], probabilities[1])
+    if probabilities.shape != (len(sizes), len(sizes)):
+        raise ValueError(f"Probabilities of the stochastic block model have to be a {len(sizes)}×{len(sizes)} matrix "
+                         f"or a pair, got shape {probabilities.shape}")
+    if (probabilities < 0).any() or (probabilities > 1).any():
+        raise ValueError("Probabilities of the stochastic block model have to be in range [0, 1]")
+    return sizes, probabilities
+
+
+def generate_block_model_edges(num_of_vertices: int, block_model, seed: int, frac_reg: float) -> tuple:
+    """Generates edges of the directed stochastic block model
+
+    Vertices are split into consecutive blocks (modules) and each vertex of block a regulates each vertex of block b
+    with probability probabilities[a][b], self-regulations included as in the random network. Only the existing
+    regulations are drawn: the number of regulations of every pair of blocks is drawn from the binomial
+    distribution and their positions within the pair uniformly without repetition, so neither time nor memory
+    depends on the number of vertex pairs.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    block_model : tuple
+        (sizes, probabilities), where 'sizes' are the sizes of the blocks or their number (blocks of almost equal
+        sizes) and 'probabilities' is the matrix of probabilities of a regulation from a vertex of the block given
+        by the row to a vertex of the block given by the column, or a pair (within a block, between blocks)
+    seed : int
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
+
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays, ordered by target and regulator
+    """
+    sizes, probabilities = parse_block_model(num_of_vertices, block_model)
+    numpy.random.seed(seed)
+    starts = numpy.cumsum(sizes) - sizes
+    cells = numpy.outer(sizes, sizes).ravel()  # vertex pairs of each pair of blocks
+    counts = numpy.random.binomial(cells, probabilities.ravel())
+    pairs = numpy.repeat(numpy.arange(len(cells)), counts)
+    positions = (numpy.random.random_sample(len(pairs)) * cells[pairs]).astype(numpy.int64)
+    dense = numpy.flatnonzero(2 * counts > cells)  # repeated draws would be rejected too often
+    is_dense = numpy.isin(pairs, dense)
+    offsets = numpy.cumsum(counts) - counts
+    for pair in dense.tolist():
+        positions[offsets[pair]:offsets[pair] + counts[pair]] = numpy.random.choice(cells[pair], size=counts[pair],
+                                                                                   replace=False)
+    while True:  # redraw positions repeated within a pair of blocks
+        order = numpy.lexsort((positions, pairs))
+        repeated = numpy.zeros(len(pairs), dtype=bool)
+        repeated[order[1:]] = (pairs[order[1:]] == pairs[order[:-1]]) & \
+                              (positions[order[1:]] == positions[order[:-1]])
+        repeated &= ~is_dense
+        if not repeated.any():
+            break
+        positions[repeated] = (numpy.random.random_sample(int(repeated.sum())) *
+                               cells[pairs[repeated]]).astype(numpy.int64)
+    regulator_blocks, target_blocks = numpy.divmod(pairs, len(sizes))
+    regulators = starts[regulator_blocks] + positions // sizes[target_blocks]
+    targets = starts[target_blocks] + positions % sizes[target_blocks]
+    order = numpy.lexsort((regulators, targets))
+    signs = draw_signs(frac_reg, len(targets))
+    return targets[order], regulators[order], signs
+
+
+def rank_within_groups(groups, priority):
+    """Ranks elements within their groups by priority (0 for the lowest priority value in each group)
+
+    Parameters
+    ----------
+    groups
+        Group of each element
+    priority
+        Priority of each element
+
+    Returns
+    -------
+    numpy.ndarray
+        Rank of each element within its group
+    """
+    order = numpy.lexsort((priority, groups))
+    sorted_groups = groups[order]
+    starts = numpy.flatnonzero(numpy.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    counts = numpy.diff(numpy.r_[starts, len(order)])
+    ranks = numpy.empty(len(order), dtype=numpy.int64)
+    ranks[order] = numpy.arange(len(order)) - numpy.repeat(starts, counts)
+    return ranks
+
+
+def cap_in_degrees(num_of_vertices: int, targets, regulators, signs, capacity, seed: int,
+                   reorient=True, max_rounds=300) -> tuple:
+    """Limits in-degree of each vertex by reorienting or dropping its excess regulations
+
+    In each round, regulations of vertices with more regulators than their capacity are ranked randomly and the excess
+    ones are, if 'reorient' is set, turned around towards their regulator. Regulator with capacity left accepts them,
+    a full one accepts each of them with probability 1/2 and passes its own excess further in the next round.
+    Regulations still in excess after 'max_rounds' rounds (or right away without 'reorient') are dropped.
+    Reorienting suits networks created from undirected graphs (Barabási-Albert, Watts-Strogatz), where the direction
+    of an edge is random anyway.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    targets
+        Regulated vertex of each regulation
+    regulators
+        Regulator of each regulation
+    signs
+        Type of each regulation, True for activating
+    capacity
+        Maximal in-degree, either one for all vertices or an array with a value for each vertex
+    seed : int
+        Seed value
+    reorient : bool, optional
+        Try to reorient excess regulations before dropping them
+    max_rounds : int, optional
+        Maximal number of reorienting rounds
+
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays, in the original order of the kept regulations
+    """
+    targets = numpy.array(targets, dtype=numpy.int64)
+    regulators = numpy.array(regulators, dtype=numpy.int64)
+    signs = numpy.asarray(signs)
+    capacity = numpy.broadcast_to(numpy.asarray(capacity, dtype=numpy.int64), (num_of_vertices,))
+    numpy.random.seed(seed)
+    for rounds in range(max_rounds + 1):
+        in_degrees = numpy.bincount(targets, minlength=num_of_vertices)
+        over = numpy.flatnonzero(in_degrees[targets] > capacity[targets])  # regulations of vertices over capacity
+        excess = over[rank_within_groups(targets[over], numpy.random.random_sample(len(over)))
+                      >= capacity[targets[over]]]
+        if len(excess) == 0 or not reorient or rounds == max_rounds:
+            break
+        new_targets = regulators[excess]
+        accepted = rank_within_groups(new_targets, numpy.random.random_sample(len(excess))) < \
+            (capacity - in_degrees)[new_targets]
+        accepted |= numpy.random.random_sample(len(excess)) < 0.5
+        flip = excess[accepted]
+        regulators[flip], targets[flip] = targets[flip], regulators[flip]
+    keep = numpy.ones(len(targets), dtype=bool)
+    keep[excess] = False
+    return targets[keep], regulators[keep], signs[keep]
+
+
+def edges_to_csr(num_of_vertices: int, targets, regulators, signs, out_dir=None, chunk_size=None) -> tuple:
+    """Sorts regulations given as arrays by the regulated vertex into compressed sparse row (CSR) arrays
+
+    Regulators of vertex 'v' are 'regulators[indptr[v]:indptr[v + 1]]' with signs 'signs[indptr[v]:indptr[v + 1]]'
+    and keep the order in which they appear in the arrays. The arrays are processed in chunks of
+    'chunk_size' regulations (counting sort), so they can be memory-mapped and bigger than the available memory.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    targets
+        Regulated vertex of each regulation
+    regulators
+        Regulator of each regulation
+    signs
+        Type of each regulation, True for activating
+    out_dir : str, optional
+        Directory to store the resulting 'regulators.npy' and 'signs.npy' as memory-mapped arrays
+    chunk_size : int, optional
+        Number of regulations processed at once, all of them by default
+
+    Returns
+    -------
+    tuple
+        (indptr, regulators, signs) numpy arrays
+    """
+    num_of_edges = len(targets)
+    chunk_size = max(1, num_of_edges if chunk_size is None else chunk_size)
+    counts = numpy.zeros(num_of_vertices, dtype=numpy.int64)
+    for start in range(0, num_of_edges, chunk_size):
+        counts += numpy.bincount(targets[start:start + chunk_size], minlength=num_of_vertices)
+    indptr = numpy.zeros(num_of_vertices + 1, dtype=numpy.int64)
+    indptr[1:] = numpy.cumsum(counts)
+    sign_dtype = numpy.asarray(signs[:1]).dtype if num_of_edges else bool  # sign draws (see 'draw_signs') are kept
+    if out_dir is not None and num_of_edges > 0:
+        sorted_regulators = numpy.lib.format.open_memmap(path.join(out_dir, 'regulators.npy'), mode='w+',
+                                                         dtype=numpy.int64, shape=(num_of_edges,))
+        sorted_signs = numpy.lib.format.open_memmap(path.join(out_dir, 'signs.npy'), mode='w+',
+                                                    dtype=sign_dtype, shape=(num_of_edges,))
+    else:
+        sorted_regulators = numpy.empty(num_of_edges, dtype=numpy.int64)
+        sorted_signs = numpy.empty(num_of_edges, dtype=sign_dtype)
+    cursor = indptr[:-1].copy()
+    for start in range(0, num_of_edges, chunk_size):
+        chunk_targets = numpy.asarray(targets[start:start + chunk_size])
+        order = numpy.argsort(chunk_targets, kind='stable')
+        positions = cursor[chunk_targets[order]] + rank_within_groups(chunk_targets[order],
+                                                                      numpy.arange(len(order)))
+        sorted_regulators[positions] = numpy.asarray(regulators[start:start + chunk_size])[order]
+        sorted_signs[positions] = numpy.asarray(signs[start:start + chunk_size])[order]
+        cursor += numpy.bincount(chunk_targets, minlength=num_of_vertices)
+    return indptr, sorted_regulators, sorted_signs
+
+
+def write_transitions(sbml_f, inc_transitions: dict, seed_: int, l_bound: int, u_bound: int,
+                      callback=None) -> None:
+    """Writes transitions to sbml file
+
+    Random choices of all update functions are drawn at once by 'plan_update_functions'. Output is identical to
+    calling 'write_transition' for every vertex.
+
+    Parameters
+    ----------
+    sbml_f
+        sbml file
+    inc_transitions : dict
+        Dictionary where vertex is a key and its value is a list of regulations
+    seed_ : int
+        Seed for generating seeds needed in 'write_update_function' function
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    callback : callable, optional
+        Called as callback(vertices_written) every CALLBACK_INTERVAL vertices, may raise GenerationCancelled
+
+    Returns
+    -------
+    None
+    """
+    sbml_f.write('<qual:listOfTransitions xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    has_function, plan = plan_update_functions([len(inc_transitions[vertex]) for vertex in inc_transitions], seed_,
+                                               l_bound, u_bound)
+    has_function = has_function.tolist()
+    for i, vertex in enumerate(inc_transitions):
+        if callback is not None and i % CALLBACK_INTERVAL == 0 and i > 0:
+            callback(i)
+        write_planned_transition(sbml_f, vertex, [reg[0] for reg in inc_transitions[vertex]],
+                                 [reg[1] for reg in inc_transitions[vertex]], has_function[i], plan)
+    sbml_f.write('</qual:listOfTransitions>')
+
+
+def write_transition(sbml_f, vertex: int, regulators: list, seed_: int, seed_which: int, seed_arr: int,
+                     rand_ch: int, l_bound: int, u_bound: int) -> None:
+    """Writes transition of one vertex, i.e. its regulations and its update function, to sbml file
+
+    Parameters
+    ----------
+    sbml_f
+        sbml file
+    vertex : int
+        Vertex
+    regulators : list
+        List of tuples (node, regulation_type). Denotes regulators of given 'vertex'
+    seed_ : int
+        Seed value (see 'write_update_function')
+    seed_which : int
+        See 'write_update_function'
+    seed_arr : int
+        See 'write_update_function'
+    rand_ch : int
+        Bool value to determine if the vertex will have an update function
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+
+    Returns
+    -------
+    None
+    """
+    sbml_f.write(f'<qual:transition qual:id="tr_X{vertex}">')
+    sbml_f.write('<qual:listOfInputs>')
+    for other_vertex in regulators:
+        if other_vertex[1]:
+            sign = 'positive'
+        else:
+            sign = 'negative'
+        sbml_f.write(f'<qual:input qual:id="tr_X{other_vertex[0]}_in_X{vertex}" '
+                     f'qual:qualitativeSpecies="X{other_vertex[0]}" '
+                     f'qual:sign="{sign}" qual:transitionEffect="none"/>')
+    sbml_f.write('</qual:listOfInputs>')
+    sbml_f.write('<qual:listOfOutputs>')
+    sbml_f.write(f'<qual:output qual:id="tr_X{vertex}_out" qual:qualitativeSpecies="X{vertex}" '
+                 f'qual:transitionEffect="assignmentLevel"/>')
+    sbml_f.write('</qual:listOfOutputs>')
+    write_update_function(sbml_f, vertex, regulators, seed_, seed_which, seed_arr, rand_ch, l_bound, u_bound)
+    sbml_f.write('</qual:transition>')
+
+
+def write_transitions_from_arrays(sbml_f, indptr, regulators, signs, seed_: int, l_bound: int, u_bound: int,
+                                  callback=None, block_edges=None, workers=None, executor=None) -> None:
+    """Writes transitions given as CSR arrays (see 'edges_to_csr') to sbml file
+
+    Output is identical to 'write_transitions'. Only a block of vertices with at most 'block_edges' regulations is
+    converted to Python objects at a time, so the arrays may be memory-mapped. Random choices of all update
+    functions are drawn at once by 'plan_update_functions'. With more 'workers', ranges of
+    vertices are serialized concurrently in worker processes (see 'serialize_vertex_range') and written in order.
+
+    Parameters
+    ----------
+    sbml_f
+        sbml file
+    indptr
+        Offsets of the regulators of each vertex
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations, True for activating
+    seed_ : int
+        Seed for generating seeds needed in 'write_update_function' function
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    callback : callable, optional
+        See 'write_transitions'
+    block_edges : int, optional
+        Maximal number of regulations in a block of vertices, all of them by default
+    workers : int, optional
+        Number of worker processes
+    executor : ProcessPoolExecutor, optional
+        Pool of the 'workers' processes reused across networks, a new one is created for this network by default
+
+    Returns
+    -------
+    None
+    """
+    num_of_vertices = len(indptr) - 1
+    sbml_f.write('<qual:listOfTransitions xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    has_function, plan = plan_update_functions(numpy.diff(indptr), seed_, l_bound, u_bound)
+    block_edges = max(1, int(indptr[-1]) if block_edges is None else block_edges)
+    if workers is not None and workers > 1 and num_of_vertices > 1:
+        write_vertex_ranges_in_parallel(sbml_f, indptr, regulators, signs, has_function, plan, callback, block_edges,
+                                        workers, executor)
+        sbml_f.write('</qual:listOfTransitions>')
+        return
+    start = 0
+    while start < num_of_vertices:
+        end = max(start + 1, int(numpy.searchsorted(indptr, indptr[start] + block_edges, side='right')) - 1)
+        end = min(end, num_of_vertices)
+        write_planned_transitions(sbml_f, start, indptr[start:end + 1], regulators[indptr[start]:indptr[end]],
+                                  signs[indptr[start]:indptr[end]], has_function[start:end], plan, callback)
+        start = end
+    sbml_f.write('</qual:listOfTransitions>')
+
+
+def serialize_vertex_range(start: int, indptr, regulators, signs, has_function, plan: dict) -> str:
+    """Serializes transitions of a range of vertices to a string
+
+    Update function of a vertex depends only on its regulators, on the plan shared by the whole network and on its
+    own 'has_function' value, so any range of vertices can be serialized independently, e.g. in a worker process.
+
+    Parameters
+    ----------
+    start : int
+        First vertex of the range
+    indptr
+        Offsets of the regulators of the vertices in the range (the first one doesn't have to be 0)
+    regulators
+        Regulators of the vertices in the range
+    signs
+        Types of the regulations, True for activating
+    has_function
+        Bool values to determine if the vertices will have an update function
+    plan : dict
+        Plan of the update functions returned by 'plan_update_functions'
+
+    Returns
+    -------
+    str
+        Serialized transitions
+    """
+    sbml_f = StringIO()
+    write_planned_transitions(sbml_f, start, indptr, regulators, signs, has_function, plan)
+    return sbml_f.getvalue()
+
+
+def write_vertex_ranges_in_parallel(sbml_f, indptr, regulators, signs, has_function, plan: dict, callback,
+                                    block_edges: int, workers: int, executor=None) -> None:
+    """Serializes ranges of vertices in worker processes and writes them to sbml file in order
+
+    Ranges are balanced by the number of vertices and regulations. At most 2 * 'workers' ranges are in flight, so
+    the memory taken by the serialized ranges stays bounded.
+
+    Parameters
+    ----------
+    sbml_f
+        sbml file
+    indptr
+        Offsets of the regulators of each vertex
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations, True for activating
+    has_function
+        Bool values to determine if the vertices will have an update function
+    plan : dict
+        Plan of the update functions returned by 'plan_update_functions'
+    callback : callable
+        Called as callback(vertices_written) after each range, may raise GenerationCancelled
+    block_edges : int
+        Maximal number of regulations in a range
+    workers : int
+        Number of worker processes
+    executor : ProcessPoolExecutor, optional
+        See 'write_transitions_from_arrays'
+
+    Returns
+    -------
+    None
+    """
+    num_of_vertices = len(indptr) - 1
+    num_of_edges = int(indptr[-1])
+    num_of_ranges = min(num_of_vertices, max(workers * 8, -(-num_of_edges // block_edges)))
+    cost = numpy.asarray(indptr) + numpy.arange(num_of_vertices + 1)  # serialization cost of vertices before
+    bounds = numpy.unique(numpy.searchsorted(cost, numpy.linspace(0, cost[-1], num_of_ranges + 1)))
+    bounds = numpy.unique(numpy.r_[0, bounds, num_of_vertices]).tolist()
+    pending = deque()
+
+    def write_next():
+        end, future = pending.popleft()
+        sbml_f.write(future.result())
+        if callback is not None:
+            callback(end)
+
+    with nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                pending.append((end, executor.submit(serialize_vertex_range, start,
+                                                     numpy.asarray(indptr[start:end + 1]),
+                                                     numpy.asarray(regulators[indptr[start]:indptr[end]]),
+                                                     numpy.asarray(signs[indptr[start]:indptr[end]]),
+                                                     has_function[start:end], plan)))
+                if len(pending) >= 2 * workers:
+                    write_next()
+            while pending:
+                write_next()
+        except BaseException:
+            for _, future in pending:
+                future.cancel()
+            raise
+
+
+def orient_edges(graph, seed: int, frac_reg: float) -> tuple:
+    """Gives each edge of the undirected graph a random direction and a regulation type
+
+    Parameters
+    ----------
+    graph
+        Generated graph
+    seed : int
+        Seed value
+    frac_reg : float
+        Probability that a regulation is activating
+
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays, in the order of 'graph.edges'
+    """
+    edges = numpy.array(graph.edges, dtype=numpy.int64).reshape(-1, 2)
+    num_of_edges = len(edges)
+    numpy.random.seed(seed)
+    rand_reg_types = draw_signs(frac_reg, num_of_edges)
+    rand_choice = numpy.random.choice([True, False], size=num_of_edges)
+    targets = numpy.where(rand_choice, edges[:, 0], edges[:, 1])
+    regulators = numpy.where(rand_choice, edges[:, 1], edges[:, 0])
+    return targets, regulators, rand_reg_types
+
+
+def generate_network_arrays(num_of_vertices: int, seed: int, probability=0, num_of_connections=0, frac_reg=0.8,
+                            ba=False, ws=False, random=False, in_degree_cap=None, in_degree_dist=None,
+                            memory_budget=None, spill_dir=None, directed_ba=False, directed_config=False,
+                            directed_ws=False, out_degree_dist=None, topology=None, block_model=None) -> tuple:
+    """Generates regulations of a single network as CSR arrays (see 'edges_to_csr')
+
+    Draws the random values in the same order as the original generators of the random network and of the
+    Barabási-Albert and Watts-Strogatz graphs, so a seed gives the same network as in the earlier versions.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices within the network
+    seed : int
+        Seed value of the network
+    probability : float, optional
+        See 'generate_bn'
+    num_of_connections : int, optional
+        See 'generate_bn'
+    frac_reg : float, optional
+        Fraction of activating regulations within the network. If None, uniform draws of the signs are returned
+        instead of the signs (see 'draw_signs')
+    ba : bool, optional
+        Barabási-Albert model
+    ws : bool, optional
+        Watts-Strogatz model
+    random : bool, optional
+        Fully randomised network
+    in_degree_cap : int, optional
+        Maximal in-degree of a vertex (see 'cap_in_degrees')
+    in_degree_dist : list, optional
+        Probabilities of in-degrees 0, 1, 2, ... For the random network and the directed configuration model,
+        in-degrees are drawn from it; for the other models, it only gives the in-degree cap of each vertex, so the
+        in-degrees don't follow it
+    memory_budget : int, optional
+        Approximate memory in bytes the random network may use while it is generated (see 'generate_bn')
+    spill_dir : str, optional
+        Directory for memory-mapped edge arrays of the random network that don't fit into 'memory_budget'
+    directed_ba : bool, optional
+        Directed preferential attachment model (see 'generate_directed_pa_edges')
+    directed_config : bool, optional
+        Directed configuration model (see 'generate_directed_configuration_edges')
+    directed_ws : bool, optional
+        Directed small-world model (see 'generate_directed_small_world_edges')
+    out_degree_dist : list, optional
+        Probabilities of out-degrees 0, 1, 2, ... of the directed configuration model
+    topology : dict, optional
+        Imported regulations (see 'load_topology') used instead of a model. Missing signs are drawn with
+        'frac_reg'; given signs are kept, for frac_reg=None they are returned as draws giving them for any fraction
+    block_model : tuple, optional
+        (sizes, probabilities) of the directed stochastic block model (see 'generate_block_model_edges')
+
+    Returns
+    -------
+    tuple
+        (indptr, regulators, signs, seed_trans), where 'seed_trans' is the seed passed to 'write_transitions'
+    """
+    numpy.random.seed(seed)
+    seeds = list(numpy.random.randint(MAXSIZE, size=3))  # first two seeds are the same as with size=2
+    chunk_size = None
+    out_dir = None
+    if random:
+        if in_degree_dist is not None:
+            targets, regulators, signs = generate_random_edges_by_degree(num_of_vertices, in_degree_dist, seed,
+                                                                         frac_reg)
+        elif memory_budget is not None:
+            # randint and choice need about 25 bytes per element of the n×n matrices, an edge takes 17 bytes
+            block_rows = max(1, memory_budget // (4 * 25 * num_of_vertices))
+            spill = spill_dir is not None and num_of_vertices ** 2 * probability * 17 * 2 > memory_budget
+            targets, regulators, signs = generate_random_edges_blocked(num_of_vertices, probability, seed, frac_reg,
+                                                                       block_rows, spill_dir if spill else None)
+            if spill:
+                chunk_size = max(1, memory_budget // (4 * 40))
+                out_dir = spill_dir
+        else:
+            targets, regulators, signs = generate_random_edges(num_of_vertices, probability, seed, frac_reg)
+        if in_degree_cap is not None:
+            targets, regulators, signs = cap_in_degrees(num_of_vertices, targets, regulators, signs, in_degree_cap,
+                                                        int(seeds[2]), reorient=False)
+        return edges_to_csr(num_of_vertices, targets, regulators, signs, out_dir, chunk_size) + (int(seeds[0]),)
+    directed = directed_ba or directed_config or directed_ws or topology is not None or block_model is not None
+    if topology is not None:
+        if topology['num_of_vertices'] > num_of_vertices:
+            raise ValueError(f"Imported topology has {topology['num_of_vertices']} vertices, more than "
+                             f"{num_of_vertices}")
+        targets, regulators = topology['targets'], topology['regulators']
+        if topology['signs'] is None:
+            signs = draw_signs(frac_reg, len(targets))
+        else:
+            signs = numpy.where(topology['signs'], -numpy.inf, numpy.inf) if frac_reg is None else topology['signs']
+            if topology.get('known_signs') is not None:  # missing types are drawn
+                signs = numpy.where(topology['known_signs'], signs, draw_signs(frac_reg, len(targets)))
+    elif block_model is not None:
+        targets, regulators, signs = generate_block_model_edges(num_of_vertices, block_model, seed, frac_reg)
+    elif directed_ba:
+        targets, regulators, signs = generate_directed_pa_edges(num_of_vertices, num_of_connections, seed, frac_reg)
+    elif directed_config:
+        targets, regulators, signs = generate_directed_configuration_edges(num_of_vertices, num_of_connections, seed,
+                                                                           frac_reg, in_degree_dist, out_degree_dist)
+        in_degree_dist = None  # in-degrees are already drawn from it
+    elif directed_ws:
+        targets, regulators, signs = generate_directed_small_world_edges(num_of_vertices, num_of_connections,
+                                                                         probability, seed, frac_reg)
+    else:
+        if ba:
+            g = nx.barabasi_albert_graph(num_of_vertices, num_of_connections, seed=seed)
+        elif ws:
+            g = nx.watts_strogatz_graph(num_of_vertices, num_of_connections, probability, seed=seed)
+        else:
+            raise ValueError("No model of the network was selected")
+        targets, regulators, signs = orient_edges(g, seed, frac_reg)
+        del g  # graph is by far the biggest object here, it isn't needed anymore
+    if in_degree_cap is not None or in_degree_dist is not None:
+        capacity = num_of_vertices if in_degree_cap is None else in_degree_cap
+        numpy.random.seed(seeds[2])
+        if in_degree_dist is not None:
+            in_degree_dist = numpy.asarray(in_degree_dist, dtype=float)
+            capacity = numpy.minimum(capacity, numpy.random.choice(len(in_degree_dist), size=num_of_vertices,
+                                                                   p=in_degree_dist / in_degree_dist.sum()))
+        # reorienting excess regulations would break the degree structure of the directed models
+        targets, regulators, signs = cap_in_degrees(num_of_vertices, targets, regulators, signs, capacity,
+                                                    numpy.random.randint(MAXSIZE), reorient=not directed)
+    return edges_to_csr(num_of_vertices, targets, regulators, signs) + (int(seeds[1]),)
+
+
+def write_network_arrays_to_sbml(sbml_f, num_of_vertices: int, indptr, regulators, signs, seed_trans: int,
+                                 l_bound: int, u_bound: int, callback=None, block_edges=None, workers=None,
+                                 functions='chains', uninterpreted_frac=0.5, executor=None, names=None) -> None:
+    """Writes the whole network given as CSR arrays, including the SBML header, to sbml file
+
+    With the default 'chains' update functions, the transitions are the same as written by 'write_transitions'.
+
+    Parameters
+    ----------
+    sbml_f
+        sbml file
+    num_of_vertices : int
+        Number of vertices
+    indptr
+        Offsets of the regulators of each vertex
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations, True for activating
+    seed_trans : int
+        Seed for generating seeds needed in 'write_update_function' function
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    callback : callable, optional
+        See 'write_transitions'
+    block_edges : int, optional
+        See 'write_transitions_from_arrays'
+    workers : int, optional
+        See 'write_transitions_from_arrays'
+    functions : str, optional
+        Engine of the update functions, 'chains' of and/or operators written by 'write_transitions_from_arrays' or
+        truth tables of 'random', 'canalising' or 'monotone' functions (see 'write_truth_table_transitions'). Truth
+        tables are written by this process at once, 'block_edges', 'workers' and 'executor' aren't used for them
+    uninterpreted_frac : float, optional
+        See 'write_truth_table_transitions'
+    executor : ProcessPoolExecutor, optional
+        See 'write_transitions_from_arrays'
+    names : list, optional
+        See 'write_vertices_to_sbml'
+
+    Returns
+    -------
+    None
+    """
+    sbml_f.write('<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'no\'?>')
+    sbml_f.write('<sbml xmlns="http://www.sbml.org/sbml/level3/version1/core" '
+                 'layout:required="false" level="3" qual:required="true" '
+                 'xmlns:layout="http://www.sbml.org/sbml/level3/version1/layout/version1" version="1" '
+                 'xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    sbml_f.write('<model>')
+    generate_layout(sbml_f, num_of_vertices)
+    write_vertices_to_sbml(sbml_f, num_of_vertices, names)
+    if functions == 'chains':
+        write_transitions_from_arrays(sbml_f, indptr, regulators, signs, seed_trans, l_bound, u_bound, callback,
+                                      block_edges, workers, executor)
+    else:
+        write_truth_table_transitions(sbml_f, indptr, regulators, signs, seed_trans, l_bound, u_bound, functions,
+                                      uninterpreted_frac, callback)
+    sbml_f.write('</model>')
+    sbml_f.write('</sbml>')
+
+
+"""-------------------------------------------TRUTH-TABLE UPDATE FUNCTIONS-------------------------------------------"""
+
+
+def packed_variables(arity: int):
+    """Returns bit-packed truth tables of the regulators of a function of 'arity' regulators
+
+    Truth tables are packed little-endian: bit j of a table is the value for assignment j, where regulator i has the
+    value of bit i of j. Tables of fewer than 3 regulators take a whole byte, the unused bits are zero.
+
+    Returns
+    -------
+    numpy.ndarray
+        (arity, max(1, 2**arity // 8)) uint8 array
+    """
+    assignments = (numpy.arange(max(2 ** arity, 8))[None, :] >> numpy.arange(arity)[:, None]) & 1
+    assignments[:, 2 ** arity:] = 0
+    return numpy.packbits(assignments.astype(bool), axis=1, bitorder='little')
+
+
+def cofactor_order(tables, arity: int) -> tuple:
+    """Compares the cofactors of bit-packed truth tables by each regulator
+
+    Parameters
+    ----------
+    tables
+        (count, bytes) uint8 truth tables (see 'packed_variables')
+    arity : int
+        Number of regulators of the functions
+
+    Returns
+    -------
+    tuple
+        (increasing, decreasing) (count, arity) bool arrays, True where the function is monotone increasing or
+        decreasing in the regulator; a regulator the function doesn't depend on is both
+    """
+    count, width = tables.shape
+    increasing = numpy.empty((count, arity), dtype=bool)
+    decreasing = numpy.empty((count, arity), dtype=bool)
+    for var in range(arity):
+        if var < 3:  # cofactors are interleaved within the bytes
+            low = numpy.uint8([0x55, 0x33, 0x0F][var])
+            off = tables & low
+            on = (tables >> numpy.uint8(1 << var)) & low
+        else:
+            blocks = tables.reshape(count, -1, 2, 1 << (var - 3))
+            off, on = blocks[:, :, 0], blocks[:, :, 1]
+        increasing[:, var] = ~(off & ~on).reshape(count, -1).any(axis=1)
+        decreasing[:, var] = ~(on & ~off).reshape(count, -1).any(axis=1)
+    return increasing, decreasing
+
+
+def sample_truth_tables(arity: int, signs, kind: str, rng):
+    """Samples bit-packed truth tables of update functions of vertices with the same in-degree at once
+
+    Every function depends on all of its regulators. 'random' functions are uniformly random among such functions,
+    the 'signs' of the regulations don't restrict them. 'canalising' functions are nested canalising: regulators
+    are checked in a random order and the first one with its random canalising value determines the result, which
+    is the same value for an activating and the negated value for an inhibiting regulation, so the function is
+    monotone in the direction given by the sign. 'monotone' functions are disjunctions of up to 'arity' random
+    conjunctions of literals, where an activating regulator is a positive and an inhibiting one a negative
+    literal. Functions depending on fewer regulators are resampled.
+
+    Parameters
+    ----------
+    arity : int
+        In-degree of the vertices, at least 1
+    signs
+        (count, arity) bool array, types of the regulations of each vertex, True for activating
+    kind : str
+        'random', 'canalising' or 'monotone'
+    rng
+        numpy.random.Generator to draw from
+
+    Returns
+    -------
+    numpy.ndarray
+        (count, max(1, 2**arity // 8)) uint8 truth tables (see 'packed_variables')
+    """
+    signs = numpy.asarray(signs, dtype=bool)
+    count = len(signs)
+    variables = packed_variables(arity)
+    width = variables.shape[1]
+    used = numpy.uint8((1 << 2 ** arity) - 1 if arity < 3 else 0xFF)  # bits of the assignments
+    full = numpy.full((count, width), used, dtype=numpy.uint8)
+    if kind == 'canalising':
+        order = numpy.argsort(rng.random((count, arity)), axis=1)
+        inputs = rng.random((count, arity)) < 0.5
+        outputs = inputs == numpy.take_along_axis(signs, order, axis=1)
+        tables = numpy.where(outputs[:, -1:], 0, full).astype(numpy.uint8)  # no regulator canalises
+        for layer in reversed(range(arity)):
+            hit = variables[order[:, layer]] ^ numpy.where(inputs[:, layer, None], 0, full).astype(numpy.uint8)
+            tables = (hit & numpy.where(outputs[:, layer, None], full, 0).astype(numpy.uint8)) | (~hit & tables)
+        return tables
+    tables = numpy.zeros((count, width), dtype=numpy.uint8)
+    redraw = numpy.arange(count)
+    while len(redraw):
+        if kind == 'random':
+            tables[redraw] = rng.integers(0, 256, size=(len(redraw), width), dtype=numpy.uint8) & used
+        elif kind == 'monotone':
+            literals = variables[None] ^ numpy.where(signs[redraw, :, None], 0, used).astype(numpy.uint8)
+            num_of_terms = rng.integers(1, arity + 1, size=len(redraw))
+            members = rng.random((len(redraw), arity, arity)) < 0.5
+            new = numpy.zeros((len(redraw), width), dtype=numpy.uint8)
+            for term in range(arity):
+                conjunction = full[redraw].copy()
+                for var in range(arity):
+                    conjunction &= numpy.where(members[:, term, var, None], literals[:, var], used).astype(numpy.uint8)
+                keep = (term < num_of_terms) & members[:, term].any(axis=1)
+                new |= numpy.where(keep[:, None], conjunction, 0).astype(numpy.uint8)
+            tables[redraw] = new
+        else:
+            raise ValueError(f"Unsupported kind of update functions {kind}")
+        increasing, decreasing = cofactor_order(tables[redraw], arity)
+        redraw = redraw[(increasing & decreasing).any(axis=1)]
+    return tables
+
+
+@lru_cache(maxsize=None)
+def cofactor_masks(arity: int) -> tuple:
+    """Returns (full, lows) masks of truth tables of 'arity' regulators as integers (see 'table_to_mathml')
+
+    'full' has the bits of all assignments set, lows[i] the bits of the assignments where regulator i is 0. The masks
+    are as long as the tables, so they are computed once per arity.
+    """
+    full = (1 << (1 << arity)) - 1
+    return full, tuple(full // ((1 << (2 << var)) - 1) * ((1 << (1 << var)) - 1) for var in range(arity))
+
+
+def table_to_mathml(table: int, arity: int, literals: list, uninterpreted, memo=None) -> str:
+    """Converts a truth table to a MathML expression by Shannon decomposition
+
+    A regulator that determines the value on its own (canalising) is split first, and a branch with a constant
+    value or a branch implied by the other one is merged into a single and/or, so nested canalising functions and
+    monotone functions get expressions linear in their literals.
+
+    Parameters
+    ----------
+    table : int
+        Truth table as an integer, bit j is the value for assignment j (see 'packed_variables')
+    arity : int
+        Number of regulators
+    literals : list
+        (positive, negative) MathML literals of each regulator
+    uninterpreted : callable
+        Called as uninterpreted(support) for every sub-function with the sorted indices of the regulators it
+        depends on; returns MathML application of an uninterpreted function replacing the sub-function or None
+    memo : dict, optional
+        Expressions of the sub-functions converted before
+
+    Returns
+    -------
+    str
+    """
+    memo = {} if memo is None else memo
+    if table in memo:
+        return memo[table]
+    full, lows = cofactor_masks(arity)
+    if table == 0 or table == full:
+        return '<false/>' if table == 0 else '<true/>'
+    cofactors = []
+    for var, low in enumerate(lows):
+        step = 1 << var
+        off = table & low
+        on = (table >> step) & low
+        if off != on:
+            cofactors.append((var, off | (off << step), on | (on << step)))
+    expression = uninterpreted([var for var, _, _ in cofactors])
+    if expression is None:
+        var, off, on = next((cofactor for cofactor in cofactors if 0 in cofactor[1:] or full in cofactor[1:]),
+                            cofactors[0])
+        positive, negative = literals[var]
+        if len(cofactors) == 1:
+            expression = positive if on == full else negative
+        elif on in [0, full]:
+            rest = table_to_mathml(off, arity, literals, uninterpreted, memo)
+            expression = f'<apply><or/>{positive}{rest}</apply>' if on else f'<apply><and/>{negative}{rest}</apply>'
+        elif off in [0, full]:
+            rest = table_to_mathml(on, arity, literals, uninterpreted, memo)
+            expression = f'<apply><or/>{negative}{rest}</apply>' if off else f'<apply><and/>{positive}{rest}</apply>'
+        else:
+            on_expression = table_to_mathml(on, arity, literals, uninterpreted, memo)
+            off_expression = table_to_mathml(off, arity, literals, uninterpreted, memo)
+            if not off & ~on:  # increasing in the regulator
+                expression = f'<apply><or/>{off_expression}<apply><and/>{positive}{on_expression}</apply></apply>'
+            elif not on & ~off:  # decreasing in the regulator
+                expression = f'<apply><or/>{on_expression}<apply><and/>{negative}{off_expression}</apply></apply>'
+            else:
+                expression = (f'<apply><or/><apply><and/>{positive}{on_expression}</apply>'
+                              f'<apply><and/>{negative}{off_expression}</apply></apply>')
+    memo[table] = expression
+    return expression
+
+
+def write_truth_table_transitions(sbml_f, indptr, regulators, signs, seed_: int, l_bound: int, u_bound: int,
+                                  kind: str, uninterpreted_frac: float, callback=None) -> None:
+    """Writes transitions with update functions sampled as truth tables (see 'sample_truth_tables')
+
+    Every regulated vertex gets an update function. Truth tables of a block of vertices are sampled at once for each
+    in-degree, so the draws of a vertex depend only on the seed and on the block. Each sub-function of the
+    expression (see 'table_to_mathml') depending on 'l_bound' to 'u_bound' regulators is replaced by an
+    uninterpreted function of them with probability 'uninterpreted_frac', so the network stays parametrised. Signs
+    of the 'random' functions don't follow the drawn types of the regulations: each regulation is written as
+    positive or negative if the function is monotone in it and as dual otherwise.
+
+    Parameters
+    ----------
+    sbml_f
+        sbml file
+    indptr
+        Offsets of the regulators of each vertex, in-degrees can be at most MAX_TABLE_ARITY (MAX_RANDOM_TABLE_ARITY
+        for 'random' functions)
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations, True for activating
+    seed_ : int
+        Seed of the update functions
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    kind : str
+        'random', 'canalising' or 'monotone'
+    uninterpreted_frac : float
+        Probability of replacing a sub-function by an uninterpreted function
+    callback : callable, optional
+        See 'write_transitions'
+
+    Returns
+    -------
+    None
+    """
+    num_of_vertices = len(indptr) - 1
+    in_degrees = numpy.diff(indptr)
+    max_arity = MAX_RANDOM_TABLE_ARITY if kind == 'random' else MAX_TABLE_ARITY
+    if num_of_vertices and in_degrees.max() > max_arity:
+        raise ValueError(f"{kind.capitalize()} truth-table update functions support at most {max_arity} regulators "
+                         f"of a vertex, got {in_degrees.max()}; limit the in-degrees by 'in_degree_cap'")
+    rng = numpy.random.default_rng(seed_)
+    sign_names = numpy.array(['negative', 'positive', 'dual'])
+    sbml_f.write('<qual:listOfTransitions xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    for start in range(0, num_of_vertices, CALLBACK_INTERVAL):
+        if callback is not None and start > 0:
+            callback(start)
+        end = min(start + CALLBACK_INTERVAL, num_of_vertices)
+        degrees = in_degrees[start:end]
+        tables = [None] * (end - start)
+        written_signs = [None] * (end - start)
+        for arity in numpy.unique(degrees[degrees > 0]).tolist():
+            vertices = numpy.flatnonzero(degrees == arity)
+            positions = indptr[start + vertices, None] + numpy.arange(arity)
+            vertex_signs = numpy.asarray(signs[indptr[start]:indptr[end]], dtype=bool)[positions - indptr[start]]
+            sampled = sample_truth_tables(arity, vertex_signs, kind, rng)
+            if kind == 'random':  # the function depends on every regulator, so it can't be both
+                increasing, decreasing = cofactor_order(sampled, arity)
+                names = sign_names[numpy.where(increasing, 1, numpy.where(decreasing, 0, 2))]
+            else:
+                names = sign_names[vertex_signs.astype(int)]
+            for vertex, table, vertex_names in zip(vertices.tolist(), sampled, names.tolist()):
+                tables[vertex] = int.from_bytes(table.tobytes(), 'little')
+                written_signs[vertex] = vertex_names
+        for offset in range(end - start):
+            vertex = start + offset
+            regs = numpy.asarray(regulators[indptr[vertex]:indptr[vertex + 1]]).tolist()
+            parts = [f'<qual:transition qual:id="tr_X{vertex}"><qual:listOfInputs>']
+            for reg, sign in zip(regs, written_signs[offset] or []):
+                parts.append(f'<qual:input qual:id="tr_X{reg}_in_X{vertex}" qual:qualitativeSpecies="X{reg}" '
+                             f'qual:sign="{sign}" qual:transitionEffect="none"/>')
+            parts.append(f'</qual:listOfInputs><qual:listOfOutputs><qual:output qual:id="tr_X{vertex}_out" '
+                         f'qual:qualitativeSpecies="X{vertex}" qual:transitionEffect="assignmentLevel"/>'
+                         f'</qual:listOfOutputs>')
+            if regs:
+                literals = [(f'<apply><eq/><ci>X{reg}</ci><cn type="integer">1</cn></apply>',
+                             f'<apply><not/><apply><eq/><ci>X{reg}</ci><cn type="integer">1</cn></apply></apply>')
+                            for reg in regs]
+                functions = []
+
+                def uninterpreted(support):
+                    if not l_bound <= len(support) <= u_bound or rng.random() >= uninterpreted_frac:
+                        return None
+                    functions.append(support)
+                    return (f'<apply><csymbol>F{vertex}_{len(functions) - 1}</csymbol>'
+                            f'{"".join(f"<ci>X{regs[var]}</ci>" for var in support)}</apply>')
+
+                parts.append('<qual:listOfFunctionTerms><qual:defaultTerm qual:resultLevel="0"/>'
+                             '<qual:functionTerm qual:resultLevel="1">'
+                             '<math xmlns="http://www.w3.org/1998/Math/MathML">')
+                parts.append(table_to_mathml(tables[offset], len(regs), literals, uninterpreted))
+                parts.append('</math></qual:functionTerm></qual:listOfFunctionTerms>')
+            parts.append('</qual:transition>')
+            sbml_f.write(''.join(parts))
+    sbml_f.write('</qual:listOfTransitions>')
+
+
+"""-------------------------------------------------BINARY SNAPSHOTS-------------------------------------------------"""
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot_arrays(snapshot, indptr, regulators, signs, meta: dict, mmap=False) -> None:
+    """Saves the network given as CSR arrays as a binary snapshot
+
+    Snapshot contains the regulations in CSR arrays (see 'edges_to_csr') and the metadata needed to serialize the
+    network again (seed of the update functions, arity bounds and generator parameters). Update functions are derived
+    from the stored seed, so the snapshot exported by 'snapshot_to_sbml' is identical to the network written by
+    'generate_bn'.
+
+    Parameters
+    ----------
+    snapshot
+        Path of the '.npz' file, or of the directory of '.npy' arrays if 'mmap' is set
+    indptr
+        Offsets of the regulators of each vertex
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations, True for activating
+    meta : dict
+        JSON serializable metadata; has to contain 'vertices', 'seed_trans', 'l_bound' and 'u_bound'
+    mmap : bool, optional
+        Store the arrays as separate '.npy' files in a directory, so they can be memory-mapped when loaded
+
+    Returns
+    -------
+    None
+    """
+    meta = dict(meta, version=SNAPSHOT_VERSION)
+    if mmap:
+        makedirs(snapshot, exist_ok=True)
+        numpy.save(path.join(snapshot, 'indptr.npy'), indptr)
+        numpy.save(path.join(snapshot, 'regulators.npy'), regulators)
+        numpy.save(path.join(snapshot, 'signs.npy'), signs)
+        with open(path.join(snapshot, 'meta.json'), 'w') as js:
+            json.dump(meta, js)
+    else:
+        numpy.savez_compressed(snapshot, indptr=indptr, regulators=regulators, signs=signs,
+                               meta=numpy.array(json.dumps(meta)))
+
+
+def load_snapshot(snapshot, mmap=True) -> tuple:
+    """Loads the network saved by 'save_snapshot_arrays'
+
+    Parameters
+    ----------
+    snapshot
+        Path of the '.npz' file or of the directory of '.npy' arrays
+    mmap : bool, optional
+        Memory-map the arrays of a directory snapshot instead of reading them (ignored for '.npz')
+
+    Returns
+    -------
+    tuple
+        (indptr, regulators, signs, meta)
+    """
+    if path.isdir(snapshot):
+        mode = 'r' if mmap else None
+        indptr = numpy.load(path.join(snapshot, 'indptr.npy'), mmap_mode=mode)
+        regulators = numpy.load(path.join(snapshot, 'regulators.npy'), mmap_mode=mode)
+        signs = numpy.load(path.join(snapshot, 'signs.npy'), mmap_mode=mode)
+        with open(path.join(snapshot, 'meta.json'), 'r') as js:
+            meta = json.load(js)
+    else:
+        with numpy.load(snapshot, allow_pickle=False) as npz:
+            indptr = npz['indptr']
+            regulators = npz['regulators']
+            signs = npz['signs']
+            meta = json.loads(str(npz['meta']))
+    if meta.get('version', 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot {snapshot} has unsupported version {meta['version']}")
+    return indptr, regulators, signs, meta
+
+
+def snapshot_to_sbml(snapshot, sbml_file=None, l_bound=None, u_bound=None, workers=None) -> str:
+    """Re-exports a binary snapshot to SBML qual
+
+    Parameters
+    ----------
+    snapshot
+        Path of the '.npz' file or of the directory of '.npy' arrays
+    sbml_file : str, optional
+        Output file, by default the snapshot path with the '.sbml' extension
+    l_bound : int, optional
+        Overrides the stored lower bound of the arity of the uninterpreted functions
+    u_bound : int, optional
+        Overrides the stored upper bound of the arity of the uninterpreted functions
+    workers : int, optional
+        Number of worker processes serializing the network (see 'write_transitions_from_arrays')
+
+    Returns
+    -------
+    str
+        Name of the written file
+    """
+    indptr, regulators, signs, meta = load_snapshot(snapshot)
+    if sbml_file is None:
+        stem = snapshot.rstrip('/\\') if path.isdir(snapshot) else path.splitext(snapshot)[0]
+        sbml_file = stem + '.sbml'
+    l_bound = meta['l_bound'] if l_bound is None else l_bound
+    u_bound = meta['u_bound'] if u_bound is None else u_bound
+    tmp_name = partial_name(sbml_file)
+    try:
+        with open(tmp_name, 'w+') as sbml_f:
+            write_network_arrays_to_sbml(sbml_f, meta['vertices'], indptr, regulators, signs, meta['seed_trans'],
+                                         l_bound, u_bound, block_edges=CALLBACK_INTERVAL * 64, workers=workers,
+                                         functions=meta.get('functions', 'chains'),
+                                         uninterpreted_frac=meta.get('uninterpreted_frac', 0.5),
+                                         names=meta.get('names'))
+        publish_output(tmp_name, sbml_file)
+    except BaseException:
+        remove_output(tmp_name)
+        raise
+    return sbml_file
+
+
+"""------------------------------------------------COMPLEXITY BUDGET------------------------------------------------"""
+
+
+def complexity_from_in_degrees(in_degrees, seed_trans: int, l_bound: int, u_bound: int) -> dict:
+    """Estimates how expensive the parametrised network is for parameter synthesis
+
+    Size of the parametrisation space is bounded from above by counting 2^(2^k) Boolean functions for every
+    uninterpreted function of arity k and for every implicit update function of a vertex with k regulators. The
+    update functions are planned by 'plan_update_functions', so the result matches the written network.
+
+    Parameters
+    ----------
+    in_degrees
+        In-degree of each vertex
+    seed_trans : int
+        Seed passed to 'write_transitions'
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+
+    Returns
+    -------
+    dict
+        'max_in_degree', 'uninterpreted_functions' (their number) and 'log2_parametrisations' (upper bound of the
+        log2 size of the parametrisation space)
+    """
+    in_degrees = numpy.asarray(in_degrees, dtype=numpy.int64)
+    has_function, plan = plan_update_functions(in_degrees, seed_trans, l_bound, u_bound)
+    max_in_degree = int(in_degrees.max()) if len(in_degrees) else 0
+    num_of_functions = 0
+    log2_params = 0
+    degrees, counts = numpy.unique(in_degrees[has_function], return_counts=True)
+    for in_degree, count in zip(degrees.tolist(), counts.tolist()):
+        arities = [len(literal) for literal in planned_update_function(plan, in_degree)[1] if literal is not None]
+        num_of_functions += count * len(arities)
+        log2_params += count * sum(2 ** arity for arity in arities)
+    degrees, counts = numpy.unique(in_degrees[~has_function], return_counts=True)
+    log2_params += sum(count * 2 ** in_degree for in_degree, count in zip(degrees.tolist(), counts.tolist()))
+    return {'max_in_degree': max_in_degree, 'uninterpreted_functions': num_of_functions,
+            'log2_parametrisations': log2_params}
+
+
+def fits_budget(complexity: dict, max_log2_params=None, max_in_degree=None, max_functions=None) -> bool:
+    """Checks the complexity of the network (see 'complexity_from_in_degrees') against the budget
+
+    Parameters
+    ----------
+    complexity : dict
+        Result of 'complexity_from_in_degrees'
+    max_log2_params : int, optional
+        Maximal log2 size of the parametrisation space
+    max_in_degree : int, optional
+        Maximal in-degree of a vertex
+    max_functions : int, optional
+        Maximal number of uninterpreted functions
+
+    Returns
+    -------
+    bool
+        True if none of the set bounds is exceeded
+    """
+    return (max_log2_params is None or complexity['log2_parametrisations'] <= max_log2_params) and \
+        (max_in_degree is None or complexity['max_in_degree'] <= max_in_degree) and \
+        (max_functions is None or complexity['uninterpreted_functions'] <= max_functions)
+
+
+"""-----------------------------------------DEGREE-PRESERVING RANDOMISATION-----------------------------------------"""
+
+
+def local_name(tag: str) -> str:
+    """Strips the namespace from the tag or the attribute name of an xml element"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def read_sbml_regulations(network) -> tuple:
+    """Extracts the regulation graph from a model in the SBML qual format
+
+    Every input of a transition regulates every output of the transition. Only positive and negative regulations
+    are supported, the randomised networks couldn't keep dual regulations or regulations of unknown type.
+
+    Parameters
+    ----------
+    network
+        SBML qual file
+
+    Returns
+    -------
+    tuple
+        (species, targets, regulators, signs), where 'species' is the list of ids of the qualitative species, vertex
+        'v' of the edge arrays being 'species[v]'
+
+    Raises
+    ------
+    ValueError
+        If the model has a dual regulation or a regulation without a type
+    """
+    species = []
+    targets = []
+    regulators = []
+    signs = []
+    unsupported = []
+    for _, element in ET.iterparse(network):
+        tag = local_name(element.tag)
+        if tag == 'qualitativeSpecies':
+            species.append({local_name(key): value for key, value in element.attrib.items()}['id'])
+        elif tag == 'transition':
+            inputs = [{local_name(key): value for key, value in child.attrib.items()}
+                      for child in element.iter() if local_name(child.tag) == 'input']
+            outputs = [{local_name(key): value for key, value in child.attrib.items()}['qualitativeSpecies']
+                       for child in element.iter() if local_name(child.tag) == 'output']
+            for output in outputs:
+                for reg in inputs:
+                    if reg.get('sign') not in ['positive', 'negative']:
+                        unsupported.append(f"{reg['qualitativeSpecies']} -> {output} ({reg.get('sign', 'no type')})")
+                    targets.append(output)
+                    regulators.append(reg['qualitativeSpecies'])
+                    signs.append(reg.get('sign') == 'positive')
+            element.clear()
+    if unsupported:
+        raise ValueError(f"Only positive and negative regulations can be randomised, {network} has "
+                         f"{len(unsupported)} other: {', '.join(unsupported[:5])}")
+    index = {name: vertex for vertex, name in enumerate(species)}
+    return species, numpy.array([index[name] for name in targets], dtype=numpy.int64), \
+        numpy.array([index[name] for name in regulators], dtype=numpy.int64), numpy.array(signs, dtype=bool)
+
+
+def degree_preserving_swaps(num_of_vertices: int, targets, regulators, signs, swaps_per_edge: int, seed: int) -> tuple:
+    """Randomises regulations by swapping targets of pairs of regulations with the same sign
+
+    Swap of r1 -> t1 and r2 -> t2 gives r1 -> t2 and r2 -> t1, so in-degree and out-degree of every vertex, split
+    into activating and inhibiting regulations, stay the same. In each round, all regulations are paired at random
+    and all swaps are proposed at once; swaps creating a self-regulation or a repeated regulation are rejected.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    targets
+        Regulated vertex of each edge
+    regulators
+        Regulator of each edge
+    signs
+        Types of the regulations, True for activating
+    swaps_per_edge : int
+        Number of rounds, i.e. number of proposed swaps per regulation
+    seed : int
+        Seed value
+
+    Returns
+    -------
+    tuple
+        (targets, regulators, signs) numpy arrays
+    """
+    targets = numpy.array(targets, dtype=numpy.int64)
+    regulators = numpy.asarray(regulators, dtype=numpy.int64)
+    signs = numpy.asarray(signs, dtype=bool)
+    classes = [numpy.flatnonzero(signs), numpy.flatnonzero(~signs)]
+    numpy.random.seed(seed)
+    for _ in range(swaps_per_edge):
+        pairs = [numpy.random.permutation(edges)[:len(edges) // 2 * 2].reshape(-1, 2) for edges in classes]
+        first, second = numpy.concatenate(pairs).T
+        old_first = targets[first]
+        old_second = targets[second]
+        proposed = (old_first != old_second) & (old_second != regulators[first]) & (old_first != regulators[second])
+        first, second, old_first, old_second = first[proposed], second[proposed], old_first[proposed], \
+            old_second[proposed]
+        targets[first] = old_second
+        targets[second] = old_first
+        while len(first):  # reject swaps creating repeated regulations until there are none
+            keys = targets * num_of_vertices + regulators
+            order = numpy.argsort(keys, kind='stable')
+            same = keys[order[1:]] == keys[order[:-1]]
+            repeated = numpy.zeros(len(keys), dtype=bool)
+            repeated[order[1:][same]] = True
+            repeated[order[:-1][same]] = True
+            rejected = repeated[first] | repeated[second]
+            if not rejected.any():
+                break
+            targets[first[rejected]] = old_first[rejected]
+            targets[second[rejected]] = old_second[rejected]
+            accepted = ~rejected
+            first, second, old_first, old_second = first[accepted], second[accepted], old_first[accepted], \
+                old_second[accepted]
+    return targets, regulators, signs
+
+
+def write_randomised_network(out_name: str, num_of_vertices: int, targets, regulators, signs, seed: int,
+                             swaps_per_edge: int, l_bound: int, u_bound: int, fingerprint=False) -> tuple:
+    """Randomises the regulation graph (see 'degree_preserving_swaps') and writes it as a parametrised network
+
+    Runs in a worker process of 'generate_degree_preserving_ensemble'.
+
+    Parameters
+    ----------
+    out_name : str
+        Output sbml file
+    num_of_vertices : int
+        Number of vertices
+    targets
+        Regulated vertex of each edge
+    regulators
+        Regulator of each edge
+    signs
+        Types of the regulations, True for activating
+    seed : int
+        Seed value of the network
+    swaps_per_edge : int
+        See 'degree_preserving_swaps'
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    fingerprint : bool, optional
+        Computes fingerprint of the network (see 'network_fingerprint')
+
+    Returns
+    -------
+    tuple
+        (size, fingerprint), size of the written file in bytes and the fingerprint or None
+    """
+    numpy.random.seed(seed)
+    seeds = list(numpy.random.randint(MAXSIZE, size=2))
+    targets, regulators, signs = degree_preserving_swaps(num_of_vertices, targets, regulators, signs, swaps_per_edge,
+                                                         int(seeds[0]))
+    indptr, regulators, signs = edges_to_csr(num_of_vertices, targets, regulators, signs)
+    tmp_name = partial_name(out_name)
+    try:
+        with open(tmp_name, 'w') as sbml_f:
+            write_network_arrays_to_sbml(sbml_f, num_of_vertices, indptr, regulators, signs, int(seeds[1]),
+                                         l_bound, u_bound)
+        publish_output(tmp_name, out_name)
+    except BaseException:
+        remove_output(tmp_name)
+        raise
+    return output_size(out_name), (network_fingerprint(indptr, regulators, signs, int(seeds[1]), l_bound, u_bound)
+                                   if fingerprint else None)
+
+
+def generate_degree_preserving_ensemble(network, n: int, seed: int, swaps_per_edge=10, l_bound=2, u_bound=4, loc="",
+                                        workers=None, progress=None, cancel=None, shard=None, dedup=None,
+                                        fingerprints=None, max_attempts=1000) -> dict:
+    """Generates randomised parametrised networks with the degrees and signs of regulations of the given model
+
+    Regulation graph of the model is extracted once (see 'read_sbml_regulations'); each network of the ensemble
+    randomises it by 'degree_preserving_swaps' and gets new update functions, as in 'generate_bn'. Vertices are
+    renamed to X0, X1, ... in the order of the species of the model. Networks are generated in 'workers' processes,
+    each network depends only on 'seed' and its index.
+
+    Parameters
+    ----------
+    network
+        SBML qual model
+    n : int
+        Number of networks to generate
+    seed : int
+        Seed value
+    swaps_per_edge : int, optional
+        See 'degree_preserving_swaps'
+    l_bound : int, optional
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int, optional
+        Upper bound of the arity of the uninterpreted functions
+    loc : str, optional
+        Directory to store the networks in
+    workers : int, optional
+        Number of worker processes
+    progress : callable, optional
+        See 'generate_bn', called after each network
+    cancel : optional
+        See 'generate_bn', checked before each network is started; networks already being generated are finished
+    shard : tuple or str, optional
+        See 'generate_bn'
+    dedup : str, optional
+        See 'generate_bn'. The workers return fingerprints of the written networks and they are compared in the
+        order of the networks, so the same networks are kept as in a serial run
+    fingerprints : dict, optional
+        See 'generate_bn'
+    max_attempts : int, optional
+        Number of networks sampled for one output network before giving up on finding a unique one
+
+    Returns
+    -------
+    dict
+        Report in the same form as in 'generate_bn'
+    """
+    if dedup not in [None, 'drop', 'resample']:
+        raise ValueError(f"Unsupported deduplication {dedup}")
+    species, targets, regulators, signs = read_sbml_regulations(network)
+    num_of_vertices = len(species)
+    f_name = path.splitext(path.basename(network))[0]
+    numpy.random.seed(seed)
+    network_seeds = list(numpy.random.randint(MAXSIZE, size=n))
+    report = {'accepted': 0, 'rejected': 0, 'duplicates': 0, 'cancelled': False}
+    if dedup is not None and fingerprints is None:
+        fingerprints = {}
+    indices = shard_indices(n, shard)
+    bytes_written = 0
+    networks = []
+
+    def tasks():
+        for i in indices:
+            if cancel is not None and cancel.is_set():
+                report['cancelled'] = True
+                return
+            yield i, (f'{loc}randomised_{f_name}_w{swaps_per_edge}_s{seed}_l{l_bound}_u{u_bound}_{i}.sbml',
+                      num_of_vertices, targets, regulators, signs, int(network_seeds[i]), swaps_per_edge, l_bound,
+                      u_bound, dedup is not None)
+
+    def done(i, task, result):
+        nonlocal bytes_written
+        size, fingerprint = result
+        duplicate_of = None
+        for attempt in range(max_attempts):
+            if dedup is None or not is_duplicate(fingerprints, fingerprint, path.basename(task[0])):
+                break
+            report['duplicates'] += 1
+            remove_output(task[0])
+            if dedup == 'drop':
+                duplicate_of = fingerprints[fingerprint]
+                break
+            # duplicate is resampled with a seed derived from the previous one, in order, so it is deterministic
+            numpy.random.seed(task[5])
+            task = task[:5] + (int(numpy.random.randint(MAXSIZE)),) + task[6:]
+            size, fingerprint = write_randomised_network(*task)
+        else:
+            remove_output(task[0])
+            raise RuntimeError(f"No unique network found in {max_attempts} attempts")
+        if duplicate_of is not None:
+            networks.append({'index': i, 'file': path.basename(task[0]), 'seed': task[5], 'duplicate_of': duplicate_of})
+        else:
+            report['accepted'] += 1
+            bytes_written += size
+            networks.append({'index': i, 'file': path.basename(task[0]), 'seed': task[5], 'bytes': size})
+        if progress is not None:
+            progress(len(networks), len(indices), report['accepted'] * num_of_vertices, bytes_written)
+
+    if workers is None or workers <= 1:
+        for i, task in tasks():
+            done(i, task, write_randomised_network(*task))
+    else:
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            try:
+                for i, task in tasks():
+                    pending.append((i, task, executor.submit(write_randomised_network, *task)))
+                    if len(pending) >= 2 * workers:
+                        i, task, future = pending.popleft()
+                        done(i, task, future.result())
+                while pending:
+                    i, task, future = pending.popleft()
+                    done(i, task, future.result())
+            except BaseException:
+                for _, _, future in pending:
+                    future.cancel()
+                raise
+    if shard is not None:
+        config = {'generator': f'randomised_{f_name}', 'seed': seed, 'n': n, 'num_of_vertices': num_of_vertices,
+                  'swaps_per_edge': swaps_per_edge, 'l_bound': l_bound, 'u_bound': u_bound}
+        write_manifest(loc, f'randomised_{f_name}_w{swaps_per_edge}_s{seed}_l{l_bound}_u{u_bound}', config, shard,
+                       report, networks)
+    return report
+
+
+"""---------------------------------------------TOPOLOGY-FIXED VARIANTS---------------------------------------------"""
+
+
+def generator_name(probability, num_of_connections, ba=False, ws=False, directed_ba=False, directed_config=False,
+                   directed_ws=False, topology=None, block_model=None) -> str:
+    """Returns the part of the name of the output file describing the model of the network"""
+    if topology is not None:
+        return topology['name']
+    if block_model is not None:  # blocks may be too many for the name
+        sizes, probabilities = block_model
+        digest = hashlib.sha1(json.dumps([numpy.asarray(sizes).tolist(),
+                                          numpy.asarray(probabilities).tolist()]).encode()).hexdigest()
+        return f'sbm_{sizes if numpy.ndim(sizes) == 0 else len(sizes)}_{digest[:8]}'
+    if directed_ba:
+        return f'dba_{num_of_connections}'
+    if directed_config:
+        return f'dconf_{num_of_connections}'
+    if directed_ws:
+        return f'dws_{num_of_connections}_{probability}'
+    if ba or ws:
+        return f'ba_{num_of_connections}' if ba else f'ws_{num_of_connections}_{probability}'
+    return f'rand_{probability}'
+
+
+def cached_topology(topology_cache, key: dict, **model) -> tuple:
+    """Generates topology of a network (see 'generate_network_arrays' with frac_reg=None) or loads it from cache
+
+    Parameters
+    ----------
+    topology_cache : str
+        Directory of the cache, nothing is cached if it is None
+    key : dict
+        Parameters of the model, the number of vertices and the seed identifying the topology
+    model
+        Arguments of 'generate_network_arrays'
+
+    Returns
+    -------
+    tuple
+        (indptr, regulators, sign_draws, seed_trans)
+    """
+    if topology_cache is None:
+        return generate_network_arrays(frac_reg=None, **model)
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    file_name = path.join(topology_cache, f'topology_{digest[:20]}.npz')
+    if path.isfile(file_name):
+        with numpy.load(file_name) as npz:
+            return npz['indptr'], npz['regulators'], npz['sign_draws'], int(npz['seed_trans'])
+    indptr, regulators, sign_draws, seed_trans = generate_network_arrays(frac_reg=None, **model)
+    makedirs(topology_cache, exist_ok=True)
+    tmp_name = f'{file_name}.{getpid()}.tmp.npz'
+    numpy.savez(tmp_name, indptr=indptr, regulators=regulators, sign_draws=sign_draws, seed_trans=seed_trans)
+    replace(tmp_name, file_name)  # concurrent runs never see a partial file
+    return indptr, regulators, sign_draws, seed_trans
+
+
+def generate_variants(num_of_vertices: int, seed: int, variants: list, probability=0, num_of_connections=0,
+                      l_bound=2, u_bound=4, frac_reg=0.8, ba=False, ws=False, random=False, loc="", n=1,
+                      in_degree_cap=None, in_degree_dist=None, directed_ba=False, directed_config=False,
+                      directed_ws=False, out_degree_dist=None, topology_cache=None, workers=None, progress=None,
+                      cancel=None, topology=None, shard=None, block_model=None, write_buffers=8) -> dict:
+    """Writes several parametrisations of each network, generating its topology only once
+
+    Topology of a network doesn't depend on 'l_bound', 'u_bound' and 'frac_reg': orientation of the edges and the
+    uniform draws of the signs (see 'draw_signs') are generated once, optionally cached on disk in 'topology_cache'
+    keyed by the model, its parameters, the number of vertices and the seed. Every variant then only derives the
+    signs and plans the update functions. Each file is identical to the one 'generate_bn' writes with the variant's
+    arguments. With more 'workers', variants are written in parallel and the topology is shared with the workers
+    through shared memory, so it isn't copied to each of them.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    seed : int
+        Seed value
+    variants : list
+        Dicts overriding 'l_bound', 'u_bound' and 'frac_reg'
+    loc : str, optional
+        Directory to store the networks in
+    n : int, optional
+        Number of networks, each of them is written in every variant
+    topology_cache : str, optional
+        Directory to cache the topologies in
+    workers : int, optional
+        Number of worker processes writing the variants (or serializing the only variant, see 'generate_bn')
+    progress : callable, optional
+        See 'generate_bn', networks are counted over all variants
+    cancel : optional
+        See 'generate_bn'
+    shard : tuple or str, optional
+        See 'generate_bn', the manifest lists every variant of each network
+    write_buffers : int, optional
+        See 'generate_bn'. Variants written in parallel by the workers are written directly by them
+
+    See 'generate_bn' for the other parameters.
+
+    Returns
+    -------
+    dict
+        Report in the same form as in 'generate_bn'
+    """
+    gen = generator_name(probability, num_of_connections, ba, ws, directed_ba, directed_config, directed_ws, topology,
+                         block_model)
+    variants = [dict({'l_bound': l_bound, 'u_bound': u_bound, 'frac_reg': frac_reg}, **variant) for variant in variants]
+    model = {'num_of_vertices': num_of_vertices, 'probability': probability, 'num_of_connections': num_of_connections,
+             'ba': ba, 'ws': ws, 'random': random, 'in_degree_cap': in_degree_cap, 'in_degree_dist': in_degree_dist,
+             'directed_ba': directed_ba, 'directed_config': directed_config, 'directed_ws': directed_ws,
+             'out_degree_dist': out_degree_dist, 'topology': topology, 'block_model': block_model}
+    key = dict(model, topology=None if topology is None else topology_digest(topology),
+               block_model=None if block_model is None else [numpy.asarray(part).tolist() for part in block_model])
+    names = None if topology is None else topology['names']
+    numpy.random.seed(seed)
+    network_seeds = list(numpy.random.randint(MAXSIZE, size=n))
+    report = {'accepted': 0, 'rejected': 0, 'cancelled': False}
+    indices = shard_indices(n, shard)
+    total = len(indices) * len(variants)
+    bytes_written = 0
+    networks = []
+    # one pool serves all networks, either writing their variants or serializing the only variant
+    executor = ProcessPoolExecutor(max_workers=workers) if workers is not None and workers > 1 else None
+    in_parallel = executor is not None and len(variants) > 1
+    writer = BackgroundWriter(write_buffers) if write_buffers and not in_parallel else None
+    try:
+        for i in indices:
+            if cancel is not None and cancel.is_set():
+                report['cancelled'] = True
+                break
+            indptr, regulators, sign_draws, seed_trans = cached_topology(
+                topology_cache, dict(key, seed=int(network_seeds[i])), seed=int(network_seeds[i]), **model)
+            signs = {frac: signs_from_draws(sign_draws, frac) for frac in {variant['frac_reg'] for variant in variants}}
+            del sign_draws
+            tasks = [(f'{loc}bn_{gen}_s{seed}_l{variant["l_bound"]}_u{variant["u_bound"]}_f{variant["frac_reg"]}'
+                      f'_n{num_of_vertices}_{i}.sbml', variant) for variant in variants]
+
+            def done(out_name, size):
+                nonlocal bytes_written
+                report['accepted'] += 1
+                bytes_written += size
+                networks.append({'index': i, 'file': path.basename(out_name), 'seed': int(network_seeds[i]),
+                                 'bytes': size})
+                if progress is not None:
+                    progress(report['accepted'], total, report['accepted'] * num_of_vertices, bytes_written)
+
+            if not in_parallel:
+                for out_name, variant in tasks:
+                    if cancel is not None and cancel.is_set():
+                        report['cancelled'] = True
+                        break
+                    done(out_name, write_variant(out_name, num_of_vertices, indptr, regulators,
+                                                 signs[variant['frac_reg']], seed_trans, variant['l_bound'],
+                                                 variant['u_bound'], workers, executor, writer, names))
+                if report['cancelled']:
+                    break
+                continue
+            # variants are written in parallel, the workers attach to one shared copy of the topology
+            blocks, specs = share_arrays(dict({'indptr': indptr, 'regulators': regulators},
+                                              **{f'signs_{frac}': signs[frac] for frac in signs}))
+            pending = deque()
+            try:
+                for out_name, variant in tasks:
+                    if cancel is not None and cancel.is_set():
+                        report['cancelled'] = True
+                        break
+                    pending.append((out_name, executor.submit(write_shared_variant, out_name, num_of_vertices,
+                                                              {'indptr': specs['indptr'],
+                                                               'regulators': specs['regulators'],
+                                                               'signs': specs[f'signs_{variant["frac_reg"]}']},
+                                                              seed_trans, variant['l_bound'],
+                                                              variant['u_bound'], names)))
+                    if len(pending) >= 2 * workers:
+                        out_name, future = pending.popleft()
+                        done(out_name, future.result())
+                while pending:
+                    out_name, future = pending.popleft()
+                    done(out_name, future.result())
+            except BaseException:
+                for _, future in pending:
+                    future.cancel()
+                raise
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+            if report['cancelled']:
+                break
+        if writer is not None:
+            writer.wait()
+    finally:
+        if writer is not None:
+            writer.close()
+        if executor is not None:
+            executor.shutdown()
+    if shard is not None:
+        config = {'generator': gen, 'seed': seed, 'n': n, 'num_of_vertices': num_of_vertices, 'variants': variants}
+        write_manifest(loc, f'{gen}_s{seed}_n{num_of_vertices}_variants', config, shard, report, networks)
+    return report
+
+
+def write_variant(out_name: str, num_of_vertices: int, indptr, regulators, signs, seed_trans: int, l_bound: int,
+                  u_bound: int, workers=None, executor=None, writer=None, names=None) -> int:
+    """Writes one variant of the network to sbml file (see 'write_network_arrays_to_sbml')
+
+    Parameters
+    ----------
+    out_name : str
+        Name of the sbml file, it is written under a temporary name and renamed once it is complete
+    num_of_vertices : int
+        Number of vertices
+    indptr
+        Offsets of the regulators of each vertex
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations of the variant, True for activating
+    seed_trans : int
+        Seed for generating seeds needed in 'write_update_function' function
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    workers : int, optional
+        Number of worker processes serializing the network
+    executor : ProcessPoolExecutor, optional
+        See 'write_transitions_from_arrays'
+    writer : BackgroundWriter, optional
+        Writer of the file, it is renamed by the writer thread once it is written; the file is written directly
+        by default
+    names : list, optional
+        See 'write_vertices_to_sbml'
+
+    Returns
+    -------
+    int
+        Size of the written file in bytes
+    """
+    tmp_name = partial_name(out_name)
+    try:
+        with writer.open(tmp_name) if writer is not None else open(tmp_name, 'w+') as sbml_f:
+            write_network_arrays_to_sbml(sbml_f, num_of_vertices, indptr, regulators, signs, seed_trans, l_bound,
+                                         u_bound, block_edges=CALLBACK_INTERVAL * 64, workers=workers,
+                                         executor=executor, names=names)
+            size = sbml_f.tell()
+            if writer is not None:
+                sbml_f.on_close = partial(publish_output, tmp_name, out_name)
+        if writer is None:
+            publish_output(tmp_name, out_name)
+    except BaseException:
+        if writer is not None:
+            writer.wait(raise_errors=False)
+        remove_output(tmp_name)
+        raise
+    return size
+
+
+def write_shared_variant(out_name: str, num_of_vertices: int, specs: dict, seed_trans: int, l_bound: int,
+                         u_bound: int, names=None) -> int:
+    """Writes one variant of the network whose arrays are in shared memory (see 'share_arrays')
+
+    Runs in a worker process of 'generate_variants'. Arrays aren't copied, only blocks of vertices are converted
+    to Python objects while they are written, so the memory of a worker doesn't depend on the size of the network.
+
+    Parameters
+    ----------
+    out_name : str
+        Name of the sbml file
+    num_of_vertices : int
+        Number of vertices
+    specs : dict
+        (block name, dtype, shape) of the 'indptr', 'regulators' and 'signs' arrays (see 'attach_arrays')
+    seed_trans : int
+        Seed for generating seeds needed in 'write_update_function' function
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    names : list, optional
+        See 'write_vertices_to_sbml'
+
+    Returns
+    -------
+    int
+        Size of the written file in bytes
+    """
+    blocks, arrays = attach_arrays(specs)
+    try:
+        return write_variant(out_name, num_of_vertices, arrays['indptr'], arrays['regulators'], arrays['signs'],
+                             seed_trans, l_bound, u_bound, names=names)
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def share_arrays(arrays: dict) -> tuple:
+    """Copies numpy arrays to shared memory blocks, so other processes can attach to them (see 'attach_arrays')
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays by their names
+
+    Returns
+    -------
+    tuple
+        (blocks, specs), where 'blocks' are the shared memory blocks that the caller closes and unlinks once they
+        aren't needed and 'specs' are (block name, dtype, shape) of each array
+    """
+    blocks = []
+    specs = {}
+    try:
+        for name, array in arrays.items():
+            array = numpy.asarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            blocks.append(block)
+            numpy.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            specs[name] = (block.name, array.dtype.str, array.shape)
+    except BaseException:
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+    return blocks, specs
+
+
+def attach_arrays(specs: dict) -> tuple:
+    """Attaches to the arrays published by 'share_arrays' without copying them
+
+    Blocks aren't registered in the resource tracker of the attaching process: they belong to the process that
+    created them, which unlinks them, and a tracker of a worker would report them as leaked (and unlink them) once
+    the worker exits.
+
+    Parameters
+    ----------
+    specs : dict
+        (block name, dtype, shape) of each array
+
+    Returns
+    -------
+    tuple
+        (blocks, arrays), the caller closes the blocks once the arrays aren't used anymore
+    """
+    blocks = []
+    arrays = {}
+    for name, (block_name, dtype, shape) in specs.items():
+        block = attach_block(block_name)
+        blocks.append(block)
+        arrays[name] = numpy.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def attach_block(name: str):
+    """Attaches to an existing shared memory block without registering it in the resource tracker
+
+    Parameters
+    ----------
+    name : str
+        Name of the block
+
+    Returns
+    -------
+    SharedMemory
+        Attached block
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+"""-------------------------------------------------TOPOLOGY IMPORT-------------------------------------------------"""
+
+SIGN_NAMES = {'+': True, '1': True, 'positive': True, 'activation': True, 'activating': True, 'true': True,
+              '-': False, '-1': False, '0': False, 'negative': False, 'inhibition': False, 'inhibiting': False,
+              'repression': False, 'false': False}
+
+
+def parse_signs(values):
+    """Converts names of the types of regulations (see 'SIGN_NAMES') to bools, True for activating
+
+    Parameters
+    ----------
+    values
+        Names of the types of regulations
+
+    Returns
+    -------
+    numpy.ndarray
+        Signs
+    """
+    names, inverse = numpy.unique(numpy.asarray(values), return_inverse=True)
+    names = [(name.decode() if isinstance(name, bytes) else str(name)).strip().lower() for name in names.tolist()]
+    unknown = [name for name in names if name not in SIGN_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown types of regulations: {', '.join(unknown[:5])}")
+    return numpy.array([SIGN_NAMES[name] for name in names], dtype=bool)[inverse.reshape(-1)]
+
+
+def topology_from_columns(name: str, regulators, targets, signs=None) -> dict:
+    """Builds the imported topology from the columns of an edge list
+
+    Vertices named by non-negative integers keep their numbers, otherwise they are numbered in the sorted order of
+    their names. Repeated regulations are dropped. Types of single regulations may be missing (None), they are then
+    drawn with 'frac_reg' when the network is generated.
+
+    Parameters
+    ----------
+    name : str
+        Name of the topology, used in the names of the output files
+    regulators
+        Regulator of each edge
+    targets
+        Regulated vertex of each edge
+    signs : optional
+        Types of the regulations, True for activating, or their names (see 'parse_signs')
+
+    Returns
+    -------
+    dict
+        'name', 'num_of_vertices', 'names' (of the vertices), 'targets', 'regulators', 'signs' (None if not given)
+        and 'known_signs' (bool values to determine the given types if some of them are missing, otherwise None)
+    """
+    regulators = numpy.asarray(regulators)
+    targets = numpy.asarray(targets)
+    try:
+        numbers = regulators.astype(numpy.int64), targets.astype(numpy.int64)
+        numbered = not len(targets) or min(numbers[0].min(), numbers[1].min()) >= 0
+    except ValueError:
+        numbered = False
+    if numbered:
+        regulators, targets = numbers
+        num_of_vertices = int(max(regulators.max(), targets.max())) + 1 if len(targets) else 0
+        names = None
+    else:
+        names, inverse = numpy.unique(numpy.concatenate([regulators, targets]), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        regulators, targets = inverse[:len(regulators)], inverse[len(regulators):]
+        num_of_vertices = len(names)
+        names = [name.decode() if isinstance(name, bytes) else name for name in names.tolist()]
+    known = None
+    if signs is not None and not isinstance(signs, numpy.ndarray) and None in signs:
+        known = numpy.array([sign is not None for sign in signs], dtype=bool)
+        signs = None if not known.any() else [sign if sign is not None else '+' for sign in signs]
+    if signs is not None:
+        signs = numpy.asarray(signs)
+        signs = signs if signs.dtype == bool else parse_signs(signs)
+        if known is not None:  # missing types are carried through the deduplication as code 2
+            signs = numpy.where(known, signs, 2).astype(numpy.int8)
+        targets, regulators, signs = drop_duplicate_edges(targets, regulators, signs)
+        if known is not None:
+            known = signs != 2
+            signs = signs == 1
+    else:
+        known = None
+        targets, regulators, _ = drop_duplicate_edges(targets, regulators, numpy.zeros(len(targets), dtype=bool))
+    return {'name': name, 'num_of_vertices': num_of_vertices, 'names': names, 'targets': targets,
+            'regulators': regulators, 'signs': signs, 'known_signs': known}
+
+
+def read_edge_list(file_name: str) -> dict:
+    """Reads the topology from a plain edge list
+
+    Each line contains a regulator, a regulated vertex and optionally the type of the regulation (see 'SIGN_NAMES'),
+    separated by whitespace (by commas in .csv files). Lines starting with # are skipped. The whole file is split
+    into one numpy array of tokens, no graph objects are built.
+
+    Parameters
+    ----------
+    file_name : str
+        Edge list file
+
+    Returns
+    -------
+    dict
+        See 'topology_from_columns'
+    """
+    with open(file_name, 'rb') as f:
+        data = f.read()
+    if b'#' in data:
+        data = b'\n'.join(line for line in data.splitlines() if not line.lstrip().startswith(b'#'))
+    if file_name.endswith('.csv'):
+        data = data.replace(b',', b' ')
+    tokens = numpy.array(data.split(), dtype=bytes)
+    chars = numpy.frombuffer(data, dtype=numpy.uint8)
+    space = numpy.isin(chars, numpy.frombuffer(b' \t\n\r\x0b\x0c', dtype=numpy.uint8))
+    starts = ~space & numpy.r_[True, space[:-1]][:len(chars)]  # first characters of the tokens
+    widths = numpy.bincount(numpy.cumsum(chars == ord('\n'))[starts])  # number of tokens on each line
+    widths = widths[widths > 0]
+    width = int(widths[0]) if len(widths) else 2
+    if width not in [2, 3] or (widths != width).any():
+        line = 1 + int(numpy.argmax(widths != width)) if width in [2, 3] else 1
+        raise ValueError(f"Edge list {file_name} has to have 2 or 3 columns on every line, line {line} (not "
+                         f"counting empty lines and comments) has {widths[line - 1]}")
+    columns = tokens.reshape(-1, width)
+    return topology_from_columns(path.splitext(path.basename(file_name))[0], columns[:, 0], columns[:, 1],
+                                 columns[:, 2] if columns.shape[1] == 3 else None)
+
+
+def read_graphml(file_name: str) -> dict:
+    """Reads the topology from a GraphML file
+
+    Edges go from the regulator (source) to the regulated vertex (target). Edge attribute named 'sign', 'type' or
+    'regulation' gives the type of the regulation (see 'SIGN_NAMES'); edges without it get the default of the
+    attribute, if it has one, otherwise their types are drawn with 'frac_reg' (see 'topology_from_columns').
+    Vertices are numbered in the order of the nodes in the file, their ids are kept as their names.
+
+    Parameters
+    ----------
+    file_name : str
+        GraphML file
+
+    Returns
+    -------
+    dict
+        See 'topology_from_columns'
+    """
+    sign_keys = {}  # ids of the attributes with the types of the regulations and their defaults
+    index = {}
+    regulators = []
+    targets = []
+    signs = []
+    for _, element in ET.iterparse(file_name):
+        tag = local_name(element.tag)
+        if tag == 'key' and element.get('attr.name') in ['sign', 'type', 'regulation'] and \
+                element.get('for') in ['edge', 'all']:
+            sign_keys[element.get('id')] = next((child.text or '' for child in element
+                                                 if local_name(child.tag) == 'default'), None)
+        elif tag == 'node':
+            index.setdefault(element.get('id'), len(index))
+            element.clear()
+        elif tag == 'edge':
+            regulators.append(element.get('source'))
+            targets.append(element.get('target'))
+            signs.append(next((child.text or '' for child in element
+                               if local_name(child.tag) == 'data' and child.get('key') in sign_keys),
+                              next((default for default in sign_keys.values() if default is not None), None)))
+            element.clear()
+    for vertex in regulators + targets:  # edges may refer to nodes that aren't declared
+        index.setdefault(vertex, len(index))
+    name = path.splitext(path.basename(file_name))[0]
+    topology = topology_from_columns(name, [index[vertex] for vertex in regulators],
+                                     [index[vertex] for vertex in targets], signs if signs else None)
+    topology['num_of_vertices'] = len(index)
+    topology['names'] = list(index)
+    return topology
+
+
+def load_topology(topology) -> dict:
+    """Loads the topology to be parametrised by 'generate_bn' (argument 'topology')
+
+    Parameters
+    ----------
+    topology
+        GraphML file (.graphml), NumPy array or .npy file with columns regulator, target and optionally sign
+        (non-zero for activating), or an edge list file (see 'read_edge_list')
+
+    Returns
+    -------
+    dict
+        See 'topology_from_columns'
+    """
+    if isinstance(topology, str) and topology.endswith('.graphml'):
+        return read_graphml(topology)
+    if isinstance(topology, str) and not topology.endswith('.npy'):
+        return read_edge_list(topology)
+    name = path.splitext(path.basename(topology))[0] if isinstance(topology, str) else 'edges'
+    edges = numpy.load(topology) if isinstance(topology, str) else numpy.asarray(topology)
+    edges = edges.reshape(-1, 2) if edges.ndim == 1 else edges
+    if edges.ndim != 2 or edges.shape[1] not in [2, 3]:
+        raise ValueError("Edge array has to have 2 or 3 columns")
+    return topology_from_columns(name, edges[:, 0], edges[:, 1], edges[:, 2] != 0 if edges.shape[1] == 3 else None)
+
+
+def topology_digest(topology: dict) -> str:
+    """Returns hash of the imported topology, used as a key of the topology cache (see 'cached_topology')"""
+    digest = hashlib.sha1()
+    for array in [topology['targets'], topology['regulators'], topology['signs']]:
+        digest.update(b'-' if array is None else numpy.ascontiguousarray(array).tobytes())
+    if topology.get('known_signs') is not None:
+        digest.update(numpy.ascontiguousarray(topology['known_signs']).tobytes())
+    return f"{topology['num_of_vertices']}_{digest.hexdigest()}"
+
+
+"""---------------------------------------------STRUCTURAL DEDUPLICATION---------------------------------------------"""
+
+
+def mix_hashes(values):
+    """Mixes bits of 64-bit values (finalizer of splitmix64), element-wise"""
+    values = numpy.asarray(values, dtype=numpy.uint64)
+    values = (values ^ (values >> numpy.uint64(30))) * numpy.uint64(0xbf58476d1ce4e5b9)
+    values = (values ^ (values >> numpy.uint64(27))) * numpy.uint64(0x94d049bb133111eb)
+    return values ^ (values >> numpy.uint64(31))
+
+
+def segment_sums(values, indptr):
+    """Sums of the 64-bit hashes in segments values[indptr[i]:indptr[i + 1]] (wrapping around)"""
+    sums = numpy.concatenate([numpy.zeros(1, dtype=numpy.uint64), numpy.cumsum(values, dtype=numpy.uint64)])
+    return sums[indptr[1:]] - sums[indptr[:-1]]
+
+
+def network_fingerprint(indptr, regulators, signs, seed_trans: int, l_bound: int, u_bound: int,
+                        iterations=3) -> str:
+    """Computes a canonical fingerprint of a parametrised network, the same for networks differing only in numbering
+
+    Weisfeiler-Lehman refinement over the signed regulation graph: each vertex starts with a label of its in-degree,
+    out-degree and whether it gets an update function, and in each iteration hashes its label with the multisets of
+    labels of its regulators and targets. Each regulation carries its sign and its role in the update function of
+    the target (position of the literal and its shape, see 'planned_update_function'), so networks with the same
+    graph but different update functions differ. Multisets are hashed as wrapping sums of 64-bit hashes, so one
+    iteration is a few vectorised passes over the edges. Different fingerprints mean syntactically different
+    networks, which may still have the same dynamics; equal fingerprints mean isomorphic networks with an
+    overwhelming probability for the generated networks.
+
+    Parameters
+    ----------
+    indptr
+        Regulators of vertex i are regulators[indptr[i]:indptr[i + 1]]
+    regulators
+        Regulators of all vertices
+    signs
+        Types of the regulations, True for activating
+    seed_trans : int
+        Seed of the update functions
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    iterations : int, optional
+        Number of refinement iterations
+
+    Returns
+    -------
+    str
+        Hexadecimal fingerprint
+    """
+    indptr = numpy.asarray(indptr, dtype=numpy.int64)
+    regulators = numpy.asarray(regulators, dtype=numpy.int64)
+    signs = numpy.asarray(signs, dtype=bool)
+    num_of_vertices = len(indptr) - 1
+    in_degrees = numpy.diff(indptr)
+    out_degrees = numpy.bincount(regulators, minlength=num_of_vertices)
+    targets = numpy.repeat(numpy.arange(num_of_vertices), in_degrees)
+    has_function, plan = plan_update_functions(in_degrees, seed_trans, l_bound, u_bound)
+    roles = numpy.zeros(len(regulators), dtype=numpy.uint64)
+    positions = numpy.arange(len(regulators)) - indptr[targets]
+    for in_degree in numpy.unique(in_degrees[has_function]).tolist():
+        operators, literals = planned_update_function(plan, in_degree)
+        role_of_position = numpy.array([int.from_bytes(hashlib.sha1(f'{operators}{idx}{literal}'.encode()).digest()[:8],
+                                                       'little') for idx, literal in enumerate(literals)],
+                                       dtype=numpy.uint64)
+        selected = has_function[targets] & (in_degrees[targets] == in_degree)
+        roles[selected] = role_of_position[positions[selected]]
+    edge_labels = mix_hashes(roles ^ signs.astype(numpy.uint64))
+    labels = mix_hashes((in_degrees.astype(numpy.uint64) << numpy.uint64(33)) ^
+                        (out_degrees.astype(numpy.uint64) << numpy.uint64(1)) ^ has_function.astype(numpy.uint64))
+    by_regulator = numpy.argsort(regulators, kind='stable')
+    out_indptr = numpy.concatenate([[0], numpy.cumsum(out_degrees)])
+    for _ in range(iterations):
+        incoming = segment_sums(mix_hashes(labels[regulators] + edge_labels), indptr)
+        outgoing = segment_sums(mix_hashes(labels[targets] ^ edge_labels)[by_regulator], out_indptr)
+        labels = mix_hashes(labels + mix_hashes(incoming ^ numpy.uint64(0x9e3779b97f4a7c15)) + mix_hashes(outgoing))
+    header = numpy.array([num_of_vertices, len(regulators)], dtype=numpy.uint64)
+    return hashlib.sha1(header.tobytes() + numpy.sort(labels).tobytes()).hexdigest()
+
+
+def is_duplicate(fingerprints, fingerprint: str, name: str) -> bool:
+    """Records the fingerprint of network 'name', returns True if another network had the same one
+
+    'fingerprints' is a dict mapping the fingerprints to the names of the first networks, or a dict shared by several
+    processes (multiprocessing.Manager().dict()), whose 'setdefault' is atomic.
+    """
+    return fingerprints.setdefault(fingerprint, name) != name
+
+
+"""-----------------------------------------------DYNAMICS PRE-SCREEN------------------------------------------------"""
+
+
+ALL_ONES = numpy.uint64(0xFFFFFFFFFFFFFFFF)
+SIGNATURE_MEMBERS = 4  # number of the 64 bits of a state signature each vertex is counted in
+
+
+def instance_words(bits, words_per_instance: int):
+    """Spreads (..., instantiations) bools to uint64 words, each instantiation owning 'words_per_instance' words"""
+    return numpy.where(numpy.repeat(bits, words_per_instance, axis=-1), ALL_ONES, numpy.uint64(0))
+
+
+def instance_generators(seed_trans: int, instances) -> list:
+    """Returns a random generator for each of the instantiations, instantiation 'r' always draws from the same one"""
+    return [numpy.random.default_rng([seed_trans, instance]) for instance in instances]
+
+
+def random_words(rngs: list, num_of_vertices: int, words_per_instance: int):
+    """Draws a (vertices, words) uint64 array of random bits, the words of each instantiation from its generator"""
+    return numpy.concatenate([rng.integers(0, ALL_ONES, size=(num_of_vertices, words_per_instance),
+                                           dtype=numpy.uint64, endpoint=True) for rng in rngs], axis=1)
+
+
+def instantiation_program(indptr, regulators, signs, seed_trans: int, l_bound: int, u_bound: int, rngs: list,
+                          words_per_instance: int, shared) -> dict:
+    """Compiles random instantiations of the update functions of a network to a bit-parallel program
+
+    Every update function is turned into a nested canalising function: a list of layers (signal, input, output)
+    checked in order, the first signal equal to its input sets the value to the output, 'default' is used if none
+    does. An and/or chain of 'write_planned_transition' is exactly such a function of its literals, inputs and
+    outputs of the layers are given by the operators. Uninterpreted functions within the chains are instantiated as
+    random truth tables of their arguments, update functions left unknown as random nested canalising functions
+    consistent with the signs of the regulations (in a random order of the regulators shared by the instantiations)
+    and unregulated vertices without an update function as random constants.
+
+    Each instantiation owns 'words_per_instance' consecutive uint64 words of the state (one trajectory per bit),
+    so the inputs, outputs, defaults and tables are stored as words too and all instantiations are evaluated at
+    once by 'evaluate_program'. Each instantiation draws from its own generator (see 'instance_generators'), so an
+    instantiation is the same whichever other instantiations are compiled with it.
+
+    Parameters
+    ----------
+    indptr, regulators, signs
+        CSR arrays of the network (see 'generate_network_arrays')
+    seed_trans : int
+        Seed of the update functions
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    rngs : list
+        numpy.random.Generator of each instantiation
+    words_per_instance : int
+        Number of uint64 words of the state of one instantiation
+    shared
+        numpy.random.Generator drawing the order of the regulators shared by the instantiations
+
+    Returns
+    -------
+    dict
+        'vertices', 'functions' (a list of (arguments, tables) per arity of the uninterpreted functions, the rows
+        of the signals are the vertices followed by the uninterpreted functions in this order), 'default' and the
+        layers: 'order' of the vertices with layers by their number of layers (most first), 'counts' of the layers
+        at each position from the last layer of every vertex to the first one and their 'signals', negated 'inputs'
+        and 'outputs', position by position, each in the 'order' of the vertices
+    """
+    num_of_vertices = len(indptr) - 1
+    in_degrees = numpy.diff(indptr)
+    signs = numpy.asarray(signs, dtype=bool)
+    has_function, plan = plan_update_functions(in_degrees, seed_trans, l_bound, u_bound)
+    offsets = numpy.asarray(indptr).tolist()
+    regs = numpy.asarray(regulators).tolist()
+    sgns = signs.tolist()
+    functions = {}  # arity -> list of argument lists
+    chains = []  # (vertex, layers from the first one, each a (signal or None, regulator, input, output))
+    for vertex in numpy.flatnonzero(has_function).tolist():
+        start, in_degree = offsets[vertex], int(in_degrees[vertex])
+        operators, literals = planned_update_function(plan, in_degree)
+        which = plan['which'][:in_degree - 1].tolist()
+        layers = []
+        for idx in range(in_degree - 1, -1, -1):
+            value = which[in_degree - 1 - idx] if idx else 1  # or: true literal gives 1, and: false literal gives 0
+            if literals[idx] is None:
+                layers.append((None, regs[start + idx], int(value == sgns[start + idx]), value))
+            else:
+                arguments = [regs[start + pos] for pos in literals[idx]]
+                functions.setdefault(len(arguments), []).append(arguments)
+                layers.append(((len(arguments), len(functions[len(arguments)]) - 1), None, value, value))
+        chains.append((vertex, layers))
+    # signals of the uninterpreted functions follow the vertices, grouped by arity
+    arities = sorted(functions)
+    first_signal = {}
+    row = num_of_vertices
+    for arity in arities:
+        first_signal[arity] = row
+        row += len(functions[arity])
+    vertex_l, position_l, signal_l, input_l, output_l = [], [], [], [], []
+    for vertex, layers in chains:
+        for position, (function, regulator, input_, output) in enumerate(reversed(layers)):
+            vertex_l.append(vertex)
+            position_l.append(position)
+            signal_l.append(regulator if function is None else first_signal[function[0]] + function[1])
+            input_l.append(input_)
+            output_l.append(output)
+    program = {'vertices': num_of_vertices, 'functions': []}
+    for arity in arities:
+        arguments = numpy.array(functions[arity], dtype=numpy.int64)
+        tables = numpy.stack([rng.random((len(arguments), 2 ** arity)) < 0.5 for rng in rngs], axis=-1)
+        program['functions'].append((arguments, instance_words(tables, words_per_instance)))
+    # unknown functions, layers of each vertex in a random order shared by the instantiations
+    unknown = numpy.flatnonzero(~has_function & (in_degrees > 0))
+    counts = in_degrees[unknown]
+    firsts = numpy.cumsum(counts) - counts
+    edges = numpy.arange(counts.sum()) - numpy.repeat(firsts - numpy.asarray(indptr)[unknown], counts)
+    edge_vertices = numpy.repeat(unknown, counts)
+    positions = numpy.empty(len(edges), dtype=numpy.int64)
+    positions[numpy.lexsort((shared.random(len(edges)), edge_vertices))] = \
+        numpy.arange(len(edges)) - numpy.repeat(firsts, counts)
+    inputs = numpy.stack([rng.random(len(edges)) < 0.5 for rng in rngs], axis=-1)
+    outputs = inputs == signs[edges, None]  # sign-consistent canalising outputs
+    default = numpy.zeros((num_of_vertices, len(rngs)), dtype=bool)
+    # default is the negated output of the last layer, so that the layer isn't redundant
+    default[edge_vertices[positions == 0]] = ~outputs[positions == 0]
+    constants = numpy.flatnonzero(~has_function & (in_degrees == 0))
+    default[constants] = numpy.stack([rng.random(len(constants)) < 0.5 for rng in rngs], axis=-1)
+    program['default'] = instance_words(default, words_per_instance)
+    vertex_a = numpy.concatenate([numpy.array(vertex_l, dtype=numpy.int64), edge_vertices])
+    position_a = numpy.concatenate([numpy.array(position_l, dtype=numpy.int64), positions])
+    signal_a = numpy.concatenate([numpy.array(signal_l, dtype=numpy.int64), numpy.asarray(regulators)[edges]])
+    input_a = numpy.concatenate([numpy.repeat(numpy.array(input_l, dtype=bool)[:, None], len(rngs), axis=1),
+                                 inputs])
+    output_a = numpy.concatenate([numpy.repeat(numpy.array(output_l, dtype=bool)[:, None], len(rngs), axis=1),
+                                  outputs])
+    # a vertex with k layers has positions 0, ..., k - 1, so the vertices with a layer at a position are a prefix of
+    # 'order' and each position updates a slice of the values
+    num_of_layers = numpy.bincount(vertex_a, minlength=num_of_vertices)
+    order = numpy.argsort(-num_of_layers, kind='stable')[:numpy.count_nonzero(num_of_layers)]
+    rows = numpy.empty(num_of_vertices, dtype=numpy.int64)
+    rows[order] = numpy.arange(len(order))
+    entries = numpy.lexsort((rows[vertex_a], position_a))
+    program.update(order=order, counts=numpy.bincount(position_a).tolist(), signals=signal_a[entries],
+                   inputs=~instance_words(input_a[entries], words_per_instance),
+                   outputs=instance_words(output_a[entries], words_per_instance))
+    return program
+
+
+def evaluate_program(program: dict, state):
+    """Returns the next state of all vertices for a (vertices, words) uint64 array of states (see
+    'instantiation_program'), every bit of a word is a separate trajectory"""
+    signals = state
+    if program['functions']:
+        values = [state]
+        for arguments, tables in program['functions']:
+            table = tables
+            for idx in range(arguments.shape[1] - 1, -1, -1):  # Shannon expansion by the highest argument first
+                low = table[:, :table.shape[1] // 2]
+                table = table[:, table.shape[1] // 2:] ^ low
+                table &= state[arguments[:, idx], None, :]
+                table ^= low
+            values.append(table[:, 0])
+        signals = numpy.concatenate(values)
+    hits = signals[program['signals']]
+    hits ^= program['inputs']  # inputs are negated, so the bits where the signal equals the input are set
+    outputs = program['outputs']
+    value = program['default'][program['order']]
+    start = 0
+    for count in program['counts']:  # from the last layer, the first layer that is hit sets the value
+        head = value[:count]
+        changed = outputs[start:start + count] ^ head
+        changed &= hits[start:start + count]
+        head ^= changed
+        start += count
+    state = program['default'].copy()
+    state[program['order']] = value
+    return state
+
+
+def lexicographic_min(first, second):
+    """Returns the lexicographically smaller state of every trajectory (bit) of two (vertices, words) uint64 arrays,
+    vertex 0 being the most significant"""
+    differ = first ^ second
+    equal_before = numpy.bitwise_and.accumulate(~differ, axis=0)
+    take = first & differ  # second is smaller where the first differing vertex is set in first
+    take[1:] &= equal_before[:-1]
+    return first ^ (differ & numpy.bitwise_or.reduce(take, axis=0))
+
+
+def trajectory_hashes(state, keys):
+    """Returns a 64-bit hash of the state of every trajectory, the sum of random 'keys' of its active vertices"""
+    hashes = numpy.zeros(state.shape[1] * 64, dtype=numpy.uint64)
+    for start in range(0, len(state), 1024):
+        bits = numpy.unpackbits(state[start:start + 1024].view(numpy.uint8), axis=1, bitorder='little')
+        hashes += keys[start:start + 1024] @ bits
+    return hashes
+
+
+def signature_members(num_of_vertices: int, rng) -> tuple:
+    """Assigns each vertex to SIGNATURE_MEMBERS distinct bits of the state signature (see 'state_signatures')
+
+    Returns
+    -------
+    tuple
+        (rows, bounds), vertices grouped by the bits and the bounds of the group of each bit
+    """
+    bits = numpy.argpartition(rng.random((num_of_vertices, 64)), SIGNATURE_MEMBERS, axis=1)[:, :SIGNATURE_MEMBERS]
+    order = numpy.argsort(bits.ravel(), kind='stable')
+    return order // SIGNATURE_MEMBERS, numpy.searchsorted(bits.ravel()[order], numpy.arange(65))
+
+
+def state_signatures(state, rows, bounds):
+    """Returns a 64-bit signature of the state of every trajectory, bit j being the parity of the vertices assigned
+    to it by 'signature_members'
+
+    Much cheaper than 'trajectory_hashes', it tells the states apart only: states differing in a single vertex
+    always have different signatures, states differing in more vertices rarely have the same one.
+    """
+    parity = numpy.zeros((len(rows) + 1, state.shape[1]), dtype=numpy.uint64)
+    numpy.bitwise_xor.accumulate(state[rows], axis=0, out=parity[1:])
+    planes = numpy.ascontiguousarray(parity[bounds[1:]] ^ parity[bounds[:-1]])  # bit j of all trajectories
+    bits = numpy.unpackbits(planes.view(numpy.uint8), axis=1, bitorder='little')
+    return numpy.ascontiguousarray(numpy.packbits(bits, axis=0, bitorder='little').T).view(numpy.uint64).ravel()
+
+
+def unpack_words(words):
+    """Returns indices of the set bits of uint64 words, bit b of word w is the trajectory 64 * w + b"""
+    bits = (words[:, None] >> numpy.arange(64, dtype=numpy.uint64)) & numpy.uint64(1)
+    return numpy.flatnonzero(bits.ravel())
+
+
+def simulate_instantiations(indptr, regulators, signs, seed_trans: int, l_bound: int, u_bound: int, instances: list,
+                            states=64, steps=100, window=64) -> dict:
+    """Simulates the given instantiations of a parametrised network (see 'dynamics_summary')
+
+    Returns
+    -------
+    dict
+        Lists of the numbers of attractors of each instantiation under the keys of the summary, number of the
+        'trivial' ones, 'max_cycle_length', 'max_complex_size' and numbers of 'unresolved' synchronous trajectories
+        and of all 'trajectories'
+    """
+    num_of_vertices = len(indptr) - 1
+    words_per_instance = -(-states // 64)
+    shared = numpy.random.default_rng(seed_trans)
+    keys = shared.integers(0, ALL_ONES, size=num_of_vertices, dtype=numpy.uint64, endpoint=True)
+    rows, bounds = signature_members(num_of_vertices, shared)
+    rngs = instance_generators(seed_trans, instances)
+    program = instantiation_program(indptr, regulators, signs, seed_trans, l_bound, u_bound, rngs,
+                                    words_per_instance, shared)
+    initial = random_words(rngs, num_of_vertices, words_per_instance)
+    num_of_trajectories = initial.shape[1] * 64
+
+    state = initial
+    for _ in range(steps):
+        state = evaluate_program(program, state)
+    start = state
+    period = numpy.zeros(num_of_trajectories, dtype=numpy.int64)
+    returned = numpy.zeros(initial.shape[1], dtype=numpy.uint64)
+    least = start  # lexicographically least state since 'start'
+    cycle_least = numpy.zeros_like(start)
+    for step in range(window):
+        state = evaluate_program(program, state)
+        now = numpy.bitwise_and.reduce(~(state ^ start), axis=0) & ~returned
+        if now.any():  # least state of a complete cycle identifies it, whatever state the trajectory started in
+            returned |= now
+            period[unpack_words(now)] = step + 1
+            cycle_least |= least & now
+            if (returned == ALL_ONES).all():
+                break
+        least = lexicographic_min(least, state)
+    sync_ids = trajectory_hashes(cycle_least, keys)
+
+    state = initial
+    for _ in range(steps):
+        update = random_words(rngs, num_of_vertices, words_per_instance)
+        state ^= (evaluate_program(program, state) ^ state) & update
+    # trajectories in a fixed point stay in it, only the others are followed through the window
+    fixed_words = numpy.bitwise_and.reduce(~(evaluate_program(program, state) ^ state), axis=0)
+    moving = numpy.flatnonzero(fixed_words != ALL_ONES)
+    least = state.copy()
+    signatures = numpy.empty((window, len(moving) * 64), dtype=numpy.uint64)
+    for step in range(window if len(moving) else 0):
+        if step:
+            update = random_words(rngs, num_of_vertices, words_per_instance)
+            state ^= (evaluate_program(program, state) ^ state) & update
+        part = state[:, moving]
+        signatures[step] = state_signatures(part, rows, bounds)
+        least[:, moving] = lexicographic_min(least[:, moving], part)
+    async_ids = trajectory_hashes(least, keys)
+    fixed_async = numpy.zeros(num_of_trajectories, dtype=bool)
+    fixed_async[unpack_words(fixed_words)] = True
+    async_sizes = numpy.ones(num_of_trajectories, dtype=numpy.int64)
+    if len(moving):
+        ordered = numpy.sort(signatures, axis=0)
+        async_sizes[(moving[:, None] * 64 + numpy.arange(64)).ravel()] = 1 + (ordered[1:] != ordered[:-1]).sum(axis=0)
+
+    per_instance = words_per_instance * 64
+    counts = {key: [] for key in ['fixed_points', 'sync_attractors', 'sync_cycles', 'async_attractors',
+                                  'async_complex']}
+    trivial = 0
+    for instance in range(len(instances)):
+        part = slice(instance * per_instance, (instance + 1) * per_instance)
+        resolved = period[part] > 0
+        sync = set(sync_ids[part][resolved].tolist())
+        cycles = set(sync_ids[part][period[part] > 1].tolist())
+        fixed = (sync - cycles) | set(async_ids[part][fixed_async[part]].tolist())
+        complex_ = set(async_ids[part][~fixed_async[part]].tolist())
+        counts['fixed_points'].append(len(fixed))
+        counts['sync_attractors'].append(len(sync))
+        counts['sync_cycles'].append(len(cycles))
+        counts['async_attractors'].append(len(complex_) + len(fixed & set(async_ids[part].tolist())))
+        counts['async_complex'].append(len(complex_))
+        trivial += bool(resolved.all()) and not cycles and not complex_ and len(fixed) == 1
+    return dict(counts, trivial=trivial, max_cycle_length=int(period.max()),
+                max_complex_size=int(async_sizes.max()), unresolved=int((period == 0).sum()),
+                trajectories=num_of_trajectories)
+
+
+def dynamics_summary(indptr, regulators, signs, seed_trans: int, l_bound: int, u_bound: int, instantiations=16,
+                     states=64, steps=100, window=64, executor=None, workers=None) -> dict:
+    """Estimates attractors of random instantiations of a parametrised network by simulating its dynamics
+
+    Every instantiation (see 'instantiation_program') is simulated from 'states' random initial states, all of them
+    at once with bit-parallel updates of uint64 words. Synchronous trajectories run 'steps' steps, then the period
+    of the state is searched for within 'window' steps; trajectories without one are counted as unresolved.
+    Asynchronous trajectories update each vertex with probability 1/2 in every step (the generalised asynchronous
+    update, which has the same fixed points and needs far fewer steps than updating a single vertex); after 'steps'
+    steps, the trajectories not in a fixed point are followed for 'window' more steps, which estimate the attractor
+    and its size. An attractor is identified by the hash of the lexicographically least of its states, which is
+    kept for each trajectory as it runs, so only one state per trajectory is hashed; the states in the window are
+    told apart by cheap signatures (see 'state_signatures'). The counts are estimates: long cycles and large complex
+    attractors aren't resolved within the window, and 'max_complex_size' is at most 'window' (the number of states
+    seen).
+
+    The time grows with the number of vertices and regulations times instantiations * states / 64 words times
+    2 * steps + 2 * window steps; with the defaults it takes about 0.3 s for 1000 vertices and 2 s for 5000 vertices
+    on a single core, still longer than generating such a network. With 'executor', the instantiations are split
+    among 'workers' processes; each instantiation draws from its own generator, so the summary is the same as
+    without it.
+
+    Parameters
+    ----------
+    indptr, regulators, signs
+        CSR arrays of the network (see 'generate_network_arrays')
+    seed_trans : int
+        Seed of the update functions, also seeds the instantiations and the simulation
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+    instantiations : int, optional
+        Number of random instantiations
+    states : int, optional
+        Number of initial states of each instantiation, rounded up to a multiple of 64
+    steps : int, optional
+        Number of steps before the attractors are searched for
+    window : int, optional
+        Number of steps the attractors are searched for in
+    executor : ProcessPoolExecutor, optional
+        Pool the instantiations are simulated in
+    workers : int, optional
+        Number of processes of 'executor'
+
+    Returns
+    -------
+    dict
+        Means over the instantiations of the numbers of 'fixed_points', 'sync_attractors', 'sync_cycles',
+        'async_attractors' and 'async_complex' (attractors that aren't fixed points), 'max_cycle_length' and
+        'max_complex_size' over all of them, fraction of 'unresolved' synchronous trajectories and fraction of
+        'trivial' instantiations, where every trajectory ends in the same fixed point
+    """
+    network = (numpy.asarray(indptr), numpy.asarray(regulators), numpy.asarray(signs), seed_trans, l_bound, u_bound)
+    if executor is None:
+        parts = [simulate_instantiations(*network, list(range(instantiations)), states, steps, window)]
+    else:
+        futures = [executor.submit(simulate_instantiations, *network, instances.tolist(), states, steps, window)
+                   for instances in numpy.array_split(numpy.arange(instantiations), min(workers, instantiations))]
+        try:
+            parts = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    counts = {key: sum((part[key] for part in parts), []) for key in ['fixed_points', 'sync_attractors',
+                                                                     'sync_cycles', 'async_attractors',
+                                                                     'async_complex']}
+    summary = {key: float(numpy.mean(values)) for key, values in counts.items()}
+    summary.update(max_cycle_length=max(part['max_cycle_length'] for part in parts),
+                   max_complex_size=max(part['max_complex_size'] for part in parts),
+                   unresolved=sum(part['unresolved'] for part in parts) / sum(part['trajectories'] for part in parts),
+                   trivial=sum(part['trivial'] for part in parts) / instantiations)
+    return summary
+
+
+def passes_screen(summary: dict, criteria: dict) -> bool:
+    """Checks a 'dynamics_summary' against the criteria, a dict mapping its keys to [min, max] bounds (None for an
+    unbounded side)"""
+    for key, (low, high) in criteria.items():
+        if key not in summary:
+            raise ValueError(f"Unknown dynamics criterion {key}")
+        if (low is not None and summary[key] < low) or (high is not None and summary[key] > high):
+            return False
+    return True
+
+
+def screen_network(indptr, regulators, signs, seed_trans: int, l_bound: int, u_bound: int, screen: dict,
+                   executor=None, workers=None) -> dict:
+    """Runs 'dynamics_summary' with the options of 'screen' (see 'generate_bn'), in 'executor' if given, and adds
+    whether the network 'passed' its 'criteria'"""
+    summary = dynamics_summary(indptr, regulators, signs, seed_trans, l_bound, u_bound,
+                               **{key: screen[key] for key in ['instantiations', 'states', 'steps', 'window']
+                                  if key in screen}, executor=executor, workers=workers)
+    summary['passed'] = passes_screen(summary, screen.get('criteria', {}))
+    return summary
+
+
+"""-----------------------------------------------ENSEMBLE STATISTICS------------------------------------------------"""
+
+
+class EnsembleStats:
+    """Mergeable statistics of an ensemble of networks, updated one network at a time in constant memory
+
+    Per-network values ('MOMENTS') are kept as their count, mean, sum of squared deviations, minimum and maximum,
+    so two summaries are merged exactly by the parallel algorithm of Chan et al.; per-vertex and per-function values
+    ('HISTOGRAMS') are kept as histograms summed over the networks. Memory therefore doesn't grow with the number
+    of networks, only the histograms grow up to the maximal degree. Statistics of shards or of separate runs are
+    combined by 'merge' (see also 'merge_manifests'), independently of the order up to rounding.
+    """
+    MOMENTS = ['regulations', 'activating_fraction', 'self_loops', 'functions']
+    HISTOGRAMS = ['in_degrees', 'out_degrees', 'arities']
+
+    def __init__(self):
+        self.moments = {key: [0, 0.0, 0.0, numpy.inf, -numpy.inf] for key in self.MOMENTS}
+        self.histograms = {key: numpy.zeros(0, dtype=numpy.int64) for key in self.HISTOGRAMS}
+
+    def add_value(self, key: str, value: float) -> None:
+        """Adds the 'value' of one network to the moments of 'key' (Welford's update of the mean and the squares)"""
+        count, mean, squares, low, high = self.moments[key]
+        count += 1
+        delta = value - mean
+        mean += delta / count
+        self.moments[key] = [count, mean, squares + delta * (value - mean), min(low, value), max(high, value)]
+
+    def add_histogram(self, key: str, counts) -> None:
+        """Adds 'counts' of the values 0, 1, 2, ... to the histogram of 'key', extending it if they are longer"""
+        histogram = self.histograms[key]
+        if len(counts) > len(histogram):
+            histogram = numpy.concatenate([histogram, numpy.zeros(len(counts) - len(histogram), dtype=numpy.int64)])
+        histogram[:len(counts)] += counts
+        self.histograms[key] = histogram
+
+    def update(self, indptr, regulators, signs, seed_trans=None, l_bound=2, u_bound=4) -> None:
+        """Adds a network given by its CSR arrays (see 'generate_network_arrays'); the uninterpreted functions are
+        counted from the plan of 'chains' update functions (see 'plan_update_functions') if 'seed_trans' is given"""
+        num_of_vertices = len(indptr) - 1
+        in_degrees = numpy.diff(indptr)
+        regulators = numpy.asarray(regulators)
+        signs = numpy.asarray(signs, dtype=bool)
+        self.add_value('regulations', len(regulators))
+        if len(signs):
+            self.add_value('activating_fraction', float(signs.mean()))
+        targets = numpy.repeat(numpy.arange(num_of_vertices), in_degrees)
+        self.add_value('self_loops', int(numpy.count_nonzero(targets == regulators)))
+        self.add_histogram('in_degrees', numpy.bincount(in_degrees))
+        self.add_histogram('out_degrees', numpy.bincount(numpy.bincount(regulators, minlength=num_of_vertices)))
+        if seed_trans is None:
+            return
+        has_function, plan = plan_update_functions(in_degrees, seed_trans, l_bound, u_bound)
+        functions = 0
+        arities = numpy.zeros(0, dtype=numpy.int64)
+        degrees, counts = numpy.unique(in_degrees[has_function], return_counts=True)
+        for in_degree, count in zip(degrees.tolist(), counts.tolist()):  # vertices of the same in-degree share it
+            literals = [len(literal) for literal in planned_update_function(plan, in_degree)[1] if literal]
+            functions += len(literals) * count
+            if literals:
+                arity_counts = numpy.bincount(literals) * count
+                arities = numpy.pad(arities, (0, max(0, len(arity_counts) - len(arities))))
+                arities[:len(arity_counts)] += arity_counts
+        self.add_value('functions', functions)
+        self.add_histogram('arities', arities)
+
+    def merge(self, other: 'EnsembleStats') -> 'EnsembleStats':
+        """Adds the networks of 'other' to these statistics and returns them"""
+        for key in self.MOMENTS:
+            count_a, mean_a, squares_a, low_a, high_a = self.moments[key]
+            count_b, mean_b, squares_b, low_b, high_b = other.moments[key]
+            count = count_a + count_b
+            if not count_b:
+                continue
+            delta = mean_b - mean_a
+            self.moments[key] = [count, mean_a + delta * count_b / count,
+                                 squares_a + squares_b + delta ** 2 * count_a * count_b / count,
+                                 min(low_a, low_b), max(high_a, high_b)]
+        for key in self.HISTOGRAMS:
+            self.add_histogram(key, other.histograms[key])
+        return self
+
+    def to_dict(self) -> dict:
+        """Returns the statistics as a JSON-serializable dict, loaded back by 'from_dict'"""
+        return {'moments': {key: [int(count), float(mean), float(squares)] +
+                            [float(value) if numpy.isfinite(value) else None for value in [low, high]]
+                            for key, (count, mean, squares, low, high) in self.moments.items()},
+                'histograms': {key: histogram.tolist() for key, histogram in self.histograms.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EnsembleStats':
+        """Returns the statistics stored by 'to_dict'"""
+        stats = cls()
+        for key, (count, mean, squares, low, high) in data['moments'].items():
+            stats.moments[key] = [count, mean, squares, numpy.inf if low is None else low,
+                                  -numpy.inf if high is None else high]
+        for key, histogram in data['histograms'].items():
+            stats.histograms[key] = numpy.array(histogram, dtype=numpy.int64)
+        return stats
+
+    def summary(self) -> dict:
+        """Returns the number of 'networks', mean, variance, min and max of the per-network values, distributions of
+        the in-degrees and out-degrees of all vertices and the histogram of the arities of the uninterpreted
+        functions"""
+        summary = {'networks': self.moments['regulations'][0]}
+        for key, (count, mean, squares, low, high) in self.moments.items():
+            if count:
+                summary[key] = {'mean': mean, 'variance': squares / (count - 1) if count > 1 else 0.0,
+                                'min': low, 'max': high}
+        for key in ['in_degrees', 'out_degrees']:
+            histogram = self.histograms[key]
+            summary[f'{key[:-1]}_distribution'] = (histogram / max(1, histogram.sum())).tolist()
+        summary['arities'] = self.histograms['arities'].tolist()  # number of functions of each arity
+        return summary
+
+
+def write_stats(file_name: str, config: dict, stats: EnsembleStats) -> str:
+    """Writes the statistics of a batch with their summary next to its networks, see 'EnsembleStats'"""
+    with open(f'{file_name}.tmp', 'w') as stats_f:
+        json.dump({'config': config, 'stats': stats.to_dict(), 'summary': stats.summary()}, stats_f, indent=1,
+                  default=int)
+    replace(f'{file_name}.tmp', file_name)
+    return file_name
+
+
+"""----------------------------------------------------SHARDING----------------------------------------------------"""
+
+
+def shard_indices(n: int, shard=None) -> range:
+    """Returns indices of the networks of a batch of 'n' networks belonging to the shard
+
+    Networks are assigned to the shards round-robin, so the shards get a similar amount of work. Every network
+    depends only on the seed of the batch and its index, so the union of the shards is the same batch as the one
+    generated at once, however many shards it is split to.
+
+    Parameters
+    ----------
+    n : int
+        Number of networks in the batch
+    shard : tuple or str, optional
+        (index, count) or 'index/count', index counted from 0. The whole batch if None
+
+    Returns
+    -------
+    range
+        Indices of the networks in the shard
+    """
+    if shard is None:
+        return range(n)
+    index, count = parse_shard(shard)
+    return range(index, n, count)
+
+
+def parse_shard(shard) -> tuple:
+    """Returns (index, count) of the shard given as a tuple or as 'index/count' (see 'shard_indices')"""
+    try:
+        index, count = (int(part) for part in shard.split('/')) if isinstance(shard, str) else shard
+    except ValueError:
+        raise ValueError(f"Shard has to be given as index/count, got {shard}")
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index has to be in range [0, {count}), got {index}")
+    return int(index), int(count)
+
+
+def write_manifest(loc: str, name: str, config: dict, shard, report: dict, networks: list, stats=None) -> str:
+    """Writes manifest of the networks generated by one shard of a batch
+
+    Parameters
+    ----------
+    loc : str
+        Directory of the networks
+    name : str
+        Name of the batch, the manifest is stored as manifest_{name}_shard{index}of{count}.json
+    config : dict
+        Parameters of the batch, manifests of the shards can only be merged if they are the same
+    shard : tuple or str
+        See 'shard_indices'
+    report : dict
+        Report of the generation, see 'generate_bn'
+    networks : list
+        Dict of each written network with its 'index', 'file' name, 'seed' and 'bytes' and the numbers of networks
+        'rejected', 'screened' and 'duplicates' resampled before it (the 'stats' of each network kept for resuming
+        are left out)
+    stats : EnsembleStats, optional
+        Statistics of the written networks, merged by 'merge_manifests'
+
+    Returns
+    -------
+    str
+        Name of the manifest
+    """
+    index, count = parse_shard(shard)
+    file_name = f'{loc}manifest_{name}_shard{index}of{count}.json'
+    manifest = {'config': config, 'shard': [index, count], 'cancelled': report['cancelled'],
+                'networks': sorted(({key: value for key, value in entry.items() if key != 'stats'}
+                                    for entry in networks), key=lambda entry: (entry['index'], entry['file']))}
+    if stats is not None:
+        manifest['stats'] = stats.to_dict()
+    with open(f'{file_name}.tmp', 'w') as manifest_f:
+        json.dump(manifest, manifest_f, indent=1)
+    replace(f'{file_name}.tmp', file_name)
+    return file_name
+
+
+def merge_manifests(manifests: list, out_file=None) -> dict:
+    """Merges manifests of the shards of a batch (see 'write_manifest')
+
+    The merged manifest doesn't depend on the number of shards or on the order of 'manifests'. Networks of the
+    batch missing in all the manifests (e.g. of a shard that failed or was cancelled) are listed in 'missing'.
+
+    Parameters
+    ----------
+    manifests : list
+        Names of the manifest files or the loaded manifests
+    out_file : str, optional
+        File to store the merged manifest to
+
+    Returns
+    -------
+    dict
+        Merged manifest with 'config', 'networks' and 'missing' indices; if all the manifests have statistics (see
+        'EnsembleStats'), also their merged 'stats' and its 'summary'
+    """
+    if not manifests:
+        raise ValueError("No manifests to merge")
+    loaded = []
+    for manifest in manifests:
+        if isinstance(manifest, str):
+            with open(manifest, 'r') as manifest_f:
+                manifest = json.load(manifest_f)
+        loaded.append(manifest)
+    config = loaded[0]['config']
+    networks = {}
+    for manifest in loaded:
+        if manifest['config'] != config:
+            raise ValueError("Manifests of different batches can't be merged")
+        for entry in manifest['networks']:
+            if networks.setdefault(entry['file'], entry) != entry:
+                raise ValueError(f"Manifests differ in network {entry['file']}")
+    networks = sorted(networks.values(), key=lambda entry: (entry['index'], entry['file']))
+    files_per_network = len(config.get('variants') or [None])
+    counts = numpy.bincount([entry['index'] for entry in networks], minlength=config['n'])
+    merged = {'config': config, 'networks': networks,
+              'missing': [int(i) for i in numpy.flatnonzero(counts[:config['n']] < files_per_network)]}
+    if all('stats' in manifest for manifest in loaded):
+        stats = EnsembleStats()
+        for manifest in loaded:
+            stats.merge(EnsembleStats.from_dict(manifest['stats']))
+        merged.update(stats=stats.to_dict(), summary=stats.summary())
+    if out_file is not None:
+        with open(f'{out_file}.tmp', 'w') as merged_f:
+            json.dump(merged, merged_f, indent=1)
+        replace(f'{out_file}.tmp', out_file)
+    return merged
+
+
+"""------------------------------------------------IN-MEMORY NETWORKS------------------------------------------------"""
+
+
+class ParametrisedNetwork:
+    """Parametrised network held in memory as CSR arrays (see 'edges_to_csr')
+
+    Regulators of vertex 'v' are 'regulators[indptr[v]:indptr[v + 1]]' with signs 'signs[indptr[v]:indptr[v + 1]]'.
+    Update functions are derived from 'seed_trans' and the arity bounds (see 'plan_update_functions'), so the network
+    is serialized exactly as 'generate_bn' writes it. Nothing is written to the disk unless asked by 'to_sbml' or
+    'save'.
+    """
+
+    def __init__(self, num_of_vertices: int, indptr, regulators, signs, seed_trans: int, l_bound: int, u_bound: int,
+                 meta=None):
+        self.num_of_vertices = num_of_vertices
+        self.indptr = indptr
+        self.regulators = regulators
+        self.signs = signs
+        self.seed_trans = seed_trans
+        self.l_bound = l_bound
+        self.u_bound = u_bound
+        self.meta = dict(meta or {}, vertices=num_of_vertices, seed_trans=seed_trans, l_bound=l_bound,
+                         u_bound=u_bound)
+        self._plan = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot, mmap=True):
+        """Loads the network from a binary snapshot (see 'load_snapshot')"""
+        indptr, regulators, signs, meta = load_snapshot(snapshot, mmap)
+        return cls(meta['vertices'], indptr, regulators, signs, meta['seed_trans'], meta['l_bound'], meta['u_bound'],
+                   meta)
+
+    @property
+    def num_of_edges(self) -> int:
+        return int(self.indptr[-1])
+
+    def in_degrees(self):
+        """Number of regulators of each vertex"""
+        return numpy.diff(self.indptr)
+
+    def targets(self):
+        """Regulated vertex of each regulation, aligned with 'regulators'"""
+        return numpy.repeat(numpy.arange(self.num_of_vertices), self.in_degrees())
+
+    def update_function_plan(self) -> tuple:
+        """Returns (has_function, plan) of the update functions (see 'plan_update_functions'), computed once"""
+        if self._plan is None:
+            self._plan = plan_update_functions(self.in_degrees(), self.seed_trans, self.l_bound, self.u_bound)
+        return self._plan
+
+    def update_function(self, vertex: int):
+        """Returns the shape of the update function of the vertex (see 'planned_update_function') or None"""
+        has_function, plan = self.update_function_plan()
+        if not has_function[vertex]:
+            return None
+        return planned_update_function(plan, int(self.indptr[vertex + 1] - self.indptr[vertex]))
+
+    def complexity(self) -> dict:
+        """See 'complexity_from_in_degrees'"""
+        return complexity_from_in_degrees(self.in_degrees(), self.seed_trans, self.l_bound, self.u_bound)
+
+    def fingerprint(self) -> str:
+        """See 'network_fingerprint'"""
+        return network_fingerprint(self.indptr, self.regulators, self.signs, self.seed_trans, self.l_bound,
+                                   self.u_bound)
+
+    def to_networkx(self):
+        """Returns the regulations as networkx.DiGraph with edges from regulators to targets
+
+        Vertex 'i' is the species 'Xi' of the SBML; edge attribute 'sign' is 'positive' or 'negative'.
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(self.num_of_vertices))
+        names = ['negative', 'positive']
+        graph.add_edges_from((reg, target, {'sign': names[sign]}) for reg, target, sign in
+                             zip(numpy.asarray(self.regulators).tolist(), self.targets().tolist(),
+                                 numpy.asarray(self.signs, dtype=bool).tolist()))
+        return graph
+
+    def to_scipy(self):
+        """Returns the signed adjacency matrix as scipy.sparse.csr_matrix, rows are targets and columns regulators
+
+        The matrix shares 'indptr' and 'regulators' with the network when both are int64 (as generated) or both
+        int32, otherwise they are converted to int64 copies; only its data, +1 for activating and -1 for inhibiting
+        regulations, is always a new int8 array. The arrays are set on the matrix directly, because its constructor
+        converts int64 index arrays to int32 copies whenever the values fit.
+        """
+        import scipy.sparse
+        indptr, indices = self.indptr, self.regulators
+        if indptr.dtype != indices.dtype or indptr.dtype not in [numpy.int32, numpy.int64]:
+            indptr, indices = numpy.asarray(indptr, dtype=numpy.int64), numpy.asarray(indices, dtype=numpy.int64)
+        matrix = scipy.sparse.csr_matrix((self.num_of_vertices, self.num_of_vertices), dtype=numpy.int8)
+        matrix.indptr, matrix.indices = indptr, indices
+        matrix.data = numpy.where(self.signs, numpy.int8(1), numpy.int8(-1))
+        return matrix
+
+    def to_sbml(self, sbml_f=None, workers=None):
+        """Serializes the network to SBML qual, identically to 'generate_bn'
+
+        Parameters
+        ----------
+        sbml_f : optional
+            Text stream or name of the file to write to. If None, nothing is written and the SBML is returned
+        workers : int, optional
+            Number of worker processes serializing the network (see 'write_transitions_from_arrays')
+
+        Returns
+        -------
+        bytes
+            SBML of the network if 'sbml_f' is None, otherwise None
+        """
+        if isinstance(sbml_f, str):
+            with open(sbml_f, 'w') as out_f:
+                return self.to_sbml(out_f, workers)
+        out_f = StringIO() if sbml_f is None else sbml_f
+        write_network_arrays_to_sbml(out_f, self.num_of_vertices, self.indptr, self.regulators, self.signs,
+                                     self.seed_trans, self.l_bound, self.u_bound, block_edges=CALLBACK_INTERVAL * 64,
+                                     workers=workers, functions=self.meta.get('functions', 'chains'),
+                                     uninterpreted_frac=self.meta.get('uninterpreted_frac', 0.5),
+                                     names=self.meta.get('names'))
+        return out_f.getvalue().encode() if sbml_f is None else None
+
+    def save(self, snapshot, mmap=False) -> None:
+        """Saves the network as a binary snapshot (see 'save_snapshot_arrays')"""
+        save_snapshot_arrays(snapshot, self.indptr, self.regulators, self.signs, self.meta, mmap)
+
+
+def generate_network(num_of_vertices: int, seed=int(time.time()), probability=0, num_of_connections=0, l_bound=2,
+                     u_bound=4, frac_reg=0.8, ba=False, ws=False, random=False, index=0, in_degree_cap=None,
+                     in_degree_dist=None, directed_ba=False, directed_config=False, directed_ws=False,
+                     out_degree_dist=None, topology=None, block_model=None) -> ParametrisedNetwork:
+    """Generates a parametrised network in memory, without writing anything
+
+    The network is the same as the network number 'index' of 'generate_bn' called with the same arguments.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices
+    seed : int, optional
+        Seed value of the batch
+    index : int, optional
+        Index of the network within the batch
+
+    See 'generate_bn' for the other parameters.
+
+    Returns
+    -------
+    ParametrisedNetwork
+        Generated network
+    """
+    numpy.random.seed(seed)
+    curr_seed = int(numpy.random.randint(MAXSIZE, size=index + 1)[index])
+    indptr, regulators, signs, seed_trans = generate_network_arrays(num_of_vertices, curr_seed, probability,
+                                                                    num_of_connections, frac_reg, ba, ws, random,
+                                                                    in_degree_cap, in_degree_dist,
+                                                                    directed_ba=directed_ba,
+                                                                    directed_config=directed_config,
+                                                                    directed_ws=directed_ws,
+                                                                    out_degree_dist=out_degree_dist,
+                                                                    topology=topology, block_model=block_model)
+    gen = generator_name(probability, num_of_connections, ba, ws, directed_ba, directed_config, directed_ws, topology,
+                         block_model)
+    meta = {'seed': curr_seed, 'frac_reg': frac_reg, 'generator': gen,
+            'name': f'bn_{gen}_s{seed}_l{l_bound}_u{u_bound}_f{frac_reg}_n{num_of_vertices}_{index}'}
+    return ParametrisedNetwork(num_of_vertices, indptr, regulators, signs, seed_trans, l_bound, u_bound, meta)
+
+
+"""-------------------------------------------------BATCH GENERATION-------------------------------------------------"""
+
+
+def draw_random_batch(num_of_vertices: int, count: int, probability: float, frac_reg: float, rng) -> tuple:
+    """Draws regulations of 'count' fully randomised networks at once
+
+    Edges of all the networks come from one (count, regulator, regulated vertex) draw, so the per-network cost of
+    'generate_random_edges' is paid once per batch. The networks are drawn from the numpy.random.Generator 'rng', so
+    they differ from the ones of 'generate_bn' with the same seed.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices of each network
+    count : int
+        Number of networks
+    probability : float
+        Probability of an existence of an edge leading from one vertex to another
+    frac_reg : float
+        Probability that a regulation is activating
+    rng
+        numpy.random.Generator to draw from
+
+    Returns
+    -------
+    tuple
+        (indptr, regulators, signs) CSR arrays of all count * num_of_vertices vertices of the batch (vertex v of the
+        k-th network is k * num_of_vertices + v), regulators are numbered within their network
+    """
+    edges = rng.random((count, num_of_vertices, num_of_vertices)) < probability
+    # rows are the regulators, so the regulators of a vertex are ordered as in 'edges_to_csr'
+    regulators = numpy.nonzero(edges.transpose(0, 2, 1))[2]
+    indptr = numpy.zeros(count * num_of_vertices + 1, dtype=numpy.int64)
+    numpy.cumsum(edges.sum(axis=1), out=indptr[1:])
+    signs = rng.random(len(regulators)) < frac_reg
+    return indptr, regulators, signs
+
+
+def plan_update_functions_batch(in_degrees, rng, l_bound: int, u_bound: int) -> tuple:
+    """Draws the random choices of the update functions of a batch of networks at once
+
+    Counterpart of 'plan_update_functions' for a (count, num_of_vertices) array of in-degrees: the drawn values have
+    the same meaning, only they come from the numpy.random.Generator 'rng' and the arrays of the plan have a leading
+    axis of the networks. As in 'plan_update_functions', the arity and the argument mask of a regulator position come
+    from the same 32-bit words: bit 0 of each word is one bit of the mask and the arity is the first word within the
+    bounds after masking (as numpy.random.RandomState.randint draws it), so they are correlated the same way.
+
+    Parameters
+    ----------
+    in_degrees
+        In-degrees of the vertices of each network
+    rng
+        numpy.random.Generator to draw from
+    l_bound : int
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int
+        Upper bound of the arity of the uninterpreted functions
+
+    Returns
+    -------
+    tuple
+        (has_function, plan), see 'plan_update_functions'
+    """
+    count = len(in_degrees)
+    has_function = (in_degrees > 4) | ((rng.random(in_degrees.shape) < 0.5) & (in_degrees > 0))
+    max_in_degree = int(in_degrees.max()) if in_degrees.size else 0
+    which = rng.random((count, max_in_degree)) < 0.5
+    arr = rng.random((count, max_in_degree)) < 0.5
+    words = rng.integers(0, 2**32, size=(count, max_in_degree, max(max_in_degree, 1)), dtype=numpy.uint32)
+    span = u_bound - l_bound
+    if span < 0:
+        raise ValueError(f"Lower bound of the arity {l_bound} is greater than the upper bound {u_bound}")
+    bits = (1 << span.bit_length()) - 1 if span > 0 else 0
+    masked = words & numpy.uint32(bits)
+    accepted = masked <= span
+    arities = l_bound + numpy.take_along_axis(masked, accepted.argmax(axis=2)[..., None], axis=2)[..., 0]
+    arities = arities.astype(numpy.int64)
+    rejected = numpy.flatnonzero(~accepted.any(axis=2))  # all words rejected, the arity is drawn from further words
+    while len(rejected):
+        drawn = rng.integers(0, 2**32, size=len(rejected), dtype=numpy.uint32) & numpy.uint32(bits)
+        arities.reshape(-1)[rejected[drawn <= span]] = l_bound + drawn[drawn <= span]
+        rejected = rejected[drawn > span]
+    del masked, accepted
+    # positions of the first 'u_bound' ones of the argument mask of each regulator position
+    ones_before = numpy.cumsum(numpy.bitwise_and(words, 1, out=words), axis=2, dtype=numpy.int32)
+    first_ones = numpy.stack([(ones_before <= idx).sum(axis=2) for idx in range(max(u_bound, 1))], axis=2)
+    plan = {'l_bound': l_bound, 'which': which, 'arr': arr, 'arities': arities, 'first_ones': first_ones}
+    return has_function, plan
+
+
+def serialize_batch(num_of_vertices: int, indptr, regulators, signs, has_function, plan: dict) -> list:
+    """Serializes a batch of networks (see 'draw_random_batch') to SBML strings
+
+    Produces the same SBML as 'write_network_arrays_to_sbml' would with update functions given by the plan of
+    'plan_update_functions_batch'. The header of the networks and the strings of all possible regulations and
+    literals are built once, the literals and the arguments of the uninterpreted functions of all regulations of
+    the batch are resolved with array operations, so only joining of the strings is left per vertex.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices of each network
+    indptr
+        Offsets of the regulators of each vertex of the batch
+    regulators
+        Regulators of all vertices, numbered within their network
+    signs
+        Types of the regulations, True for activating
+    has_function
+        (count, num_of_vertices) bool array determining which vertices get an update function
+    plan : dict
+        Plan of the update functions returned by 'plan_update_functions_batch'
+
+    Returns
+    -------
+    list
+        SBML string of each network
+    """
+    header = StringIO()
+    header.write('<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'no\'?>')
+    header.write('<sbml xmlns="http://www.sbml.org/sbml/level3/version1/core" '
+                 'layout:required="false" level="3" qual:required="true" '
+                 'xmlns:layout="http://www.sbml.org/sbml/level3/version1/layout/version1" version="1" '
+                 'xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    header.write('<model>')
+    generate_layout(header, num_of_vertices)
+    write_vertices_to_sbml(header, num_of_vertices)
+    header.write('<qual:listOfTransitions xmlns:qual="http://www.sbml.org/sbml/level3/version1/qual/version1">')
+    header = header.getvalue()
+    footer = '</qual:listOfTransitions></model></sbml>'
+    vertices = range(num_of_vertices)
+    opening = [f'<qual:transition qual:id="tr_X{vertex}"><qual:listOfInputs>' for vertex in vertices]
+    closing = [f'</qual:listOfInputs><qual:listOfOutputs><qual:output qual:id="tr_X{vertex}_out" '
+               f'qual:qualitativeSpecies="X{vertex}" qual:transitionEffect="assignmentLevel"/>'
+               f'</qual:listOfOutputs>' for vertex in vertices]
+    plain_closing = [f'{text}</qual:transition>' for text in closing]
+    function_closing = [f'{text}<qual:listOfFunctionTerms><qual:defaultTerm qual:resultLevel="0"/>'
+                        f'<qual:functionTerm qual:resultLevel="1"><math xmlns="http://www.w3.org/1998/Math/MathML">'
+                        for text in closing]
+    function_end = '</math></qual:functionTerm></qual:listOfFunctionTerms></qual:transition>'
+    # input of regulation (regulator, vertex, sign) is at index (regulator * num_of_vertices + vertex) * 2 + sign
+    input_table = numpy.array([f'<qual:input qual:id="tr_X{reg}_in_X{vertex}" qual:qualitativeSpecies="X{reg}" '
+                               f'qual:sign="{sign}" qual:transitionEffect="none"/>'
+                               for reg in vertices for vertex in vertices for sign in ['negative', 'positive']],
+                              dtype=object)
+    # plain literal of (regulator, sign), followed by closing of its operator at odd indices
+    literal_table = numpy.array([text + end for reg in vertices
+                                 for text in [f'<apply><not/><apply><eq/><ci>X{reg}</ci><cn type="integer">1</cn>'
+                                              f'</apply></apply>',
+                                              f'<apply><eq/><ci>X{reg}</ci><cn type="integer">1</cn></apply>']
+                                 for end in ['', '</apply>']], dtype=object)
+    variable_table = numpy.array([f'<ci>X{reg}</ci>' for reg in vertices] + [''], dtype=object)
+
+    count = len(has_function)
+    in_degrees = numpy.diff(indptr)
+    edge_vertex = numpy.repeat(numpy.arange(count * num_of_vertices), in_degrees)
+    network, target = numpy.divmod(edge_vertex, num_of_vertices)
+    position = numpy.arange(len(regulators)) - indptr[edge_vertex]
+    degree = in_degrees[edge_vertex]
+    regulators = numpy.asarray(regulators, dtype=numpy.int64)
+    signs = numpy.asarray(signs, dtype=bool)
+    inputs = input_table[(regulators * num_of_vertices + target) * 2 + signs]
+    literals = literal_table[(regulators * 2 + signs) * 2 + (position >= 1)]
+    # the same conditions as in 'planned_update_function'
+    arities = plan['arities'][network, position]
+    is_function = has_function.ravel()[edge_vertex] & (degree >= plan['l_bound']) & (arities > 0)
+    is_function &= arities <= degree
+    is_function &= ~plan['arr'][network, numpy.maximum(degree - 1 - position, 0)]
+    is_function &= plan['first_ones'][network, position, numpy.maximum(arities - 1, 0)] < degree
+    functions = numpy.flatnonzero(is_function)
+    if len(functions):
+        first_ones = plan['first_ones'][network[functions], position[functions]]
+        arity = arities[functions, None]
+        arguments = (numpy.arange(first_ones.shape[1]) < arity) & (first_ones != position[functions, None])
+        arguments &= numpy.cumsum(arguments, axis=1) < arity
+        argument_regs = regulators[numpy.minimum(indptr[edge_vertex[functions], None] + first_ones,
+                                                 len(regulators) - 1)]
+        argument_text = variable_table[numpy.where(arguments, argument_regs, num_of_vertices)]
+        for edge, args in zip(functions.tolist(), argument_text.tolist()):
+            literals[edge] = (f'<apply><csymbol>F{target[edge]}_{position[edge]}</csymbol>'
+                              f'{variable_table[regulators[edge]]}{"".join(args)}</apply>'
+                              f'{"</apply>" if position[edge] >= 1 else ""}')
+    inputs = inputs.tolist()
+    literals = literals.tolist()
+    offsets = indptr.tolist()
+    has_function = has_function.tolist()
+    which = plan['which'].tolist()
+    documents = []
+    for k in range(count):
+        operators = ['']
+        for is_or in which[k]:
+            operators.append(operators[-1] + ('<apply><or/>' if is_or else '<apply><and/>'))
+        parts = [header]
+        first = k * num_of_vertices
+        for vertex in vertices:
+            start, end = offsets[first + vertex], offsets[first + vertex + 1]
+            parts.append(opening[vertex])
+            parts.extend(inputs[start:end])
+            if has_function[k][vertex]:
+                parts.append(function_closing[vertex])
+                parts.append(operators[end - start - 1])
+                parts.extend(literals[start:end])
+                parts.append(function_end)
+            else:
+                parts.append(plain_closing[vertex])
+        parts.append(footer)
+        documents.append(''.join(parts))
+    return documents
+
+
+def generate_bn_batch(num_of_vertices: int, seed=int(time.time()), probability=0, l_bound=2, u_bound=4,
+                      frac_reg=0.8, loc="", n=1, batch_size=1000, progress=None, cancel=None, shard=None) -> dict:
+    """Generates a large ensemble of small fully randomised networks in batches
+
+    For networks of tens of vertices, most of the time of 'generate_bn' is spent on the per-network overhead rather
+    than on the network itself. Here 'batch_size' networks are drawn at once (see 'draw_random_batch' and
+    'plan_update_functions_batch'), serialized together (see 'serialize_batch') and each is written to its file by
+    a single write. The k-th batch is drawn from numpy.random.default_rng([seed, k]), so the networks depend on the
+    seed, their index and 'batch_size', but not on the sharding; they aren't the same as the networks generated by
+    'generate_bn' with the same seed, hence the 'b{batch_size}' part of their names.
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        Number of vertices of each network
+    seed : int, optional
+        Seed value of the ensemble
+    probability : float, optional
+        Probability of an outgoing edge from one vertex to another
+    l_bound : int, optional
+        Lower bound of the arity of the uninterpreted functions
+    u_bound : int, optional
+        Upper bound of the arity of the uninterpreted functions
+    frac_reg : float, optional
+        Fraction of activating regulations within the network
+    loc : str, optional
+        Directory to store the networks in
+    n : int, optional
+        Number of networks to generate
+    batch_size : int, optional
+        Number of networks generated at once. The random draws of a batch take about
+        9 * batch_size * num_of_vertices**2 bytes
+    progress : callable, optional
+        See 'generate_bn', called after each batch
+    cancel : optional
+        See 'generate_bn', checked between batches
+    shard : tuple or str, optional
+        See 'generate_bn'. Whole batches are assigned to the shards (see 'shard_indices')
+
+    Returns
+    -------
+    dict
+        Report in the format of 'generate_bn', only the 'accepted' networks and the 'cancelled' flag are used
+    """
+    if batch_size < 1:
+        raise ValueError(f"Batch size has to be positive, got {batch_size}")
+    gen = f'{generator_name(probability, 0)}_b{batch_size}'
+    run_name = f'{gen}_s{seed}_l{l_bound}_u{u_bound}_f{frac_reg}_n{num_of_vertices}'
+    config = {'generator': gen, 'seed': seed, 'n': n, 'num_of_vertices': num_of_vertices, 'l_bound': l_bound,
+              'u_bound': u_bound, 'frac_reg': frac_reg, 'out_format': 'sbml', 'batch_size': batch_size}
+    report = {'accepted': 0, 'rejected': 0, 'duplicates': 0, 'cancelled': False}
+    batches = shard_indices(-(-n // batch_size), shard)
+    total = sum(min(batch_size, n - batch * batch_size) for batch in batches)
+    bytes_written = 0
+    networks = []
+    for batch in batches:
+        if cancel is not None and cancel.is_set():
+            report['cancelled'] = True
+            break
+        rng = numpy.random.default_rng([seed, batch])
+        count = min(batch_size, n - batch * batch_size)
+        indptr, regulators, signs = draw_random_batch(num_of_vertices, count, probability, frac_reg, rng)
+        has_function, plan = plan_update_functions_batch(numpy.diff(indptr).reshape(count, num_of_vertices), rng,
+                                                         l_bound, u_bound)
+        documents = serialize_batch(num_of_vertices, indptr, regulators, signs, has_function, plan)
+        for k, document in enumerate(documents):
+            i = batch * batch_size + k
+            out_name = f'{loc}bn_{run_name}_{i}.sbml'
+            tmp_name = partial_name(out_name)
+            data = document.encode()
+            try:
+                with open(tmp_name, 'wb') as sbml_f:
+                    sbml_f.write(data)
+                replace(tmp_name, out_name)
+            except BaseException:
+                remove_output(tmp_name)
+                raise
+            bytes_written += len(data)
+            networks.append({'index': i, 'file': path.basename(out_name), 'bytes': len(data)})
+        report['accepted'] += count
+        if progress is not None:
+            progress(report['accepted'], total, report['accepted'] * num_of_vertices, bytes_written)
+    if shard is not None:
+        write_manifest(loc, run_name, config, shard, report, networks)
+    return report
+
+
+"""------------------------------------------------BACKGROUND WRITER-------------------------------------------------"""
+
+
+class BackgroundWriter:
+    """Writes files in a background thread, so the generation doesn't wait for the disk and vice versa
+
+    Text written to the files opened by 'open' is collected into buffers of 'buffer_size' characters, which are
+    passed to the writer thread through a queue of at most 'max_buffers' buffers. When the disk is slower than the
+    generation, the queue gets full and the generation waits, so only about (max_buffers + 1) * buffer_size
+    characters are held in memory. If writing fails, the file is removed and the error is raised in the generating
+    thread by the next call.
+    """
+
+    def __init__(self, max_buffers=8, buffer_size=1 << 20):
+        self.queue = queue.Queue(maxsize=max_buffers)
+        self.buffer_size = buffer_size
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def open(self, file_name: str):
+        """Opens file for writing, see 'BackgroundFile'"""
+        return BackgroundFile(self, file_name)
+
+    def put(self, file_name: str, text: str, close: bool, on_close=None) -> None:
+        """Queues text to be written to the file, blocks while the queue is full
+
+        'on_close' is called by the writer thread once the file is closed.
+        """
+        self.check()
+        self.queue.put((file_name, text, close, on_close))
+
+    def check(self) -> None:
+        """Raises the error of the writer thread, if there was any"""
+        if self.error is not None:
+            raise self.error
+
+    def wait(self, raise_errors=True) -> None:
+        """Waits until everything queued is written"""
+        self.queue.join()
+        if raise_errors:
+            self.check()
+
+    def close(self) -> None:
+        """Waits until everything queued is written and stops the writer thread"""
+        self.queue.put(None)
+        self.thread.join()
+
+    def run(self) -> None:
+        """Body of the writer thread"""
+        files = {}
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    for f in files.values():
+                        f.close()
+                    return
+                file_name, text, close, on_close = item
+                if self.error is not None:  # after an error, the rest of the queue is only drained
+                    continue
+                try:
+                    if file_name not in files:
+                        files[file_name] = open(file_name, 'w')
+                    files[file_name].write(text)
+                    if close:
+                        files.pop(file_name).close()
+                        if on_close is not None:
+                            on_close()
+                except BaseException as e:
+                    self.error = e
+                    for f in files.values():
+                        f.close()
+                    files.clear()
+                    remove_output(file_name)
+            finally:
+                self.queue.task_done()
+
+
+class BackgroundFile:
+    """Text file written by 'BackgroundWriter', supports 'write', 'tell' and 'close' (also as a context manager)
+
+    'on_close' can be set to a function the writer thread calls once the file is written and closed.
+    """
+
+    def __init__(self, writer: BackgroundWriter, file_name: str):
+        self.writer = writer
+        self.file_name = file_name
+        self.on_close = None
+        self.parts = []
+        self.buffered = 0
+        self.position = 0
+
+    def write(self, text: str) -> None:
+        """Appends text to the file, full buffers are passed to the writer thread"""
+        self.parts.append(text)
+        self.buffered += len(text)
+        self.position += len(text)
+        if self.buffered >= self.writer.buffer_size:
+            self.writer.put(self.file_name, ''.join(self.parts), False)
+            self.parts = []
+            self.buffered = 0
+
+    def tell(self) -> int:
+        """Returns the number of characters written to the file so far, including the queued ones"""
+        return self.position
+
+    def close(self) -> None:
+        """Passes the rest of the text to the writer thread, which closes the file and calls 'on_close'"""
+        if self.parts is not None:
+            parts, self.parts = self.parts, None
+            self.writer.put(self.file_name, ''.join(parts), True, self.on_close)
+
+    def __enter__(self):
+        """Returns the file itself"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the file, see 'close'"""
+        self.close()
+
+
+"""------------------------------------------------------------------------------------------------------------------"""
+
+
+def generate_bn(num_of_vertices: int, seed=int(time.time()), probability=0, num_of_connections=0,
+                l_bound=2, u_bound=4, frac_reg=0.8, ba=False, ws=False, random=False, loc="", n=1,
+                out_format='sbml', max_log2_params=None, max_in_degree=None, max_functions=None,
+                max_attempts=1000, in_degree_cap=None, in_degree_dist=None, progress=None, cancel=None,
+                memory_budget=None, workers=None, directed_ba=False, directed_config=False, directed_ws=False,
+                out_degree_dist=None, variants=None, topology_cache=None, topology=None, write_buffers=8,
+                shard=None, dedup=None, fingerprints=None, resume=False, block_model=None, functions='chains',
+                uninterpreted_frac=0.5, screen=None, dry_run=False, stats=False):
+    # make it possible to generate arbitrary amount of vertices?
+    """Generates random parametrised boolean network in SBML qual format.
+    - http://www.colomoto.org/formats/sbml-qual.html
+
+    Parameters
+    ----------
+    num_of_vertices : int
+        User-defined size of the boolean network
+    seed : int, optional
+        Seed value for the option to regenerate the same network. Default seed is time.time()
+    probability : float, optional
+        For 'random' network, user-defined probability of an outgoing edge from one vertex to another
+        For the Watts-Strogatz and the directed small-world model, it is the probability of rewiring each edge
+        Not used in the Barabási-Albert model
+    num_of_connections : int, optional
+        For Barabási-Albert model, it is number of edges to attach from a new node to existing nodes
+        For Watts-Strogatz, each node is joined with its `num_of_connections` nearest neighbors in a ring topology
+        For the directed preferential attachment and configuration models, it is the mean number of regulations
+        per vertex; for the directed small-world model, each vertex is regulated by its `num_of_connections`
+        nearest neighbours in a ring topology
+        Not used in 'random' network
+    l_bound : int, optional
+        Lower bound of the arity of the uninterpreted functions. Default value is 2
+    u_bound : int, optional
+        Upper bound of the arity of the uninterpreted functions
+        Default value is 4, so AEON doesn't face the state-space explosion
+    frac_reg : float, optional
+        Fraction of activating regulations within the network
+    ba : bool, optional
+        Barabási-Albert model
+    ws : bool, optional
+        Watts-Strogatz model
+    random : bool, optional
+        Fully randomised network
+    loc : str
+        Directory to store the networks in
+    n : int
+        Number of networks to generate. Keep in mind that if 'n' > 1 and 'seed' is not set to default, you will get 'n'
+        same networks
+    out_format : str, optional
+        'sbml' (default), 'npz' for a compressed binary snapshot or 'npy' for a directory of memory-mappable arrays
+        (see 'save_snapshot_arrays'). Snapshots can be exported to SBML later using 'snapshot_to_sbml'
+    max_log2_params : int, optional
+        Complexity budget, maximal log2 size of the parametrisation space (see 'complexity_from_in_degrees')
+    max_in_degree : int, optional
+        Complexity budget, maximal in-degree of a vertex
+    max_functions : int, optional
+        Complexity budget, maximal number of uninterpreted functions
+    max_attempts : int, optional
+        Number of networks sampled for one output network before giving up on the complexity budget
+    in_degree_cap : int, optional
+        Maximal in-degree of a vertex, enforced while generating (see 'cap_in_degrees'). Keep it at 4 or lower, so
+        every update function stays small enough for AEON. The random network is still drawn as the whole n×n
+        matrix and its excess regulations are dropped; use 'in_degree_dist' for large sparse random networks
+    in_degree_dist : list, optional
+        Probabilities of in-degrees 0, 1, 2, ... Only the 'random' network (instead of using 'probability') and the
+        directed configuration model draw the in-degrees from it, without the n×n matrix. The other models only
+        draw the in-degree cap of each vertex from it, so their in-degrees follow the model truncated by the caps,
+        not this distribution
+    progress : callable, optional
+        Called as progress(networks_done, n, vertices_written, bytes_written) after each network and periodically
+        while a network is written; vertices and bytes are counted over the whole batch
+    cancel : optional
+        Object with 'is_set' method (e.g. threading.Event). It is checked between networks and periodically while
+        a network is written; once it is set, generation stops and the partially written network is removed
+    memory_budget : int, optional
+        Approximate peak memory in bytes. The random network is then drawn in blocks of regulators instead of whole
+        n×n matrices and its edges are spilled to memory-mapped files in a temporary directory within 'loc' if they
+        don't fit; all networks are serialized in blocks of vertices. Barabási-Albert and Watts-Strogatz graphs are
+        still built by networkx (so that a seed gives the same network as before), but only their edge arrays are
+        kept afterwards; their peak memory is therefore not bounded by the budget, use the directed models or the
+        stochastic block model for networks that don't fit
+    workers : int, optional
+        Number of worker processes serializing (and with 'screen', screening) each network; the output is identical
+        to the serial one. The processes are started once and serve all networks of the call
+    directed_ba : bool, optional
+        Directed preferential attachment model with separate in-degree and out-degree attachment (see
+        'generate_directed_pa_edges'). Unlike 'ba', regulations aren't oriented randomly afterwards
+    directed_config : bool, optional
+        Directed configuration model, in-degrees and out-degrees are drawn from 'in_degree_dist' and
+        'out_degree_dist' (see 'generate_directed_configuration_edges')
+    directed_ws : bool, optional
+        Directed small-world model (see 'generate_directed_small_world_edges')
+    out_degree_dist : list, optional
+        Probabilities of out-degrees 0, 1, 2, ... for the directed configuration model
+    variants : list, optional
+        Dicts overriding 'l_bound', 'u_bound' and 'frac_reg'. Topology of each network is then generated only once
+        and every variant is written for it (see 'generate_variants'); complexity budget, memory budget,
+        deduplication and snapshot formats aren't supported with variants
+    topology_cache : str, optional
+        Directory to cache the topologies of the networks in, used with 'variants'
+    topology : dict, optional
+        Imported regulations (see 'load_topology') parametrised instead of a generated network; 'num_of_vertices'
+        has to be at least topology['num_of_vertices']. Given signs are kept, missing ones are drawn with 'frac_reg'
+    write_buffers : int, optional
+        Number of 1 MiB buffers queued for the background thread writing the SBML files (see 'BackgroundWriter'),
+        so the next part of the network is generated while the previous one is written. 0 writes the files directly
+        from the generating thread
+    shard : tuple or str, optional
+        (index, count) or 'index/count'. Only the networks of the batch of 'n' belonging to the shard are generated
+        (see 'shard_indices'); their names and contents are the same as in the whole batch. Manifest of the
+        written networks is stored in 'loc', manifests of all shards can be merged by 'merge_manifests'
+    dedup : str, optional
+        'drop' or 'resample' networks structurally identical to a network generated before (see
+        'network_fingerprint'); a dropped network isn't written, a resampled one is replaced by a network generated
+        with a seed derived from the previous one, as with the complexity budget. Duplicates are counted in the
+        report
+    fingerprints : dict, optional
+        Fingerprints of the networks generated before (see 'is_duplicate'), updated with each new network once it
+        is written. Share it among calls or processes to deduplicate across them; by default only the networks of
+        this call (or shard) are compared. Networks written at the same time by two processes are both kept
+    resume : bool, optional
+        Records the finished networks in a checkpoint file in 'loc' (see 'Checkpoint'); if the checkpoint of the
+        same run exists, its finished networks are skipped and the rest is generated, so a killed run can be
+        continued by repeating the call. Networks are always written to temporary files renamed once complete
+        (see 'publish_output'), so the files with final names are never partial
+    block_model : tuple, optional
+        (sizes, probabilities) of the directed stochastic block model: 'sizes' of the blocks (modules) of vertices
+        or their number and the matrix of 'probabilities' of a regulation from a vertex of one block to a vertex of
+        another one, or a pair (within a block, between blocks) of them (see 'generate_block_model_edges'). Only
+        the existing regulations are drawn, so it scales to sparse networks with many vertices and blocks
+    functions : str, optional
+        Engine of the update functions: 'chains' (default) of and/or operators over literals and uninterpreted
+        functions, or 'random', 'canalising' or 'monotone' functions sampled as truth tables (see
+        'write_truth_table_transitions'); in-degrees are then limited to MAX_TABLE_ARITY (MAX_RANDOM_TABLE_ARITY
+        for 'random'), use 'in_degree_cap'. Variants, deduplication, the complexity budget except 'max_in_degree'
+        and parallel 'workers' need 'chains'; with truth tables, 'memory_budget' bounds only the arrays of the
+        regulations, the functions are written without blocks
+    uninterpreted_frac : float, optional
+        Probability that a sub-function of a truth-table update function is replaced by an uninterpreted function
+    screen : dict, optional
+        Dynamics pre-screen of every network before it is written (see 'dynamics_summary'): 'criteria' mapping keys
+        of the summary to [min, max] bounds (see 'passes_screen'), 'action' 'reject' (default) resampling the
+        networks failing them, as with the complexity budget, or 'tag' keeping them, and optionally
+        'instantiations', 'states', 'steps' and 'window' of 'dynamics_summary'. Summaries are reported and stored
+        in the manifest and checkpoint entries. Needs 'chains' update functions. The screen usually takes longer
+        than the generation (about 0.3 s per network of 1000 vertices with the defaults, see 'dynamics_summary'),
+        its instantiations are simulated in the 'workers' processes. With 'dedup', duplicates are found before the
+        screen, so they aren't screened. 'max_complex_size' can't exceed 'window', so bounds on it are only
+        meaningful below it
+    dry_run : bool, optional
+        Nothing is generated, the report only holds the 'estimate' of the output size, memory and time (see
+        'estimate_cost')
+    stats : bool, optional
+        Ensemble statistics of the written networks (see 'EnsembleStats') are collected while generating and stored
+        with their summary in stats_{name}.json in 'loc' and in the manifest of the shard. Not supported with
+        variants. The statistics aren't free: the uninterpreted functions of every written network are counted from
+        a second call of 'plan_update_functions', and on resume every network skipped by the checkpoint is drawn
+        again in full (without writing it) to be counted
+
+    Returns
+    -------
+    dict
+        'accepted' and 'rejected' counters of the networks checked against the complexity budget, 'duplicates'
+        found by 'dedup' and 'cancelled' flag of a run stopped by 'cancel'; with 'screen', also 'screened' counter
+        of the networks rejected by it and 'dynamics' summaries of the written networks by their file names; with
+        'stats', the 'stats' summary and the name of the 'stats_file'
+    """
+    if dry_run:
+        estimate = estimate_cost(num_of_vertices, n, probability, num_of_connections, ba, ws, random, in_degree_cap,
+                                 in_degree_dist, directed_ba, directed_config, directed_ws, out_degree_dist, topology,
+                                 block_model, out_format, memory_budget, workers, write_buffers, shard, variants,
+                                 functions, screen, dedup)
+        return {'accepted': 0, 'rejected': 0, 'duplicates': 0, 'cancelled': False, 'estimate': estimate}
+    if out_format not in ['sbml', 'npz', 'npy']:
+        raise ValueError(f"Unsupported output format {out_format}")
+    if dedup not in [None, 'drop', 'resample']:
+        raise ValueError(f"Unsupported deduplication {dedup}")
+    if dedup is not None and variants is not None:
+        raise ValueError("Deduplication isn't supported with variants")
+    if variants is not None and out_format != 'sbml':
+        raise ValueError("Variants are only written in the sbml format")
+    if variants is not None and (max_log2_params is not None or max_in_degree is not None or
+                                 max_functions is not None or memory_budget is not None):
+        raise ValueError("Complexity budget and memory budget aren't supported with variants")
+    if resume and variants is not None:
+        raise ValueError("Resuming isn't supported with variants")
+    if stats and variants is not None:
+        raise ValueError("Ensemble statistics aren't supported with variants")
+    if functions not in FUNCTION_KINDS:
+        raise ValueError(f"Unsupported update functions {functions}")
+    if functions != 'chains' and (variants is not None or dedup is not None or max_log2_params is not None or
+                                  max_functions is not None or (workers is not None and workers > 1)):
+        raise ValueError("Variants, deduplication, complexity budget of the parametrisations and parallel workers "
+                         "are only supported with 'chains' update functions")
+    if screen is not None and (functions != 'chains' or variants is not None):
+        raise ValueError("Dynamics screen is only supported with 'chains' update functions and without variants")
+    if screen is not None and screen.get('action', 'reject') not in ['reject', 'tag']:
+        raise ValueError(f"Unsupported action of the dynamics screen {screen['action']}")
+    if variants is not None:
+        return generate_variants(num_of_vertices, seed, variants, probability, num_of_connections, l_bound, u_bound,
+                                 frac_reg, ba, ws, random, loc, n, in_degree_cap, in_degree_dist, directed_ba,
+                                 directed_config, directed_ws, out_degree_dist, topology_cache, workers, progress,
+                                 cancel, topology, shard, block_model, write_buffers)
+    gen = generator_name(probability, num_of_connections, ba, ws, directed_ba, directed_config, directed_ws, topology,
+                         block_model)
+    if functions != 'chains':
+        gen = f'{gen}_{functions}{uninterpreted_frac}'
+    names = None if topology is None else topology['names']
+    numpy.random.seed(seed)
+    network_seeds = list(numpy.random.randint(MAXSIZE, size=n))
+    budget = max_log2_params is not None or max_in_degree is not None or max_functions is not None
+    report = {'accepted': 0, 'rejected': 0, 'duplicates': 0, 'cancelled': False}
+    if dedup is not None and fingerprints is None:
+        fingerprints = {}
+    writing = {}  # fingerprints of the networks of this call, they are registered in 'fingerprints' once written
+    screen_rejects = screen is not None and screen.get('action', 'reject') == 'reject'
+    if screen is not None:
+        report.update(screened=0, dynamics={})
+    ensemble = EnsembleStats() if stats else None
+    vertices_written = 0
+    bytes_written = 0
+    block_edges = None if memory_budget is None else max(1, memory_budget // (4 * 200))  # ~200 B per regulation
+    indices = shard_indices(n, shard)
+    networks = []
+    run_name = f'{gen}_s{seed}_l{l_bound}_u{u_bound}_f{frac_reg}_n{num_of_vertices}'
+    config = {'generator': gen, 'seed': seed, 'n': n, 'num_of_vertices': num_of_vertices, 'l_bound': l_bound,
+              'u_bound': u_bound, 'frac_reg': frac_reg, 'out_format': out_format}
+    for key, value in [('max_log2_params', max_log2_params), ('max_in_degree', max_in_degree),
+                       ('max_functions', max_functions), ('in_degree_cap', in_degree_cap),
+                       ('in_degree_dist', None if in_degree_dist is None else numpy.asarray(in_degree_dist).tolist()),
+                       ('memory_budget', memory_budget), ('screen', screen)]:
+        if value is not None:  # only the options used, so that checkpoints of runs without them stay valid
+            config[key] = value
+    checkpoint = None
+    shard_suffix = '' if shard is None else '_shard{}of{}'.format(*parse_shard(shard))
+    if resume:
+        # entries of a run with statistics hold those of their network, they are merged again on resume
+        checkpoint = Checkpoint(f'{loc}checkpoint_{run_name}{shard_suffix}.jsonl',
+                                dict(config, dedup=dedup, **({'stats': True} if stats else {})))
+        report['resumed'] = 0
+    writer = BackgroundWriter(write_buffers) if write_buffers and out_format == 'sbml' else None
+    # one pool of workers serializes and screens all networks, its processes are started only once
+    executor = (ProcessPoolExecutor(max_workers=workers) if workers is not None and workers > 1 and
+                functions == 'chains' and (out_format == 'sbml' or screen is not None) else None)
+    try:
+        for position, i in enumerate(indices):
+            if cancel is not None and cancel.is_set():
+                report['cancelled'] = True
+                break
+            if checkpoint is not None and i in checkpoint.entries:
+                entry = checkpoint.entries[i]
+                report['resumed'] += 1
+                report['rejected'] += entry.get('rejected', 0)
+                report['duplicates'] += entry.get('duplicates', int('duplicate_of' in entry))
+                if screen is not None:
+                    report['screened'] += entry.get('screened', 0)
+                if 'duplicate_of' not in entry:
+                    report['accepted'] += 1
+                    vertices_written += num_of_vertices
+                    bytes_written += entry['bytes']
+                if 'dynamics' in entry:
+                    report['dynamics'][entry['file']] = entry['dynamics']
+                if ensemble is not None and 'duplicate_of' not in entry:
+                    ensemble.merge(EnsembleStats.from_dict(entry['stats']))
+                if dedup is not None:
+                    fingerprints.setdefault(entry['fingerprint'], entry.get('duplicate_of', entry['file']))
+                networks.append(entry)
+                continue
+            curr_seed = int(network_seeds[i])
+            f_name = f'{loc}bn_{gen}_s{seed}_l{l_bound}_u{u_bound}_f{frac_reg}_n{num_of_vertices}_{i}'
+            out_name = f'{f_name}.{out_format}' if out_format != 'npy' else f_name
+            tmp_name = partial_name(out_name)
+
+            def callback(vertices_done):
+                if cancel is not None and cancel.is_set():
+                    raise GenerationCancelled()
+                if progress is not None:
+                    progress(position, len(indices), vertices_written + vertices_done, bytes_written + sbml_f.tell())
+
+            spill_dir = mkdtemp(prefix='.spill_', dir=path.dirname(loc) or None) if memory_budget is not None else None
+            # counters before the network, its own counts are recorded in its entry to be restored on resume
+            counted = {key: report[key] for key in ['rejected', 'screened', 'duplicates'] if key in report}
+            try:
+                for attempt in range(max_attempts):
+                    indptr, regulators, signs, seed_trans = generate_network_arrays(num_of_vertices, curr_seed,
+                                                                                    probability, num_of_connections,
+                                                                                    frac_reg, ba, ws, random,
+                                                                                    in_degree_cap, in_degree_dist,
+                                                                                    memory_budget, spill_dir,
+                                                                                    directed_ba, directed_config,
+                                                                                    directed_ws, out_degree_dist,
+                                                                                    topology, block_model)
+                    duplicate_of = None
+                    dynamics = None
+                    if budget and not fits_budget(complexity_from_in_degrees(numpy.diff(indptr), seed_trans,
+                                                                             l_bound, u_bound),
+                                                  max_log2_params, max_in_degree, max_functions):
+                        report['rejected'] += 1
+                    else:
+                        first = None
+                        if dedup is not None:  # duplicates are found before the much costlier screen
+                            fingerprint = network_fingerprint(indptr, regulators, signs, seed_trans, l_bound,
+                                                              u_bound)
+                            first = fingerprints.get(fingerprint, writing.get(fingerprint))
+                        if first is not None:
+                            report['duplicates'] += 1
+                            if dedup == 'drop':
+                                duplicate_of = first
+                                break
+                        else:
+                            if screen is not None:
+                                dynamics = screen_network(indptr, regulators, signs, seed_trans, l_bound, u_bound,
+                                                          screen, executor, workers)
+                            if screen_rejects and not dynamics['passed']:
+                                report['screened'] += 1
+                            else:
+                                if dedup is not None:
+                                    writing[fingerprint] = path.basename(out_name)
+                                break
+                    # rejected network is resampled with a seed derived from the previous one
+                    numpy.random.seed(curr_seed)
+                    curr_seed = int(numpy.random.randint(MAXSIZE))
+                else:
+                    raise RuntimeError(f"No network within the complexity budget{' and unique' if dedup else ''}"
+                                       f"{' passing the dynamics screen' if screen_rejects else ''} found in "
+                                       f"{max_attempts} attempts")
+                entry = {'index': i, 'file': path.basename(out_name), 'seed': curr_seed}
+                entry.update({key: report[key] - value for key, value in counted.items() if report[key] > value})
+                if dedup is not None:
+                    entry['fingerprint'] = fingerprint
+                if duplicate_of is not None:
+                    entry['duplicate_of'] = duplicate_of
+                    networks.append(entry)
+                    if checkpoint is not None:
+                        checkpoint.record(entry)
+                    if progress is not None:
+                        progress(position + 1, len(indices), vertices_written, bytes_written)
+                    continue
+                if dynamics is not None:
+                    entry['dynamics'] = dynamics
+                    report['dynamics'][entry['file']] = dynamics
+                if ensemble is not None:  # merged once the network is written, the same way as on resume
+                    network_stats = EnsembleStats()
+                    network_stats.update(indptr, regulators, signs, seed_trans if functions == 'chains' else None,
+                                         l_bound, u_bound)
+                    entry['stats'] = network_stats.to_dict()
+                if cancel is not None and cancel.is_set():
+                    raise GenerationCancelled()
+                if out_format == 'sbml':
+                    with writer.open(tmp_name) if writer is not None else open(tmp_name, 'w+') as sbml_f:
+                        write_network_arrays_to_sbml(sbml_f, num_of_vertices, indptr, regulators, signs, seed_trans,
+                                                     l_bound, u_bound,
+                                                     callback if progress is not None or cancel is not None else None,
+                                                     block_edges, workers, functions, uninterpreted_frac, executor,
+                                                     names)
+                        entry['bytes'] = sbml_f.tell()
+                        if writer is not None:  # published by the writer thread once the file is complete
+                            sbml_f.on_close = partial(publish_output, tmp_name, out_name, checkpoint, entry,
+                                                      fingerprints)
+                    if writer is None:
+                        publish_output(tmp_name, out_name, checkpoint, entry, fingerprints)
+                else:
+                    meta = {'vertices': num_of_vertices, 'seed': curr_seed, 'seed_trans': seed_trans,
+                            'l_bound': l_bound, 'u_bound': u_bound, 'frac_reg': frac_reg, 'generator': gen}
+                    if functions != 'chains':
+                        meta.update(functions=functions, uninterpreted_frac=uninterpreted_frac)
+                    if names is not None:
+                        meta['names'] = names
+                    save_snapshot_arrays(tmp_name, indptr, regulators, signs, meta, mmap=out_format == 'npy')
+                    entry['bytes'] = output_size(tmp_name)
+                    publish_output(tmp_name, out_name, checkpoint, entry, fingerprints)
+                if ensemble is not None:
+                    ensemble.merge(network_stats)
+            except GenerationCancelled:
+                if writer is not None:
+                    writer.wait(raise_errors=False)
+                remove_output(tmp_name)  # don't leave half-written networks behind
+                report['cancelled'] = True
+                break
+            except BaseException:
+                if writer is not None:
+                    writer.wait(raise_errors=False)
+                remove_output(tmp_name)
+                raise
+            finally:
+                if spill_dir is not None:
+                    rmtree(spill_dir, ignore_errors=True)
+            report['accepted'] += 1
+            vertices_written += num_of_vertices
+            bytes_written += entry['bytes']
+            networks.append(entry)
+            if progress is not None:
+                progress(position + 1, len(indices), vertices_written, bytes_written)
+        if writer is not None:
+            writer.wait()
+    finally:
+        if writer is not None:
+            writer.close()
+        if executor is not None:
+            executor.shutdown()
+        if checkpoint is not None:
+            checkpoint.close()
+    if ensemble is not None:
+        report['stats'] = ensemble.summary()
+        report['stats_file'] = write_stats(f'{loc}stats_{run_name}{shard_suffix}.json', config, ensemble)
+    if shard is not None:
+        write_manifest(loc, run_name, config, shard, report, networks, ensemble)
+    return report
+
+
+def remove_output(out_name: str) -> None:
+    """Removes a (partially) written network, either a file or a directory snapshot
+
+    Parameters
+    ----------
+    out_name : str
+        Name of the file or directory
+
+    Returns
+    -------
+    None
+    """
+    if path.isdir(out_name):
+        rmtree(out_name, ignore_errors=True)
+    elif path.exists(out_name):
+        remove(out_name)
+
+
+def output_size(out_name: str) -> int:
+    """Returns size of the written network in bytes, either of a file or of a directory snapshot
+
+    Parameters
+    ----------
+    out_name : str
+        Name of the file or directory
+
+    Returns
+    -------
+    int
+        Size in bytes
+    """
+    if path.isdir(out_name):
+        return sum(path.getsize(path.join(out_name, f)) for f in listdir(out_name))
+    return path.getsize(out_name)
+
+
+def partial_name(out_name: str) -> str:
+    """Returns name of the hidden temporary file (or directory) a network is written to before 'publish_output'"""
+    directory, base = path.split(out_name)
+    return path.join(directory, f'.part_{base}')
+
+
+def publish_output(tmp_name: str, out_name: str, checkpoint=None, entry=None, fingerprints=None) -> None:
+    """Atomically renames the completely written network to its final name and records it in the checkpoint
+
+    A network is therefore either missing or complete under its final name, even if the run is killed. Its
+    fingerprint is registered only now, so a network that failed or was cancelled isn't the original of any
+    duplicate.
+
+    Parameters
+    ----------
+    tmp_name : str
+        Name of the written file or directory (see 'partial_name')
+    out_name : str
+        Final name
+    checkpoint : Checkpoint, optional
+        Checkpoint of the run
+    entry : dict, optional
+        Entry of the network recorded in the checkpoint
+    fingerprints : dict, optional
+        Fingerprints of the written networks (see 'is_duplicate'), updated with the 'fingerprint' of the entry
+
+    Returns
+    -------
+    None
+    """
+    if path.isdir(out_name):
+        rmtree(out_name)  # a directory can't be replaced by another one
+    replace(tmp_name, out_name)
+    if fingerprints is not None and 'fingerprint' in entry:
+        fingerprints.setdefault(entry['fingerprint'], entry['file'])
+    if checkpoint is not None:
+        checkpoint.record(entry)
+
+
+class Checkpoint:
+    """Append-only log of the finished networks of a batch, so that an interrupted run can be resumed
+
+    The first line holds the configuration of the batch, every other line the entry of one finished network (with
+    its 'index', see 'write_manifest'). A network is recorded only after it is published under its final name (see
+    'publish_output'). The last line of a killed run may be cut, such a line is ignored.
+    """
+
+    def __init__(self, file_name: str, config: dict, resume=True):
+        self.file_name = file_name
+        self.entries = {}
+        self.lock = threading.Lock()
+        config = json.loads(json.dumps(config, default=int))
+        if resume and path.isfile(file_name):
+            with open(file_name, 'r') as checkpoint_f:
+                lines = checkpoint_f.read().split('\n')
+            if json.loads(lines[0]).get('config') != config:
+                raise ValueError(f"Checkpoint {file_name} belongs to a run with a different configuration")
+            for line in lines[1:]:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.entries[entry['index']] = entry
+            self.file = open(file_name, 'a')
+            if lines[-1]:
+                self.file.write('\n')  # ends the cut line
+        else:
+            self.file = open(file_name, 'w')
+            self.file.write(json.dumps({'config': config}) + '\n')
+        self.file.flush()
+
+    def record(self, entry: dict) -> None:
+        with self.lock:
+            self.file.write(json.dumps(entry, default=int) + '\n')
+            self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+"""-------------------------------------------------COST ESTIMATION-------------------------------------------------"""
+
+
+def distribution_mean(dist) -> float:
+    """Returns the mean of a distribution given by the probabilities of values 0, 1, 2, ..."""
+    dist = numpy.asarray(dist, dtype=float)
+    return float(numpy.arange(len(dist)) @ dist / dist.sum())
+
+
+def expected_regulations(num_of_vertices: int, probability=0, num_of_connections=0, ba=False, ws=False,
+                         random=False, in_degree_cap=None, in_degree_dist=None, directed_ba=False,
+                         directed_config=False, directed_ws=False, out_degree_dist=None, topology=None,
+                         block_model=None) -> float:
+    """Returns the expected number of regulations of a network generated by 'generate_network_arrays'
+
+    Parameters are the same as of 'generate_network_arrays'. The in-degree cap and the in-degree distribution of the
+    undirected models only bound the number from above.
+
+    Returns
+    -------
+    float
+        Expected number of regulations
+    """
+    mean_in = None if in_degree_dist is None else distribution_mean(in_degree_dist)
+    if topology is not None:
+        regulations = len(topology['targets'])
+    elif block_model is not None:
+        sizes, probabilities = parse_block_model(num_of_vertices, block_model)
+        regulations = sizes @ probabilities @ sizes
+    elif random:
+        # an edge exists if a number drawn from 1..100 is at most probability * 100
+        regulations = num_of_vertices * mean_in if mean_in is not None else \
+            min(100, max(0, int(probability * 100))) / 100 * num_of_vertices ** 2
+    elif directed_config:
+        mean_out = num_of_connections if out_degree_dist is None else distribution_mean(out_degree_dist)
+        regulations = num_of_vertices * min(num_of_connections if mean_in is None else mean_in, mean_out)
+    elif directed_ba or directed_ws:
+        regulations = num_of_vertices * num_of_connections
+    elif ba:
+        regulations = num_of_connections * (num_of_vertices - num_of_connections)
+    elif ws:
+        regulations = num_of_vertices * (num_of_connections // 2)
+    else:
+        raise ValueError("No model of the network was selected")
+    if in_degree_cap is not None:
+        regulations = min(regulations, num_of_vertices * in_degree_cap)
+    if mean_in is not None and not (random or directed_config):
+        regulations = min(regulations, num_of_vertices * mean_in)
+    return float(regulations)
+
+
+def estimate_cost(num_of_vertices: int, n=1, probability=0, num_of_connections=0, ba=False, ws=False,
+                  random=False, in_degree_cap=None, in_degree_dist=None, directed_ba=False, directed_config=False,
+                  directed_ws=False, out_degree_dist=None, topology=None, block_model=None, out_format='sbml',
+                  memory_budget=None, workers=None, write_buffers=8, shard=None, variants=None, functions='chains',
+                  screen=None, dedup=None) -> dict:
+    """Predicts the output size, peak memory and wall time of 'generate_bn' from its parameters alone
+
+    The expected number of regulations (see 'expected_regulations') is combined with the costs per vertex and per
+    regulation in COST_MODEL, which were measured on a single core with the default 'chains' update functions.
+    Peak memory is the memory of one network being generated and written on top of the interpreter; the dense
+    n×n draws of the random network dominate it unless a 'memory_budget' is given. Wall time scales with the speed
+    of the machine, serialization is split among the 'workers'. Costs of truth-table update 'functions', of the
+    dynamics 'screen' and of deduplication ('dedup') aren't modelled, neither are the networks resampled by the
+    complexity budget, the screen or 'dedup'; the options of them that are used are listed in 'not_counted'.
+
+    Parameters are the same as of 'generate_bn', 'variants' multiply the number of written networks.
+
+    Returns
+    -------
+    dict
+        'regulations' and 'bytes' of one network, number of 'networks' of the (shard of the) batch, total 'disk' and
+        peak 'memory' in bytes, wall time in 'seconds' and the list of the costs 'not_counted' in them
+    """
+    regulations = expected_regulations(num_of_vertices, probability, num_of_connections, ba, ws, random,
+                                       in_degree_cap, in_degree_dist, directed_ba, directed_config, directed_ws,
+                                       out_degree_dist, topology, block_model)
+    per_vertex, per_regulation = COST_MODEL[f'{out_format}_bytes']
+    network_bytes = per_vertex * num_of_vertices + per_regulation * regulations
+    networks = len(shard_indices(n, shard)) * (1 if variants is None else len(variants))
+    if topology is not None:
+        source = 'arrays'
+    elif random and in_degree_dist is None:
+        source = 'matrix'  # n×n matrices of the random draws
+    elif ba or ws:
+        source = 'networkx'
+    else:
+        source = 'arrays'
+    draw_memory = COST_MODEL[f'{source}_bytes'] * regulations
+    draw_seconds = COST_MODEL[f'{source}_seconds'] * regulations
+    if source == 'matrix':
+        cells = num_of_vertices ** 2
+        draw_memory += COST_MODEL['cell_bytes'] * cells
+        draw_seconds += COST_MODEL['cell_seconds'] * cells
+    per_vertex, per_regulation = COST_MODEL['write_bytes']
+    write_memory = per_vertex * num_of_vertices + per_regulation * regulations
+    if memory_budget is not None:
+        write_memory = min(write_memory, memory_budget)
+        if source == 'matrix':
+            draw_memory = min(draw_memory, memory_budget)  # drawn in blocks, edges spilled to disk
+    per_vertex, per_regulation = COST_MODEL['write_seconds']
+    write_seconds = (per_vertex * num_of_vertices + per_regulation * regulations) / max(1, workers or 1)
+    if out_format != 'sbml':
+        write_seconds = 0
+    not_counted = [name for name, used in [('truth-table update functions', functions != 'chains'),
+                                           ('dynamics screen', screen is not None),
+                                           ('deduplication', dedup is not None)] if used]
+    return {'regulations': regulations, 'bytes': network_bytes, 'networks': networks,
+            'disk': network_bytes * networks,
+            'memory': max(draw_memory, write_memory) + write_buffers * 2**20 * (out_format == 'sbml'),
+            'seconds': (draw_seconds + write_seconds) * networks, 'not_counted': not_counted}
+
+
+def available_resources(loc: str) -> tuple:
+    """Returns (free disk space in the directory 'loc', available memory) in bytes, None if it can't be found"""
+    try:
+        disk = disk_usage(path.dirname(loc) or '.').free
+    except OSError:
+        disk = None
+    try:
+        memory = sysconf('SC_AVPHYS_PAGES') * sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):  # not available on Windows and macOS
+        memory = None
+    return disk, memory
+
+
+def exceeded_resources(estimate: dict, loc: str) -> dict:
+    """Compares the estimate of 'estimate_cost' with 'available_resources'
+
+    Returns
+    -------
+    dict
+        'disk' and/or 'memory' mapped to (estimated, available) bytes for the resources the estimate exceeds
+    """
+    disk, memory = available_resources(loc)
+    exceeded = {}
+    if disk is not None and estimate['disk'] > disk:
+        exceeded['disk'] = (estimate['disk'], disk)
+    if memory is not None and estimate['memory'] > memory:
+        exceeded['memory'] = (estimate['memory'], memory)
+    return exceeded
+
+
+def format_estimate(estimate: dict) -> str:
+    """Returns a human-readable summary of 'estimate_cost'"""
+    return (f"{estimate['networks']} networks, ~{estimate['regulations']:,.0f} regulations and "
+            f"{estimate['bytes'] / 2**20:,.1f} MB each\n"
+            f"Disk: {estimate['disk'] / 2**30:,.2f} GB, peak memory: {estimate['memory'] / 2**20:,.0f} MB, "
+            f"time: {timedelta(seconds=round(estimate['seconds']))}"
+            + (f"\nNot counted: {', '.join(estimate['not_counted'])}" if estimate.get('not_counted') else ''))
+
+
+"""----------------------------------------------FUNCTIONS FOR INPUT CHECK-------------------------------------------"""
+
+
+def check_number_of_vertices(arg):
+    # https://stackoverflow.com/a/56089296 I have read this discussion to help me decide how to deal with incorrect
+    # arguments.
+    # 'print' in combination with 'exit' statement makes the error message more readable for the user; however,
+    # raising exception has value for the programmer. Not sure which one to keep, print&exit seems more elegant.
+    try:
+        int(arg)
+    except ValueError:
+        # raise ValueError(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
+        print(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
+        exit(1)
+    if int(arg) < 2:  # or > n, after I find the threshold
+        # raise ValueError(f"Number of vertices must be in range [2, n), got {arg}")
+        print(f"Number of vertices must be in range [2, n), got {arg}", file=stderr)
+        exit(1)
+
+
+def check_probability_argument(arg):
+    try:
+        float(arg)
+    except ValueError:
+        # raise ValueError(f"Probability is not in a correct format, expected float, got {type(arg)}")
+        print(f"Probability is not in a correct format, expected float, got {type(arg)}")
+        exit(1)
+    if round(float(arg), 2) <= 0 or round(float(arg), 2) > 1:
+        # raise ValueError(f"Probability must be in range (0, 1> rounded to two decimal places, got {arg}")
+        print(f"Probability rounded to two decimal places must be within (0, 1] range, got {arg}", file=stderr)
+        exit(1)
+
+
+def check_probability_argument_for_ws(arg):
+    try:
+        float(arg)
+    except ValueError:
+        # raise ValueError(f"Probability is not in a correct format, expected float, got {type(arg)}")
+        print(f"Probability is not in a correct format, expected float, got {type(arg)}")
+        exit(1)
+    if round(float(arg), 2) < 0 or round(float(arg), 2) > 1:
+        # raise ValueError(f"Probability must be in range [0, 1> rounded to two decimal places, got {arg}")
+        print(f"Probability rounded to two decimal places must be within [0, 1] range, got {arg}", file=stderr)
+        exit(1)
+
+
+def check_num_of_connections(arg, threshold):
+    # threshold makes the function reusable for different models
+    try:
+        int(arg)
+    except ValueError:
+        # raise ValueError(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
+        print(f"Number of vertices is not in correct format, expected int, got {type(arg)}")
+        exit(1)
+    if int(arg) < threshold:  # or > n, after I find the threshold
+        # raise ValueError(f"Number of vertices must be in range [{threshold}, n), got {arg}")
+        print(f"Number of connections must be within [{threshold}, n) range, got {arg}", file=stderr)
+        exit(1)
+
+
+def check_shard_argument(arg):
+    try:
+        index, count = (int(part) for part in arg.split('/'))
+    except ValueError:
+        print(f"Shard is not in correct format, expected index/count, got {arg}", file=stderr)
+        exit(1)
+    if not 0 <= index < count:
+        print(f"Shard index must be in range [0, {count}), got {index}", file=stderr)
+        exit(1)
+
+
+"""------------------------------------------------------------------------------------------------------------------"""
+
+
+def remove_whitespaces(network):
+    # https://stackoverflow.com/a/43447546
+    try:
+        with open(network, 'r') as n:
+            lines = n.readlines()
+        lines = [line.strip() for line in lines]
+        return ''.join(lines)
+    except FileNotFoundError:
+        print(f"File \'{network}\' not found.", file=stderr)
+        exit(1)
+
+
+def modify_network(network, parametrisation_frac: float, seed: int, loc="", progress=None, cancel=None):
+    """Parametrises give network
+
+    Parameters
+    ----------
+    network
+        Network to be parametrised
+    parametrisation_frac : float
+        Denotes the fraction of all most-nested binary boolean functions to be replaced for parameters
+    seed : int
+        Seed value ensures the same result for the same seed
+    loc : str
+        Directory to store the networks in
+    progress : callable, optional
+        See 'generate_bn', called once the network is written
+    cancel : optional
+        See 'generate_bn', checked before the network is written
+
+    Returns
+    -------
+    dict
+        Report in the same form as in 'generate_bn'
+    """
+    # change all conjunctions to uninterpreted fncs, or disjunctions
+    line = remove_whitespaces(network)
+    i = 0
 
     and_matches = re.findall(r"(<and/><apply><eq/><ci>(\s*\w+\s*)</ci><cn type=\"integer\">\s*1\s*</cn></apply><apply><eq/>"
                          r"<ci>(\s*\w+\s*)</ci><cn type=\"integer\">\s*1\s*</cn></apply>)|"
@@ -722,11 +5194,23 @@ def modify_network(network, parametrisation_frac: float, seed: int, loc=""):
     # with open(f'{loc}parametrised_model_{datetime.now().strftime("%m%d%y%H%M%S")}.sbml', 'w') as net:
     base = path.basename(network)
     f_name = path.splitext(base)[0]
-    with open(f'{loc}parametrised_{f_name}_f{parametrisation_frac}_s{seed}.sbml', 'w') as net:
-        net.write(new_content)
+    if cancel is not None and cancel.is_set():
+        return {'accepted': 0, 'rejected': 0, 'cancelled': True}
+    out_name = f'{loc}parametrised_{f_name}_f{parametrisation_frac}_s{seed}.sbml'
+    tmp_name = partial_name(out_name)
+    try:
+        with open(tmp_name, 'w') as net:
+            net.write(new_content)
+        publish_output(tmp_name, out_name)
+    except BaseException:
+        remove_output(tmp_name)
+        raise
+    if progress is not None:
+        progress(1, 1, new_content.count('<qual:qualitativeSpecies '), output_size(out_name))
+    return {'accepted': 1, 'rejected': 0, 'cancelled': False}
 
 
-def parse_json(json_file, loc=""):
+def parse_json(json_file, loc="", progress=None, cancel=None, shard=None, resume=False, dry_run=False):
     """Parses the json containing the configuration for the network generation
 
     Parameters
@@ -735,92 +5219,571 @@ def parse_json(json_file, loc=""):
         Configuration file
     loc : str
         Directory to save the network
+    progress : callable, optional
+        See 'generate_bn'
+    cancel : optional
+        See 'generate_bn'
+    shard : tuple or str, optional
+        See 'generate_bn', overrides the 'shard' entry of the configuration
+    resume : bool, optional
+        See 'generate_bn'
+    dry_run : bool, optional
+        See 'generate_bn', also enabled by the 'dry run' entry of the configuration
 
     Returns
     -------
-    1 if the file isn't in valid JSON format, otherwise None
+    dict
+        Report of 'generate_bn' (counters of the networks accepted and rejected by the complexity budget)
     """
     try:
         with open(json_file, 'r') as js:
             try:
                 args = json.load(js)
-                seed = args['seed']
-                if seed == 'rand':
-                    seed = numpy.random.seed(int(time.time()))
-
-                number_of_vertices = args['vertices']
-                if number_of_vertices == 'rand':
-                    numpy.random.seed(seed)
-                    number_of_vertices = numpy.random.randint(low=2, high=1001)  # 1001 off by one
-
-                num_of_networks = args['number of networks']
-                if num_of_networks == 'rand':
-                    numpy.random.seed(seed)
-                    num_of_networks = numpy.random.randint(low=1, high=5)
-
-                frac_of_act_regs = args['fraction of act regs']
-                if frac_of_act_regs == 'rand':
-                    numpy.random.seed(seed)
-                    frac_of_act_regs = round(numpy.random.random(), 1)
-
-                l_arity = args['uninterpreted function arity']['lower bound']
-                if l_arity == 'rand':
-                    numpy.random.seed(seed)
-                    l_arity = numpy.random.randint(low=1, high=5)
-
-                u_arity = args['uninterpreted function arity']['upper bound']
-                if u_arity == 'rand':
-                    numpy.random.seed(seed)
-                    u_arity = numpy.random.randint(low=4, high=9)
-
-                if args['generator']['Barabasi-Albert']['use']:
-                    conn = args['generator']['Barabasi-Albert']['connections']
-                    if conn == 'rand':
-                        numpy.random.seed(seed)
-                        conn = numpy.random.randint(2, number_of_vertices - 1)
-                    generate_bn(number_of_vertices, seed, num_of_connections=conn, l_bound=l_arity, u_bound=u_arity,
-                                frac_reg=frac_of_act_regs, ba=True, loc=loc, n=num_of_networks)
-
-                elif args['generator']['Watts-Strogatz']['use']:
-                    conn = args['generator']['Watts-Strogatz']['connections']
-                    if conn == 'rand':
-                        numpy.random.seed(seed)
-                        conn = numpy.random.randint(2, number_of_vertices)
-                    probability = args['generator']['Watts-Strogatz']['rewire probability']
-                    if probability == 'rand':
-                        numpy.random.seed(seed)
-                        probability = round(numpy.random.random(), 2)
-                    generate_bn(number_of_vertices, seed, num_of_connections=conn,
-                                probability=probability, l_bound=l_arity, u_bound=u_arity,
-                                frac_reg=frac_of_act_regs, ws=True, loc=loc, n=num_of_networks)
-
-                elif args['generator']['Random Network']['use']:
-                    probability = args['generator']['Random Network']['connection probability']
-                    if probability == 'rand':
-                        numpy.random.seed(seed)
-                        probability = round(numpy.random.random(), 2)
-                    generate_bn(number_of_vertices, seed, probability=probability,
-                                l_bound=l_arity, u_bound=u_arity, frac_reg=frac_of_act_regs,
-                                random=True, loc=loc, n=num_of_networks)
             except json.JSONDecodeError:
                 print(f"Invalid json file {json_file}")
                 exit(1)
     except FileNotFoundError:
         print(f"File \'{json_file}\' not found.", file=stderr)
         exit(1)
+    return run_configuration(args, loc, progress, cancel, shard, resume, dry_run)
+
+
+def run_configuration(args: dict, loc="", progress=None, cancel=None, shard=None, resume=False, dry_run=False):
+    """Generates the networks described by the loaded json configuration (see 'parse_json')
+
+    Parameters
+    ----------
+    args : dict
+        Configuration in the format of args.json
+    loc : str
+        Directory to save the network
+    progress : callable, optional
+        See 'generate_bn'
+    cancel : optional
+        See 'generate_bn'
+    shard : tuple or str, optional
+        See 'generate_bn', overrides the 'shard' entry of the configuration
+    resume : bool, optional
+        See 'generate_bn'
+    dry_run : bool, optional
+        See 'generate_bn', also enabled by the 'dry run' entry of the configuration
+
+    Returns
+    -------
+    dict
+        Report of 'generate_bn' (counters of the networks accepted and rejected by the complexity budget)
+    """
+    seed = args['seed']
+    if seed == 'rand':
+        if resume or (shard if shard is not None else args.get('shard')) is not None:
+            raise ValueError("Sharding and resuming need the seed set to a number, the same for all shards and runs")
+        seed = int(time.time())
+
+    number_of_vertices = args['vertices']
+    if number_of_vertices == 'rand':
+        numpy.random.seed(seed)
+        number_of_vertices = numpy.random.randint(low=2, high=1001)  # 1001 off by one
+
+    num_of_networks = args['number of networks']
+    if num_of_networks == 'rand':
+        numpy.random.seed(seed)
+        num_of_networks = numpy.random.randint(low=1, high=5)
+
+    frac_of_act_regs = args['fraction of act regs']
+    if frac_of_act_regs == 'rand':
+        numpy.random.seed(seed)
+        frac_of_act_regs = round(numpy.random.random(), 1)
+
+    l_arity = args['uninterpreted function arity']['lower bound']
+    if l_arity == 'rand':
+        numpy.random.seed(seed)
+        l_arity = numpy.random.randint(low=1, high=5)
+
+    u_arity = args['uninterpreted function arity']['upper bound']
+    if u_arity == 'rand':
+        numpy.random.seed(seed)
+        u_arity = numpy.random.randint(low=4, high=9)
+
+    budget = args.get('complexity budget', {})
+    in_degree = args.get('in-degree', {})
+    options = {'max_log2_params': budget.get('max log2 parametrisations'),
+               'max_in_degree': budget.get('max in-degree'),
+               'max_functions': budget.get('max uninterpreted functions'),
+               'in_degree_cap': in_degree.get('cap'),
+               'in_degree_dist': in_degree.get('distribution'),
+               'progress': progress, 'cancel': cancel, 'shard': shard}
+    options['workers'] = args.get('workers')
+    if args.get('variants') is not None:
+        options['variants'] = [{name: variant[key] for key, name in
+                                [('lower bound', 'l_bound'), ('upper bound', 'u_bound'),
+                                 ('fraction of act regs', 'frac_reg')] if key in variant}
+                               for variant in args['variants']]
+        options['topology_cache'] = args.get('topology cache')
+    if args.get('memory budget') is not None:
+        options['memory_budget'] = int(args['memory budget'] * 2**20)  # in MB
+    if args.get('write buffers') is not None:
+        options['write_buffers'] = args['write buffers']
+    if shard is None:
+        options['shard'] = args.get('shard')
+    if args.get('deduplication') is not None:
+        options['dedup'] = args['deduplication']
+    if resume:
+        options['resume'] = True
+    if dry_run or args.get('dry run'):
+        options['dry_run'] = True
+    if args.get('statistics'):
+        options['stats'] = True
+    if args.get('update functions') is not None:
+        options['functions'] = args['update functions']['kind']
+        options['uninterpreted_frac'] = args['update functions'].get('uninterpreted fraction', 0.5)
+    if args.get('dynamics screen') is not None:
+        conf = args['dynamics screen']
+        options['screen'] = {name: conf[key] for key, name in
+                             [('criteria', 'criteria'), ('action', 'action'), ('instantiations', 'instantiations'),
+                              ('initial states', 'states'), ('steps', 'steps'), ('window', 'window')] if key in conf}
+
+    if args['generator']['Barabasi-Albert']['use']:
+        conn = args['generator']['Barabasi-Albert']['connections']
+        if conn == 'rand':
+            numpy.random.seed(seed)
+            conn = numpy.random.randint(2, number_of_vertices - 1)
+        return generate_bn(number_of_vertices, seed, num_of_connections=conn, l_bound=l_arity,
+                           u_bound=u_arity, frac_reg=frac_of_act_regs, ba=True, loc=loc,
+                           n=num_of_networks, **options)
+
+    elif args['generator']['Watts-Strogatz']['use']:
+        conn = args['generator']['Watts-Strogatz']['connections']
+        if conn == 'rand':
+            numpy.random.seed(seed)
+            conn = numpy.random.randint(2, number_of_vertices)
+        probability = args['generator']['Watts-Strogatz']['rewire probability']
+        if probability == 'rand':
+            numpy.random.seed(seed)
+            probability = round(numpy.random.random(), 2)
+        return generate_bn(number_of_vertices, seed, num_of_connections=conn,
+                           probability=probability, l_bound=l_arity, u_bound=u_arity,
+                           frac_reg=frac_of_act_regs, ws=True, loc=loc, n=num_of_networks, **options)
+
+    elif args['generator']['Random Network']['use']:
+        probability = args['generator']['Random Network']['connection probability']
+        if probability == 'rand':
+            numpy.random.seed(seed)
+            probability = round(numpy.random.random(), 2)
+        # estimate of generate_bn is an upper bound of the batches
+        if args.get('batch size') is not None and not options.get('dry_run'):
+            unsupported = [key for key in ['complexity budget', 'in-degree', 'variants', 'memory budget',
+                                           'deduplication', 'update functions', 'dynamics screen', 'statistics']
+                           if args.get(key)]
+            if unsupported or resume:
+                raise ValueError(f"{', '.join(unsupported + ['resume'] * resume).capitalize()} isn't supported "
+                                 f"with batch size")
+            return generate_bn_batch(number_of_vertices, seed, probability, l_arity, u_arity, frac_of_act_regs, loc,
+                                     num_of_networks, args['batch size'], progress, cancel, options['shard'])
+        return generate_bn(number_of_vertices, seed, probability=probability,
+                           l_bound=l_arity, u_bound=u_arity, frac_reg=frac_of_act_regs,
+                           random=True, loc=loc, n=num_of_networks, **options)
+
+    elif args['generator'].get('Directed preferential attachment', {}).get('use'):
+        return generate_bn(number_of_vertices, seed,
+                           num_of_connections=args['generator']['Directed preferential attachment']
+                           ['mean degree'], l_bound=l_arity, u_bound=u_arity,
+                           frac_reg=frac_of_act_regs, directed_ba=True, loc=loc, n=num_of_networks,
+                           **options)
+
+    elif args['generator'].get('Directed configuration', {}).get('use'):
+        conf = args['generator']['Directed configuration']
+        return generate_bn(number_of_vertices, seed, num_of_connections=conf.get('mean degree', 0),
+                           l_bound=l_arity, u_bound=u_arity, frac_reg=frac_of_act_regs,
+                           directed_config=True, loc=loc, n=num_of_networks,
+                           out_degree_dist=conf.get('out-degree distribution'), **options)
+
+    elif args['generator'].get('Edge list', {}).get('use'):
+        topology = load_topology(args['generator']['Edge list']['file'])
+        return generate_bn(topology['num_of_vertices'], seed, l_bound=l_arity, u_bound=u_arity,
+                           frac_reg=frac_of_act_regs, loc=loc, n=num_of_networks, topology=topology,
+                           **options)
+
+    elif args['generator'].get('Degree-preserving randomisation', {}).get('use'):
+        conf = args['generator']['Degree-preserving randomisation']
+        if options.get('dry_run') or resume:
+            raise ValueError(f"{'Dry run' if options.get('dry_run') else 'Resuming'} isn't supported with "
+                             f"degree-preserving randomisation")
+        return generate_degree_preserving_ensemble(conf['model'], num_of_networks, seed,
+                                                   conf.get('swaps per edge', 10), l_arity, u_arity, loc,
+                                                   options['workers'], progress, cancel,
+                                                   options['shard'], options.get('dedup'))
+
+    elif args['generator'].get('Stochastic block model', {}).get('use'):
+        conf = args['generator']['Stochastic block model']
+        return generate_bn(number_of_vertices, seed, l_bound=l_arity, u_bound=u_arity, frac_reg=frac_of_act_regs,
+                           loc=loc, n=num_of_networks, block_model=(conf['modules'], conf['probabilities']),
+                           **options)
+
+    elif args['generator'].get('Directed small-world', {}).get('use'):
+        return generate_bn(number_of_vertices, seed,
+                           num_of_connections=args['generator']['Directed small-world']['connections'],
+                           probability=args['generator']['Directed small-world']['rewire probability'],
+                           l_bound=l_arity, u_bound=u_arity, frac_reg=frac_of_act_regs,
+                           directed_ws=True, loc=loc, n=num_of_networks, **options)
+
+
+"""------------------------------------------------GENERATION SERVICE------------------------------------------------"""
+
+
+def run_service_job(request: dict, loc: str, inline: bool) -> tuple:
+    """Runs one request of 'GenerationService' in a worker process
+
+    Parameters
+    ----------
+    request : dict
+        'generate' request with 'config' in the format of args.json, or 'modify' request with 'network' (path of an
+        SBML qual model) or 'sbml' (the model itself, named by the optional 'name'), 'parametrisation fraction'
+        and 'seed'
+    loc : str
+        Directory the networks are written to; it is created and, for 'inline' results, removed afterwards
+    inline : bool
+        Return the contents of the networks instead of their paths
+
+    Returns
+    -------
+    tuple
+        (report, files), where 'files' are the paths of the networks or (name, sbml) pairs if 'inline'
+    """
+    makedirs(loc, exist_ok=True)
+    loc = path.join(loc, '')
+    try:
+        if request.get('type', 'generate') == 'generate':
+            # the pool already overlaps the writes of different requests, a writer thread per request doesn't pay off
+            report = run_configuration(dict({'write buffers': 0}, **request['config']), loc)
+        elif request['type'] == 'modify':
+            network = request.get('network')
+            if network is None:
+                network = f'{loc}{request.get("name", "network")}.sbml'
+                with open(network, 'w') as net:
+                    net.write(request['sbml'])
+            elif not path.isfile(network):
+                raise FileNotFoundError(f"File '{network}' not found")
+            report = modify_network(network, request.get('parametrisation fraction', 0.5),
+                                    request.get('seed', int(time.time())), loc)
+            if 'sbml' in request:
+                remove(network)
+        else:
+            raise ValueError(f"Unknown type of request {request['type']}")
+        names = sorted(listdir(loc))
+        if not inline:
+            return report, [f'{loc}{name}' for name in names]
+        files = []
+        for name in names:
+            with open(f'{loc}{name}', 'r') as net:
+                files.append((name, net.read()))
+        return report, files
+    finally:
+        if inline:
+            rmtree(loc, ignore_errors=True)
+
+
+def warm_up_worker() -> int:
+    """Makes sure the worker process is started and the module is imported in it"""
+    return getpid()
+
+
+class GenerationService:
+    """Long-running local service generating networks on a warm pool of worker processes
+
+    Clients send one json request per line (see 'run_service_job') with an optional 'id' and get json lines back:
+    for results returned inline, one line with 'file' and 'sbml' per network, then a line with 'status' 'done',
+    the 'report' and the 'files'; or a line with 'status' 'error'. Request {"type": "stats"} returns the number of
+    'queued' and 'running' requests and the throughput. Requests of one connection run concurrently, so the responses
+    may come in a different order than the requests. At most 'max_queued' requests wait for the pool, further
+    requests aren't read until some of them finish. A worker process dying (e.g. killed for lack of memory) breaks
+    the pool and fails all requests in it; the pool is then replaced and each of these requests is retried alone in
+    a new process, so only the request that kills its process again gets an error.
+    """
+
+    def __init__(self, out_dir=None, workers=None, max_queued=1024):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.slots = asyncio.Semaphore(max_queued)
+        self.executor = None
+        self.pool_size = workers or cpu_count() or 1
+        self.started = time.time()
+        self.submitted = 0
+        self.finished = 0
+        self.failed = 0
+        self.networks = 0
+        self.recent = deque()  # (time, networks) of the requests finished in the last minute
+
+    def stats(self) -> dict:
+        """Returns the numbers of queued, running, finished and failed requests and the throughput
+
+        'requests_per_second' and 'networks_per_second' are averaged over the last minute, or over the uptime if
+        the service runs for a shorter time.
+        """
+        now = time.time()
+        while self.recent and self.recent[0][0] < now - 60:
+            self.recent.popleft()
+        window = min(60.0, now - self.started) or 1.0
+        in_progress = self.submitted - self.finished - self.failed
+        return {'queued': max(0, in_progress - self.pool_size), 'running': min(in_progress, self.pool_size),
+                'finished': self.finished, 'failed': self.failed, 'networks': self.networks,
+                'requests_per_second': len(self.recent) / window,
+                'networks_per_second': sum(networks for _, networks in self.recent) / window,
+                'uptime': now - self.started}
+
+    async def run(self, request: dict, send) -> None:
+        """Runs one request and sends its response lines by 'send'"""
+        request_id = request.get('id')
+        if request.get('type') == 'stats':
+            await send(dict(self.stats(), id=request_id, status='stats'))
+            return
+        inline = request.get('inline', self.out_dir is None)
+        job = f'job_{self.submitted}_{request_id}' if request_id is not None else f'job_{self.submitted}'
+        self.submitted += 1
+        try:
+            if inline:
+                loc = mkdtemp(prefix='.job_', dir=self.out_dir)
+            elif self.out_dir is None:
+                raise ValueError('The service has no output directory, request the results inline')
+            else:
+                loc = path.join(self.out_dir, re.sub(r'[^\w.-]', '_', job))
+            report, files = await self.submit(request, loc, inline)
+        except Exception as e:
+            self.failed += 1
+            await send({'id': request_id, 'status': 'error', 'error': f'{type(e).__name__}: {e}'})
+            return
+        self.finished += 1
+        self.networks += report['accepted']
+        self.recent.append((time.time(), report['accepted']))
+        if inline:
+            for name, sbml in files:
+                await send({'id': request_id, 'file': name, 'sbml': sbml})
+            files = [name for name, _ in files]
+        await send({'id': request_id, 'status': 'done', 'report': report, 'files': files})
+
+    async def submit(self, request: dict, loc: str, inline: bool) -> tuple:
+        """Runs 'run_service_job' on the pool, replacing the pool and retrying the request if the pool breaks"""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, run_service_job, request, loc, inline)
+        except BrokenProcessPool:
+            if self.executor is executor:  # the first of the failed requests replaces the pool
+                executor.shutdown(wait=False)
+                self.executor = ProcessPoolExecutor(max_workers=self.pool_size)
+        rmtree(loc, ignore_errors=True)  # the directory is the request's own, drop what the dead process left there
+        single = ProcessPoolExecutor(max_workers=1)
+        try:
+            return await loop.run_in_executor(single, run_service_job, request, loc, inline)
+        finally:
+            single.shutdown(wait=False)
+
+    async def handle(self, reader, writer) -> None:
+        """Serves one client connection"""
+        tasks = set()
+
+        async def send(response):
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        async def run(request):
+            try:
+                await self.run(request, send)
+            finally:
+                self.slots.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await send({'status': 'error', 'error': f'Invalid json: {e}'})
+                    continue
+                await self.slots.acquire()  # backpressure, the connection isn't read while the queue is full
+                task = asyncio.ensure_future(run(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_socket=None, ready=None) -> None:
+        """Starts the pool and serves the clients until cancelled
+
+        Listens on the Unix socket if 'unix_socket' is given, otherwise on TCP 'host' and 'port'. 'ready' is called
+        once the service accepts connections.
+        """
+        self.executor = ProcessPoolExecutor(max_workers=self.pool_size)
+        try:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[loop.run_in_executor(self.executor, warm_up_worker)
+                                   for _ in range(self.pool_size)])
+            if unix_socket is not None:
+                server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+            async with server:
+                if ready is not None:
+                    ready()
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()  # the pool may have been replaced in the meantime
+
+
+def serve(host='127.0.0.1', port=8765, unix_socket=None, out_dir=None, workers=None, max_queued=1024) -> None:
+    """Runs 'GenerationService' until interrupted
+
+    Parameters
+    ----------
+    host : str, optional
+        Address to listen on, local only by default
+    port : int, optional
+        TCP port
+    unix_socket : str, optional
+        Path of a Unix socket to listen on instead of TCP
+    out_dir : str, optional
+        Directory the networks are written to (into a subdirectory per request); by default they are returned
+        inline
+    workers : int, optional
+        Number of worker processes, the number of CPUs by default
+    max_queued : int, optional
+        Maximal number of requests in progress
+
+    Returns
+    -------
+    None
+    """
+    try:
+        asyncio.run(GenerationService(out_dir, workers, max_queued).serve(host, port, unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+def service_requests(requests, host='127.0.0.1', port=8765, unix_socket=None):
+    """Sends the requests to a running 'GenerationService' and yields its responses until all requests are done
+
+    Parameters
+    ----------
+    requests
+        Iterable of the requests (see 'GenerationService')
+    host : str, optional
+        Address of the service
+    port : int, optional
+        TCP port of the service
+    unix_socket : str, optional
+        Path of the Unix socket of the service
+
+    Returns
+    -------
+    generator
+        Response dicts
+    """
+    requests = list(requests)
+    if unix_socket is not None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(unix_socket)
+    else:
+        connection = socket.create_connection((host, port))
+    with connection, connection.makefile('rb') as responses:
+        connection.sendall(b''.join(json.dumps(request).encode() + b'\n' for request in requests))
+        remaining = len(requests)
+        for line in responses:
+            response = json.loads(line)
+            yield response
+            if response.get('status') in ['done', 'error', 'stats']:
+                remaining -= 1
+                if not remaining:
+                    break
 
 
 # deprecated, still usable tho
 if __name__ == "__main__":
     from sys import argv, stderr
 
+    resume = '--resume' in argv
+    if resume:
+        argv.remove('--resume')
+    dry_run = '--dry-run' in argv
+    if dry_run:
+        argv.remove('--dry-run')
+    shard = None
+    if '--shard' in argv[:-1]:
+        shard = argv[argv.index('--shard') + 1]
+        check_shard_argument(shard)
+        del argv[argv.index('--shard'):argv.index('--shard') + 2]
+    seed = None
+    if '--seed' in argv[:-1]:
+        seed = argv[argv.index('--seed') + 1]
+        if not seed.isdigit():
+            print(f"Seed has to be a non-negative integer, not {seed}")
+            exit(1)
+        seed = int(seed)
+        del argv[argv.index('--seed'):argv.index('--seed') + 2]
+
+    def print_estimate(estimate):
+        print(format_estimate(estimate))
+        for resource, (estimated, available) in exceeded_resources(estimate, '').items():
+            print(f"Warning: estimated {resource} {estimated / 2**30:.2f} GB exceeds the available "
+                  f"{available / 2**30:.2f} GB", file=stderr)
+
+    if dry_run and (argv[1:2] in [['serve'], ['merge']] or
+                    (len(argv) == 2 and not argv[1].endswith('.json') and
+                     path.splitext(argv[1])[1] not in ['.graphml', '.npy', '.txt', '.tsv', '.csv', '.edges'])):
+        print("Dry run is only supported when generating networks")
+        exit(1)
+    if len(argv) in [3, 4] and argv[1] == 'serve':
+        address = argv[2]
+        serve(port=int(address) if address.isdigit() else 8765, unix_socket=None if address.isdigit() else address,
+              out_dir=argv[3] if len(argv) == 4 else None)
+        exit(0)
+    if len(argv) > 3 and argv[1] == 'merge':
+        merged = merge_manifests(argv[3:], argv[2])
+        if merged['missing']:
+            print(f"Networks missing in the manifests: {merged['missing']}", file=stderr)
+            exit(1)
+        print(f"Manifests merged to {argv[2]}")
+        exit(0)
     if len(argv) == 2:
         if argv[1].endswith('.json'):
-            parse_json(argv[1])
+            report = parse_json(argv[1], shard=shard, resume=resume, dry_run=dry_run)
+            if report is not None and 'estimate' in report:
+                print_estimate(report['estimate'])
+                exit(0)
+            if report is not None and report['rejected']:
+                print(f"Networks accepted: {report['accepted']}, rejected by the complexity budget: "
+                      f"{report['rejected']}")
+            if report is not None and report.get('duplicates'):
+                print(f"Duplicate networks: {report['duplicates']} "
+                      f"({report['duplicates'] / (report['accepted'] + report['duplicates']):.1%} of generated)")
+            if report is not None and 'dynamics' in report:
+                failed = sum(not summary['passed'] for summary in report['dynamics'].values())
+                print(f"Networks rejected by the dynamics screen: {report['screened']}, written networks failing "
+                      f"its criteria: {failed}")
+            if report is not None and 'stats_file' in report:
+                print(f"Ensemble statistics written to {report['stats_file']}")
         elif argv[1].endswith('.sbml'):
             modify_network(argv[1], parametrisation_frac=0.5, seed=int(time.time()))
+        elif argv[1].endswith('.npz') or path.isfile(path.join(argv[1], 'meta.json')):
+            snapshot_to_sbml(argv[1])
+        elif path.splitext(argv[1])[1] in ['.graphml', '.npy', '.txt', '.tsv', '.csv', '.edges']:
+            if seed is None and (shard is not None or resume):
+                print("Sharding and resuming need the same seed for all shards and runs, set it by --seed")
+                exit(1)
+            topology = load_topology(argv[1])
+            report = generate_bn(topology['num_of_vertices'], seed=int(time.time()) if seed is None else seed,
+                                 topology=topology, shard=shard, resume=resume, dry_run=dry_run)
+            if dry_run:
+                print_estimate(report['estimate'])
+                exit(0)
         else:
-            print(f"{argv[1]} is neither a json nor an smbl file.")
+            print(f"{argv[1]} is neither a json, an smbl file, a snapshot nor an edge list.")
             exit(1)
         print("Network generated successfully!")
         exit(0)
@@ -829,13 +5792,19 @@ if __name__ == "__main__":
     check_number_of_vertices(argv[2])
     if argv[1] == 'ba':
         check_num_of_connections(argv[3], 1)  # check if number of edges per vertex is reasonable
-        generate_bn(int(argv[2]), seed=int(argv[4]), num_of_connections=int(argv[3]), ba=True)
+        report = generate_bn(int(argv[2]), seed=int(argv[4]), num_of_connections=int(argv[3]), ba=True, shard=shard,
+                             resume=resume, dry_run=dry_run)
     elif argv[1] == 'ws':
         check_num_of_connections(argv[3], 2)
         check_probability_argument_for_ws(argv[4])
-        generate_bn(int(argv[2]), seed=int(argv[5]), num_of_connections=int(argv[3]),
-                    probability=round(float(argv[4]), 2), ws=True)
-    elif argv[1] == 'rand':
+        report = generate_bn(int(argv[2]), seed=int(argv[5]), num_of_connections=int(argv[3]),
+                             probability=round(float(argv[4]), 2), ws=True, shard=shard, resume=resume,
+                             dry_run=dry_run)
+    else:
         check_probability_argument(argv[3])
-        generate_bn(int(argv[2]), seed=int(argv[4]), probability=round(float(argv[3]), 2), random=True)
+        report = generate_bn(int(argv[2]), seed=int(argv[4]), probability=round(float(argv[3]), 2), random=True,
+                             shard=shard, resume=resume, dry_run=dry_run)
+    if dry_run:
+        print_estimate(report['estimate'])
+        exit(0)
     print("Network generated successfully!")
@@ -0,0 +1,12 @@
+import sys
+from os import path
+
+import pytest
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+
+@pytest.fixture
+def loc(tmp_path):
+    """Output directory in the form 'generate_bn' expects it (with the trailing separator)"""
+    return path.join(str(tmp_path), '')
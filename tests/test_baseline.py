@@ -0,0 +1,49 @@
+import hashlib
+from os import listdir, path
+
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+# SHA-256 of the networks written by the first release for the same arguments
+BASELINE = {
+    'bn_ba_2_s5_l2_u4_f0.8_n30_0.sbml': 'bf1f2015ea23a5d1116267032e369234520f2fe1898de4a561fa6781df5db5a4',
+    'bn_ba_2_s5_l2_u4_f0.8_n30_1.sbml': '1d44527ee1f1cecf430c1a38ae6f28b8bfd48d762bea3421e6646f9716af4934',
+    'bn_rand_0.2_s5_l2_u4_f0.8_n20_0.sbml': '3a8a8cd57ae4342288f1c413dde868ccda461c54c6677e98e1010e9285045707',
+    'bn_rand_0.2_s5_l2_u4_f0.8_n20_1.sbml': 'cbde98b3851a2cc2f0ed66f11bc3cee7afbb03c9e7b8e87e49b3f6c1db9bef1b',
+    'bn_ws_4_0.3_s5_l2_u4_f0.8_n30_0.sbml': '42a9d54a0734d0dddda17789db3140ff4d2728ab8ac2407a6682a1fac2204516',
+    'bn_ws_4_0.3_s5_l2_u4_f0.8_n30_1.sbml': '0464c3e3615b503032751b1384c1ba582cc60cdd39d37497efe8109ccb4f02e0',
+}
+MODELS = [dict(num_of_vertices=30, num_of_connections=2, ba=True),
+          dict(num_of_vertices=30, num_of_connections=4, probability=0.3, ws=True),
+          dict(num_of_vertices=20, probability=0.2, random=True)]
+
+
+def digest(file_name):
+    with open(file_name, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def generate_all(loc, **options):
+    for model in MODELS:
+        gen.generate_bn(seed=5, loc=loc, n=2, **model, **options)
+    return {name: digest(path.join(loc, name)) for name in sorted(listdir(loc)) if name.endswith('.sbml')}
+
+
+def test_output_matches_first_release(loc):
+    assert generate_all(loc) == BASELINE
+
+
+@pytest.mark.parametrize('options', [{'write_buffers': 0}, {'workers': 2}, {'memory_budget': 2 ** 16}])
+def test_output_is_independent_of_execution_options(loc, options):
+    assert generate_all(loc, **options) == BASELINE
+
+
+@pytest.mark.parametrize('out_format', ['npz', 'npy'])
+def test_snapshot_reexport_matches_sbml(loc, out_format):
+    model = MODELS[2]
+    gen.generate_bn(seed=5, loc=loc, n=2, out_format=out_format, **model)
+    for i in range(2):
+        stem = f'{loc}bn_rand_0.2_s5_l2_u4_f0.8_n20_{i}'
+        sbml_file = gen.snapshot_to_sbml(f'{stem}.npz' if out_format == 'npz' else stem)
+        assert digest(sbml_file) == BASELINE[path.basename(sbml_file)]
@@ -0,0 +1,24 @@
+import numpy
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+SAMPLES = 2000
+POSITIONS = 5
+
+
+def emitted_arities(arities, first_ones, in_degree, u_bound):
+    """Frequencies of the arities of the uninterpreted functions of regulators of a vertex with 'in_degree'
+    regulators, a function is only emitted if its argument mask has at least 'arity' ones among the regulators"""
+    emitted = numpy.take_along_axis(first_ones, arities[..., None] - 1, axis=-1)[..., 0] < in_degree
+    return numpy.bincount(arities[emitted], minlength=u_bound + 1) / arities.size
+
+
+def test_batch_plan_draws_arities_and_masks_as_plan_update_functions():
+    l_bound, u_bound, in_degree = 1, 3, 3
+    single = [gen.plan_update_functions([POSITIONS], seed, l_bound, u_bound)[1] for seed in range(SAMPLES)]
+    single = emitted_arities(numpy.array([plan['arities'] for plan in single]),
+                             numpy.array([plan['first_ones'] for plan in single]), in_degree, u_bound)
+    _, batch = gen.plan_update_functions_batch(numpy.full((SAMPLES, 1), POSITIONS), numpy.random.default_rng(3),
+                                               l_bound, u_bound)
+    batch = emitted_arities(batch['arities'], batch['first_ones'], in_degree, u_bound)
+    assert numpy.abs(single - batch).max() < 0.02
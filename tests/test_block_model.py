@@ -0,0 +1,28 @@
+import numpy
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def test_block_model_edge_counts_follow_the_probabilities():
+    # 4 modules of 500 vertices: 4 * 500^2 * 0.05 = 50000 regulations expected within the modules (sd ~ 218) and
+    # 12 * 500^2 * 0.001 = 3000 between them (sd ~ 55)
+    targets, regulators, signs = gen.generate_block_model_edges(2000, (4, (0.05, 0.001)), 3, 0.7)
+    modules = numpy.arange(2000) // 500
+    within = modules[targets] == modules[regulators]
+    assert abs(within.sum() - 50000) < 1100
+    assert abs((~within).sum() - 3000) < 275
+    counts = numpy.zeros((4, 4), dtype=int)
+    numpy.add.at(counts, (modules[regulators], modules[targets]), 1)
+    assert (numpy.abs(counts[~numpy.eye(4, dtype=bool)] - 250) < 80).all()  # 250 per pair of modules, sd ~ 16
+    assert len(numpy.unique(targets * 2000 + regulators)) == len(targets)  # no repeated regulation
+    assert abs(signs.mean() - 0.7) < 0.01
+
+
+def test_block_model_with_probability_matrix_and_dense_blocks():
+    probabilities = [[0.9, 0.0], [0.2, 0.0]]  # dense block is drawn without repetition, empty ones stay empty
+    targets, regulators, _ = gen.generate_block_model_edges(60, ([20, 40], probabilities), 5, 0.5)
+    modules = (numpy.arange(60) >= 20).astype(int)
+    assert (modules[targets] == 0).all()
+    assert abs((modules[regulators] == 0).sum() - 0.9 * 400) < 40
+    assert abs((modules[regulators] == 1).sum() - 0.2 * 800) < 50
+    assert len(numpy.unique(targets * 60 + regulators)) == len(targets)
@@ -0,0 +1,37 @@
+import threading
+from os import listdir
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def cancel_at(event, networks_done, vertices_written=0):
+    def progress(done, total, vertices, size):
+        if done >= networks_done and vertices >= vertices_written:
+            event.set()
+    return progress
+
+
+def test_cancel_between_networks_keeps_finished_ones(loc):
+    event = threading.Event()
+    report = gen.generate_bn(30, 1, probability=0.1, random=True, loc=loc, n=5, progress=cancel_at(event, 2),
+                             cancel=event)
+    assert report['cancelled']
+    assert report['accepted'] == 2
+    assert sorted(listdir(loc)) == [f'bn_rand_0.1_s1_l2_u4_f0.8_n30_{i}.sbml' for i in range(2)]
+
+
+def test_cancel_while_writing_removes_the_partial_network(loc):
+    event = threading.Event()
+    report = gen.generate_bn(3000, 1, probability=0.001, random=True, loc=loc, n=2,
+                             progress=cancel_at(event, 0, gen.CALLBACK_INTERVAL), cancel=event)
+    assert report['cancelled']
+    assert report['accepted'] == 0
+    assert listdir(loc) == []
+
+
+def test_cancel_set_before_start_writes_nothing(loc):
+    event = threading.Event()
+    event.set()
+    report = gen.generate_bn(30, 1, probability=0.1, random=True, loc=loc, n=3, cancel=event)
+    assert report == {'accepted': 0, 'rejected': 0, 'duplicates': 0, 'cancelled': True}
+    assert listdir(loc) == []
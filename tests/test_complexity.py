@@ -0,0 +1,61 @@
+import xml.etree.ElementTree as ET
+from os import listdir
+
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+MATHML = '{http://www.w3.org/1998/Math/MathML}'
+QUAL = '{http://www.sbml.org/sbml/level3/version1/qual/version1}'
+MODEL = dict(num_of_vertices=30, probability=0.1, random=True, l_bound=2, u_bound=4)
+
+
+def written_complexity(file_name):
+    """Complexity counted from the update functions written in the SBML file"""
+    root = ET.parse(file_name).getroot()
+    in_degrees = {species.get(f'{QUAL}id'): 0 for species in root.iter(f'{QUAL}qualitativeSpecies')}
+    functions = log2_params = 0
+    for transition in root.iter(f'{QUAL}transition'):
+        target = next(transition.iter(f'{QUAL}output')).get(f'{QUAL}qualitativeSpecies')
+        in_degrees[target] = len(list(transition.iter(f'{QUAL}input')))
+        applications = [node for node in transition.iter(f'{MATHML}apply') if node[0].tag == f'{MATHML}csymbol']
+        if not list(transition.iter(f'{MATHML}math')):
+            log2_params += 2 ** in_degrees[target]
+        functions += len(applications)
+        log2_params += sum(2 ** (len(node) - 1) for node in applications)
+    return {'max_in_degree': max(in_degrees.values()), 'uninterpreted_functions': functions,
+            'log2_parametrisations': log2_params}
+
+
+def planned_complexity(seed):
+    indptr, _, _, seed_trans = gen.generate_network_arrays(MODEL['num_of_vertices'], seed, MODEL['probability'],
+                                                           random=True)
+    return gen.complexity_from_in_degrees(numpy.diff(indptr), seed_trans, MODEL['l_bound'], MODEL['u_bound'])
+
+
+def test_complexity_matches_the_written_functions(loc):
+    gen.generate_bn(seed=7, loc=loc, n=5, **MODEL)
+    numpy.random.seed(7)
+    seeds = numpy.random.randint(gen.MAXSIZE, size=5)
+    for i, seed in enumerate(seeds.tolist()):
+        complexity = written_complexity(f'{loc}bn_rand_0.1_s7_l2_u4_f0.8_n30_{i}.sbml')
+        assert complexity['uninterpreted_functions'] > 0
+        assert complexity == planned_complexity(seed)
+
+
+@pytest.mark.parametrize('budget', [{'max_log2_params': 120}, {'max_functions': 6}, {'max_in_degree': 5}])
+def test_budget_rejects_and_counts(loc, budget):
+    report = gen.generate_bn(seed=11, loc=loc, n=4, **MODEL, **budget)
+    numpy.random.seed(11)
+    rejected = 0
+    for seed in numpy.random.randint(gen.MAXSIZE, size=4).tolist():
+        while not gen.fits_budget(planned_complexity(seed), **budget):  # resampled as documented in 'generate_bn'
+            rejected += 1
+            numpy.random.seed(seed)
+            seed = int(numpy.random.randint(gen.MAXSIZE))
+    assert rejected > 0
+    assert report['rejected'] == rejected
+    assert report['accepted'] == 4
+    for name in listdir(loc):
+        assert gen.fits_budget(written_complexity(loc + name), **budget)
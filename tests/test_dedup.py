@@ -0,0 +1,52 @@
+import threading
+from os import listdir
+
+import numpy
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def written(loc):
+    return {name for name in listdir(loc) if name.startswith('bn_')}
+
+
+def test_duplicates_refer_to_written_networks(loc):
+    fingerprints = {}
+    report = gen.generate_bn(3, 1, probability=0.1, random=True, loc=loc, n=30, dedup='drop',
+                             fingerprints=fingerprints)
+    assert report['duplicates'] > 0
+    assert report['accepted'] + report['duplicates'] == 30
+    assert set(fingerprints.values()) == written(loc)
+
+
+def test_fingerprint_of_a_cancelled_network_isnt_registered(loc):
+    fingerprints = {}
+    cancel = threading.Event()
+    report = gen.generate_bn(5000, 3, probability=0.0005, random=True, loc=loc, n=2, dedup='drop',
+                             fingerprints=fingerprints, cancel=cancel, progress=lambda *args: cancel.set())
+    assert report['cancelled']
+    assert written(loc) == set()
+    assert fingerprints == {}
+
+
+def relabelled(indptr, regulators, signs, permutation):
+    """Same network with vertex v renamed to permutation[v], regulators of each vertex keep their order"""
+    in_degrees = numpy.diff(indptr)
+    order = numpy.argsort(permutation)  # vertices in the order of their new names
+    new_indptr = numpy.concatenate([[0], numpy.cumsum(in_degrees[order])])
+    edges = numpy.concatenate([numpy.arange(indptr[v], indptr[v + 1]) for v in order])
+    return new_indptr, permutation[regulators[edges]], signs[edges]
+
+
+def test_relabelled_copies_have_the_same_fingerprint():
+    # with in-degrees above 4 every vertex gets an update function, so the functions don't depend on the numbering
+    targets, regulators, signs = gen.generate_random_edges_by_degree(60, [0] * 5 + [0.5, 0.5], 3, 0.6)
+    network = gen.edges_to_csr(60, targets, regulators, signs)
+    fingerprint = gen.network_fingerprint(*network, 11, 2, 4)
+    numpy.random.seed(0)
+    for _ in range(2):
+        assert gen.network_fingerprint(*relabelled(*network, numpy.random.permutation(60)), 11, 2, 4) == fingerprint
+    changed_sign = network[2].copy()
+    changed_sign[0] = ~changed_sign[0]
+    assert gen.network_fingerprint(network[0], network[1], changed_sign, 11, 2, 4) != fingerprint
+    assert gen.network_fingerprint(*network, 12, 2, 4) != fingerprint  # other update functions
@@ -0,0 +1,72 @@
+from os import listdir, makedirs
+
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def degrees(num_of_vertices, targets, regulators, signs):
+    """In-degrees and out-degrees of the vertices, counted separately for each type of regulation"""
+    signs = numpy.asarray(signs, dtype=int)
+    return numpy.bincount(targets * 2 + signs, minlength=2 * num_of_vertices), \
+        numpy.bincount(regulators * 2 + signs, minlength=2 * num_of_vertices)
+
+
+def write_model(file_name, num_of_vertices, seed):
+    indptr, regulators, signs, seed_trans = gen.generate_network_arrays(num_of_vertices, seed, probability=0.05,
+                                                                        random=True, frac_reg=0.6)
+    with open(file_name, 'w') as f:
+        gen.write_network_arrays_to_sbml(f, num_of_vertices, indptr, regulators, signs, seed_trans, 1, 3)
+    return indptr, regulators, signs
+
+
+def test_swaps_keep_degrees_per_sign_without_self_loops_and_repeated_regulations():
+    numpy.random.seed(2)
+    targets, regulators = numpy.random.randint(100, size=(2, 3000))
+    keep = targets != regulators
+    targets, regulators, signs = gen.drop_duplicate_edges(targets[keep], regulators[keep],
+                                                          numpy.random.random_sample(keep.sum()) < 0.6)
+    new_targets, new_regulators, new_signs = gen.degree_preserving_swaps(100, targets, regulators, signs, 10, 4)
+    assert all(numpy.array_equal(a, b) for a, b in zip(degrees(100, targets, regulators, signs),
+                                                       degrees(100, new_targets, new_regulators, new_signs)))
+    assert not (new_targets == new_regulators).any()
+    assert len(numpy.unique(new_targets * 100 + new_regulators)) == len(new_targets)
+    assert (new_targets != targets).mean() > 0.5  # the graph is actually randomised
+
+
+def test_sbml_regulations_round_trip(tmp_path):
+    file_name = str(tmp_path / 'model.sbml')
+    indptr, regulators, signs = write_model(file_name, 80, 6)
+    species, targets, read_regulators, read_signs = gen.read_sbml_regulations(file_name)
+    assert species == [f'X{i}' for i in range(80)]
+    read = gen.edges_to_csr(80, targets, read_regulators, read_signs)
+    for array, expected in zip(read, (indptr, regulators, signs)):
+        assert numpy.array_equal(array, expected)
+
+
+def test_ensemble_keeps_degrees_of_the_model(tmp_path):
+    model = str(tmp_path / 'model.sbml')
+    write_model(model, 80, 7)
+    expected = degrees(80, *gen.read_sbml_regulations(model)[1:])
+    loc = str(tmp_path / 'out') + '/'
+    makedirs(loc)
+    report = gen.generate_degree_preserving_ensemble(model, 3, 1, loc=loc)
+    assert report['accepted'] == 3
+    for name in listdir(loc):
+        result = degrees(80, *gen.read_sbml_regulations(loc + name)[1:])
+        assert all(numpy.array_equal(a, b) for a, b in zip(result, expected))
+
+
+@pytest.mark.parametrize('replacement', ['qual:sign="dual"', ''])
+def test_dual_and_untyped_regulations_are_rejected(tmp_path, replacement):
+    file_name = str(tmp_path / 'model.sbml')
+    write_model(file_name, 30, 8)
+    with open(file_name) as f:
+        text = f.read()
+    with open(file_name, 'w') as f:
+        f.write(text.replace('qual:sign="negative"', replacement, 1))
+    with pytest.raises(ValueError, match='dual' if replacement else 'no type'):
+        gen.read_sbml_regulations(file_name)
+    with pytest.raises(ValueError):
+        gen.generate_degree_preserving_ensemble(file_name, 1, 1, loc=str(tmp_path) + '/')
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+from os import listdir, path
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+SCRIPT = path.join(path.dirname(path.dirname(path.abspath(__file__))), 'parametrised_bn_gen',
+                   'generator_of_parametrised_bn.py')
+
+
+def test_estimate_lists_the_costs_not_counted(loc):
+    estimate = gen.generate_bn(50, 1, probability=0.1, random=True, loc=loc, n=3, dry_run=True)['estimate']
+    assert estimate['not_counted'] == []
+    estimate = gen.generate_bn(50, 1, probability=0.1, random=True, loc=loc, n=3, dry_run=True, dedup='drop',
+                               screen={'criteria': {}})['estimate']
+    assert estimate['not_counted'] == ['dynamics screen', 'deduplication']
+    assert 'Not counted: dynamics screen, deduplication' in gen.format_estimate(estimate)
+    assert listdir(loc) == []
+
+
+def test_cli_dry_run_writes_nothing(tmp_path):
+    for args in [['rand', '20', '0.2', '5'], ['ba', '20', '2', '5'], ['ws', '20', '4', '0.3', '5']]:
+        result = subprocess.run([sys.executable, SCRIPT] + args + ['--dry-run'], cwd=tmp_path, capture_output=True,
+                                text=True)
+        assert result.returncode == 0
+        assert 'peak memory' in result.stdout
+    assert listdir(tmp_path) == []
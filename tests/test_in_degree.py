@@ -0,0 +1,44 @@
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+MODELS = [dict(ba=True, num_of_connections=4), dict(ws=True, num_of_connections=6, probability=0.3),
+          dict(random=True, probability=0.1), dict(directed_ba=True, num_of_connections=4)]
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_in_degree_cap_holds_for_every_vertex(model):
+    for seed in range(5):
+        indptr, regulators, _, _ = gen.generate_network_arrays(200, seed, in_degree_cap=3, **model)
+        assert numpy.diff(indptr).max() <= 3
+        for vertex in range(200):  # capping must not create repeated regulations
+            own = regulators[indptr[vertex]:indptr[vertex + 1]]
+            assert len(numpy.unique(own)) == len(own)
+
+
+def test_cap_in_degrees_with_capacity_per_vertex():
+    numpy.random.seed(1)
+    targets, regulators = numpy.random.randint(50, size=(2, 600))
+    capacity = numpy.arange(50) % 4
+    for reorient in (False, True):
+        kept_targets, _, _ = gen.cap_in_degrees(50, targets, regulators, numpy.ones(600, dtype=bool), capacity, 7,
+                                                reorient=reorient)
+        assert (numpy.bincount(kept_targets, minlength=50) <= capacity).all()
+
+
+@pytest.mark.parametrize('degree,num_of_vertices', [(3, 100), (7, 10)])  # sparse and dense vertices
+def test_random_model_keeps_in_degrees_of_the_distribution(degree, num_of_vertices):
+    in_degree_dist = [0] * degree + [1]
+    indptr, regulators, _, _ = gen.generate_network_arrays(num_of_vertices, 3, random=True,
+                                                           in_degree_dist=in_degree_dist)
+    assert (numpy.diff(indptr) == degree).all()
+    for vertex in range(num_of_vertices):
+        assert len(numpy.unique(regulators[indptr[vertex]:indptr[vertex + 1]])) == degree
+
+
+def test_random_model_follows_the_distribution():
+    in_degree_dist = [0.1, 0.2, 0.3, 0.4]
+    indptr, _, _, _ = gen.generate_network_arrays(20000, 5, random=True, in_degree_dist=in_degree_dist)
+    histogram = numpy.bincount(numpy.diff(indptr), minlength=4) / 20000
+    assert numpy.abs(histogram - in_degree_dist).max() < 0.02
@@ -0,0 +1,76 @@
+import networkx as nx
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def directed_pa_reference(num_of_vertices, mean_degree, seed, frac_reg, delta_in=1.0, delta_out=0.2,
+                          new_regulator_frac=0.1):
+    """Step by step directed preferential attachment, as 'generate_directed_pa_edges' draws it"""
+    numpy.random.seed(seed)
+    new_vertex = 1 / mean_degree
+    alpha = new_vertex * new_regulator_frac
+    uniforms = iter(())
+    targets, regulators = [], []
+
+    def uniform():
+        nonlocal uniforms
+        value = next(uniforms, None)
+        if value is None:
+            uniforms = iter(numpy.random.random_sample(1 << 16).tolist())
+            value = next(uniforms)
+        return value
+
+    def pick(endpoints, delta, count):
+        weight = len(endpoints) + delta * count
+        value = uniform() * weight if weight > 0 else uniform() * count
+        if weight > 0 and value < len(endpoints):
+            return endpoints[int(value)]
+        return min(count - 1, int((value - len(endpoints)) / delta) if weight > 0 else int(value))
+
+    count = 1
+    while count < num_of_vertices:
+        event = uniform()
+        if event < alpha:
+            targets.append(pick(targets, delta_in, count))
+            regulators.append(count)
+            count += 1
+        elif event < new_vertex:
+            regulators.append(pick(regulators, delta_out, count))
+            targets.append(count)
+            count += 1
+        else:
+            regulators.append(pick(regulators, delta_out, count))
+            targets.append(pick(targets, delta_in, count))
+    return gen.drop_duplicate_edges(targets, regulators, gen.draw_signs(frac_reg, len(targets)))
+
+
+@pytest.mark.parametrize('num_of_vertices, mean_degree, options', [
+    (1, 2, {}), (2, 1, {}), (500, 1, {}), (500, 3, {}), (40000, 2, {}), (3000, 1.5, {'delta_out': 0.0}),
+    (3000, 2.5, {'delta_in': 0.0, 'new_regulator_frac': 0.5})])
+def test_directed_pa_matches_step_by_step_draws(num_of_vertices, mean_degree, options):
+    expected = directed_pa_reference(num_of_vertices, mean_degree, 11, 0.7, **options)
+    expected_state = numpy.random.random_sample(3)
+    result = gen.generate_directed_pa_edges(num_of_vertices, mean_degree, 11, 0.7, **options)
+    for array, expected_array in zip(result, expected):
+        assert numpy.array_equal(array, expected_array)
+    assert numpy.array_equal(numpy.random.random_sample(3), expected_state)  # signs are drawn from the same state
+
+
+@pytest.mark.parametrize('model, graph', [
+    (dict(ba=True, num_of_connections=3), lambda seed: nx.barabasi_albert_graph(300, 3, seed=seed)),
+    (dict(ws=True, num_of_connections=4, probability=0.2),
+     lambda seed: nx.watts_strogatz_graph(300, 4, 0.2, seed=seed))])
+def test_undirected_models_orient_the_networkx_graph(model, graph):
+    for seed in range(3):
+        indptr, regulators, signs, seed_trans = gen.generate_network_arrays(300, seed, **model)
+        targets = numpy.repeat(numpy.arange(300), numpy.diff(indptr))
+        assert {frozenset(edge) for edge in zip(targets.tolist(), regulators.tolist())} == \
+            {frozenset(edge) for edge in graph(seed).edges()}
+        assert len(targets) == graph(seed).number_of_edges()  # each edge has a single direction
+        # same seed gives the same network, also with the memory budget
+        for memory_budget in (None, 10 ** 5):
+            again = gen.generate_network_arrays(300, seed, memory_budget=memory_budget, **model)
+            for array, expected in zip(again, (indptr, regulators, signs, seed_trans)):
+                assert numpy.array_equal(array, expected)
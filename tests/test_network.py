@@ -0,0 +1,18 @@
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def test_scipy_matrix_shares_the_network_arrays():
+    scipy_sparse = pytest.importorskip('scipy.sparse')
+    network = gen.generate_network(300, 4, probability=0.02, random=True)
+    matrix = network.to_scipy()
+    assert isinstance(matrix, scipy_sparse.csr_matrix)
+    assert numpy.shares_memory(matrix.indptr, network.indptr)
+    assert numpy.shares_memory(matrix.indices, network.regulators)
+    matrix.check_format()
+    dense = numpy.zeros((300, 300), dtype=numpy.int8)
+    targets = numpy.repeat(numpy.arange(300), numpy.diff(network.indptr))
+    dense[targets, network.regulators] = numpy.where(network.signs, 1, -1)
+    assert numpy.array_equal(matrix.toarray(), dense)
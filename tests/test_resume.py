@@ -0,0 +1,82 @@
+import json
+from os import listdir
+
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_after(count):
+    def progress(done, *args):
+        if done >= count:
+            raise Crash()
+    return progress
+
+
+def networks(loc):
+    result = {}
+    for name in listdir(loc):
+        if name.startswith('bn_'):
+            with open(loc + name) as f:
+                result[name] = f.read()
+    return result
+
+
+def run(loc, **options):
+    return gen.generate_bn(20, 5, probability=0.1, random=True, loc=loc, n=6, resume=True, max_in_degree=4,
+                           in_degree_cap=6, **options)
+
+
+def test_resume_after_crash(tmp_path):
+    whole, crashed = f'{tmp_path}/whole/', f'{tmp_path}/crashed/'
+    for loc in [whole, crashed]:
+        (tmp_path / loc.split('/')[-2]).mkdir()
+    expected = run(whole)
+    with pytest.raises(Crash):
+        run(crashed, progress=crash_after(3))
+    assert 0 < len(networks(crashed)) < len(networks(whole))
+    report = run(crashed)
+    assert report['resumed'] == 3
+    assert (report['accepted'], report['rejected']) == (expected['accepted'], expected['rejected'])
+    assert networks(crashed) == networks(whole)
+
+
+def test_resume_restores_statistics(tmp_path, monkeypatch):
+    whole, crashed = f'{tmp_path}/whole/', f'{tmp_path}/crashed/'
+    for loc in [whole, crashed]:
+        (tmp_path / loc.split('/')[-2]).mkdir()
+    expected = run(whole, stats=True)
+    with pytest.raises(Crash):
+        run(crashed, stats=True, progress=crash_after(3))
+    [checkpoint] = [name for name in listdir(crashed) if name.startswith('checkpoint_')]
+    with open(crashed + checkpoint) as f:
+        resumed = {json.loads(line)['seed'] for line in f.readlines()[1:]}
+    drawn = []
+    draw = gen.generate_network_arrays
+    monkeypatch.setattr(gen, 'generate_network_arrays', lambda *args: drawn.append(args[1]) or draw(*args))
+    report = run(crashed, stats=True)
+    assert report['resumed'] == len(resumed) == 3
+    assert drawn and not resumed & set(drawn)  # resumed networks aren't drawn again to be counted
+    assert report['stats'] == expected['stats']
+
+
+def test_resume_with_other_budget_is_refused(loc):
+    with pytest.raises(Crash):
+        run(loc, progress=crash_after(2))
+    with pytest.raises(ValueError, match='different configuration'):
+        gen.generate_bn(20, 5, probability=0.1, random=True, loc=loc, n=6, resume=True, max_in_degree=5,
+                        in_degree_cap=6)
+
+
+def test_resume_of_degree_preserving_randomisation_is_refused(loc):
+    args = {'seed': 1, 'vertices': 3, 'number of networks': 2, 'fraction of act regs': 0.5,
+            'uninterpreted function arity': {'lower bound': 1, 'upper bound': 2},
+            'generator': {'Barabasi-Albert': {'use': False}, 'Watts-Strogatz': {'use': False},
+                          'Random Network': {'use': False},
+                          'Degree-preserving randomisation': {'use': True, 'model': 'model.sbml'}}}
+    with pytest.raises(ValueError, match='Resuming'):
+        gen.run_configuration(args, loc, resume=True)
@@ -0,0 +1,45 @@
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def test_constant_functions_are_trivial():
+    indptr = numpy.zeros(9, dtype=numpy.int64)  # no regulations, every vertex is a random constant
+    for seed_trans in range(3):
+        summary = gen.dynamics_summary(indptr, numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=bool),
+                                       seed_trans, 2, 4, instantiations=4)
+        assert summary['trivial'] == 1.0
+        assert summary['fixed_points'] == summary['async_attractors'] == 1.0
+        assert summary['sync_cycles'] == summary['async_complex'] == summary['unresolved'] == 0.0
+        assert summary['max_cycle_length'] == summary['max_complex_size'] == 1
+
+
+def test_toggle_switch_has_two_fixed_points():
+    indptr = numpy.array([0, 1, 2])  # X1 inhibits X0 and X0 inhibits X1
+    regulators = numpy.array([1, 0])
+    signs = numpy.array([False, False])
+    for seed_trans in range(10):  # with and without explicit update functions
+        summary = gen.dynamics_summary(indptr, regulators, signs, seed_trans, 2, 4, instantiations=4)
+        assert summary['fixed_points'] == summary['async_attractors'] == 2.0
+        assert summary['async_complex'] == summary['trivial'] == 0.0
+        # synchronous update also swings between 00 and 11
+        assert summary['sync_cycles'] == 1.0
+        assert summary['max_cycle_length'] == 2
+
+
+def test_screen_in_workers_gives_the_same_summaries(loc):
+    options = dict(probability=0.05, random=True, n=3, screen={'action': 'tag', 'instantiations': 5})
+    serial = gen.generate_bn(60, 2, loc=loc + 'serial_', **options)
+    parallel = gen.generate_bn(60, 2, loc=loc + 'parallel_', workers=2, **options)
+    assert list(parallel['dynamics'].values()) == list(serial['dynamics'].values())
+
+
+def test_duplicates_are_not_screened(loc, monkeypatch):
+    screened = []
+    screen_network = gen.screen_network
+    monkeypatch.setattr(gen, 'screen_network', lambda *args: screened.append(args) or screen_network(*args))
+    report = gen.generate_bn(2, 1, probability=0.5, random=True, loc=loc, n=30, dedup='drop',
+                             screen={'action': 'tag', 'instantiations': 2})
+    assert report['duplicates'] > 0
+    assert len(screened) == report['accepted']
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+from parametrised_bn_gen.generator_of_parametrised_bn import GenerationService
+
+CONFIG = {'number of networks': 2, 'vertices': 8, 'seed': 5, 'fraction of act regs': 0.8,
+          'uninterpreted function arity': {'lower bound': 1, 'upper bound': 3},
+          'generator': {'Barabasi-Albert': {'use': False}, 'Watts-Strogatz': {'use': False},
+                        'Random Network': {'use': True, 'connection probability': 0.3}}}
+
+
+def run_request(service, request):
+    responses = []
+
+    async def send(response):
+        responses.append(response)
+
+    asyncio.run(service.run(request, send))
+    return responses
+
+
+def test_not_inline_without_out_dir_is_error():
+    service = GenerationService()
+    responses = run_request(service, {'id': 7, 'inline': False, 'config': {}})
+    assert len(responses) == 1
+    assert responses[0]['id'] == 7
+    assert responses[0]['status'] == 'error'
+    assert 'output directory' in responses[0]['error']
+    assert service.stats()['failed'] == 1
+    assert service.stats()['running'] == 0
+
+
+def test_stats_request():
+    responses = run_request(GenerationService(), {'id': 'a', 'type': 'stats'})
+    assert responses[0]['status'] == 'stats'
+    assert responses[0]['queued'] == 0
+
+
+def crashing_job(request, loc, inline):
+    """'run_service_job' killing its worker process for requests with 'crash'"""
+    if request.get('crash'):
+        os._exit(1)
+    return run_service_job(request, loc, inline)
+
+
+run_service_job = gen.run_service_job
+
+
+@pytest.fixture
+def unix_service(tmp_path, monkeypatch):
+    """Runs 'GenerationService' on a Unix socket in a background thread, yields the path of the socket"""
+    monkeypatch.setattr(gen, 'run_service_job', crashing_job)  # the forked workers inherit it
+    unix_socket = str(tmp_path / 'service.sock')
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    task = loop.create_task(GenerationService(workers=2).serve(unix_socket=unix_socket, ready=ready.set))
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.gather(task, return_exceptions=True)))
+    thread.start()
+    assert ready.wait(60)
+    yield unix_socket
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join()
+    loop.close()
+
+
+def test_unix_socket_round_trip(unix_service):
+    responses = list(gen.service_requests([{'id': 1, 'config': CONFIG}, {'id': 2, 'type': 'stats'}],
+                                          unix_socket=unix_service))
+    by_id = {}
+    for response in responses:
+        by_id.setdefault(response['id'], []).append(response)
+    assert by_id[2][0]['status'] == 'stats'
+    *networks, done = by_id[1]
+    assert done['status'] == 'done'
+    assert done['report']['accepted'] == 2
+    assert sorted(network['file'] for network in networks) == sorted(done['files'])
+    assert all(network['sbml'].startswith('<?xml') for network in networks)
+
+
+def test_dead_worker_fails_only_its_request(unix_service):
+    requests = [{'id': 'crash', 'config': CONFIG, 'crash': True}] + \
+        [{'id': i, 'config': dict(CONFIG, seed=i)} for i in range(4)]
+    status = {response['id']: response for response in gen.service_requests(requests, unix_socket=unix_service)
+              if 'status' in response}
+    assert status['crash']['status'] == 'error'
+    assert 'BrokenProcessPool' in status['crash']['error']
+    assert all(status[i]['status'] == 'done' for i in range(4))
+    # the replaced pool serves further requests
+    responses = list(gen.service_requests([{'id': 'after', 'config': CONFIG}], unix_socket=unix_service))
+    assert responses[-1]['status'] == 'done'
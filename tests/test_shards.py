@@ -0,0 +1,73 @@
+import glob
+from os import listdir, makedirs, path
+
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+MODEL = dict(num_of_vertices=40, seed=9, probability=0.1, random=True, n=7)
+CONFIG = {'number of networks': 3, 'vertices': 10, 'seed': 'rand', 'fraction of act regs': 0.8,
+          'uninterpreted function arity': {'lower bound': 1, 'upper bound': 3},
+          'generator': {'Barabasi-Albert': {'use': False}, 'Watts-Strogatz': {'use': False},
+                        'Random Network': {'use': True, 'connection probability': 0.3}}}
+
+
+def networks(loc):
+    result = {}
+    for name in listdir(loc):
+        if name.startswith('bn_'):
+            with open(path.join(loc, name)) as f:
+                result[name] = f.read()
+    return result
+
+
+def assert_close(summary, expected):
+    """Merged moments are equal up to the rounding of the floating-point sums"""
+    assert summary.keys() == expected.keys()
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            assert_close(value, expected[key])
+        else:
+            assert value == pytest.approx(expected[key], rel=1e-12, abs=1e-12)
+
+
+def run_shards(tmp_path, count):
+    loc = path.join(str(tmp_path), f'shards{count}', '')
+    makedirs(loc)
+    for index in range(count):
+        gen.generate_bn(loc=loc, shard=(index, count), stats=True, **MODEL)
+    return loc, gen.merge_manifests(glob.glob(f'{loc}manifest_*_shard*.json'))
+
+
+def test_shards_merge_to_the_whole_batch(tmp_path):
+    whole_loc = path.join(str(tmp_path), 'whole', '')
+    makedirs(whole_loc)
+    report = gen.generate_bn(loc=whole_loc, stats=True, **MODEL)
+    two_loc, two = run_shards(tmp_path, 2)
+    three_loc, three = run_shards(tmp_path, 3)
+    assert networks(two_loc) == networks(three_loc) == networks(whole_loc)
+    assert len(networks(whole_loc)) == 7
+    assert two['missing'] == three['missing'] == []
+    assert two['networks'] == three['networks']
+    assert_close(two['summary'], report['stats'])
+    assert_close(three['summary'], report['stats'])
+
+
+def test_missing_shard_is_reported(tmp_path):
+    loc = path.join(str(tmp_path), '')
+    gen.generate_bn(loc=loc, shard='1/3', **MODEL)
+    merged = gen.merge_manifests(glob.glob(f'{loc}manifest_*.json'))
+    assert merged['missing'] == [0, 2, 3, 5, 6]
+
+
+@pytest.mark.parametrize('options', [{'shard': '0/2'}, {'resume': True}])
+def test_random_seed_is_rejected_with_shards_and_resume(loc, options):
+    with pytest.raises(ValueError):
+        gen.run_configuration(CONFIG, loc, **options)
+
+
+def test_random_seed_is_recorded_in_the_names(loc):
+    gen.run_configuration(CONFIG, loc)
+    names = list(networks(loc))
+    assert len(names) == 3
+    assert all('_sNone_' not in name and name.split('_s')[1].split('_')[0].isdigit() for name in names)
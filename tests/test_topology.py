@@ -0,0 +1,72 @@
+import xml.etree.ElementTree as ET
+
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+QUAL = '{http://www.sbml.org/sbml/level3/version1/qual/version1}'
+GRAPHML = """<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <key id="d0" for="edge" attr.name="sign" attr.type="string">{default}</key>
+  <graph edgedefault="directed">
+    <node id="p53"/><node id="mdm2"/><node id="A&amp;B"/>
+    <edge source="p53" target="mdm2"><data key="d0">+</data></edge>
+    <edge source="mdm2" target="p53"><data key="d0">-</data></edge>
+    <edge source="A&amp;B" target="p53"/>
+  </graph>
+</graphml>
+"""
+
+
+def write(tmp_path, name, text):
+    file_name = str(tmp_path / name)
+    with open(file_name, 'w') as f:
+        f.write(text)
+    return file_name
+
+
+def test_graphml_keeps_given_signs_when_some_are_missing(tmp_path):
+    topology = gen.read_graphml(write(tmp_path, 'net.graphml', GRAPHML.format(default='')))
+    assert topology['names'] == ['p53', 'mdm2', 'A&B']
+    order = numpy.lexsort((topology['regulators'], topology['targets']))
+    edges = [(int(topology['regulators'][i]), int(topology['targets'][i])) for i in order]
+    assert edges == [(1, 0), (2, 0), (0, 1)]
+    assert topology['known_signs'][order].tolist() == [True, False, True]
+    assert topology['signs'][order][[0, 2]].tolist() == [False, True]
+    signs = set()
+    for seed in range(20):  # the missing type is drawn, the given ones are kept
+        _, regulators, drawn, _ = gen.generate_network_arrays(3, seed, frac_reg=0.5, topology=topology)
+        assert regulators.tolist() == [1, 2, 0]
+        assert drawn.tolist()[0::2] == [False, True]
+        signs.add(bool(drawn[1]))
+    assert signs == {True, False}
+
+
+def test_graphml_default_sign_applies_per_edge(tmp_path):
+    topology = gen.read_graphml(write(tmp_path, 'net.graphml', GRAPHML.format(default='<default>-</default>')))
+    assert topology['known_signs'] is None
+    assert sorted(zip(topology['regulators'].tolist(), topology['signs'].tolist())) == [(0, True), (1, False),
+                                                                                        (2, False)]
+
+
+@pytest.mark.parametrize('text', ['a b +\nb c\n', 'a b\nb c - x\n', 'a\n', 'a b\n\n# c\nc\n'])
+def test_edge_list_checks_every_line(tmp_path, text):
+    with pytest.raises(ValueError):
+        gen.read_edge_list(write(tmp_path, 'net.txt', text))
+
+
+def test_edge_list_skips_comments_and_empty_lines(tmp_path):
+    topology = gen.read_edge_list(write(tmp_path, 'net.txt', '# regulator target\na b +\n\n  b c -\n'))
+    assert topology['names'] == ['a', 'b', 'c']
+    assert topology['targets'].tolist() == [1, 2]
+    assert topology['signs'].tolist() == [True, False]
+
+
+def test_imported_names_are_written_to_sbml(loc, tmp_path):
+    topology = gen.read_graphml(write(tmp_path, 'net.graphml', GRAPHML.format(default='')))
+    gen.generate_bn(4, 3, loc=loc, topology=topology)
+    sbml_file = next(tmp_path.glob('bn_*.sbml'))
+    species = ET.parse(sbml_file).getroot().iter(f'{QUAL}qualitativeSpecies')
+    assert [(s.get(f'{QUAL}id'), s.get(f'{QUAL}name')) for s in species] == [('X0', 'p53'), ('X1', 'mdm2'),
+                                                                            ('X2', 'A&B'), ('X3', 'X3')]
@@ -0,0 +1,79 @@
+import itertools
+import xml.etree.ElementTree as ET
+
+import numpy
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+MATHML = '{http://www.w3.org/1998/Math/MathML}'
+QUAL = '{http://www.sbml.org/sbml/level3/version1/qual/version1}'
+
+
+def evaluate(node, values):
+    tag = node.tag.replace(MATHML, '')
+    if tag in ['true', 'false']:
+        return tag == 'true'
+    children = list(node)
+    operator = children[0].tag.replace(MATHML, '')
+    if operator == 'eq':
+        return values[children[1].text.strip()] == int(children[2].text)
+    if operator == 'not':
+        return not evaluate(children[1], values)
+    if operator == 'and':
+        return all(evaluate(child, values) for child in children[1:])
+    if operator == 'or':
+        return any(evaluate(child, values) for child in children[1:])
+    raise ValueError(operator)
+
+
+def literals(arity):
+    return [(f'<apply><eq/><ci>X{i}</ci><cn type="integer">1</cn></apply>',
+             f'<apply><not/><apply><eq/><ci>X{i}</ci><cn type="integer">1</cn></apply></apply>') for i in range(arity)]
+
+
+@pytest.mark.parametrize('kind', ['random', 'canalising', 'monotone'])
+def test_expressions_evaluate_to_the_tables(kind):
+    rng = numpy.random.default_rng(3)
+    for arity in range(1, 8):
+        tables = gen.sample_truth_tables(arity, rng.random((10, arity)) < 0.6, kind, rng)
+        for packed in tables:
+            table = int.from_bytes(packed.tobytes(), 'little')
+            expression = gen.table_to_mathml(table, arity, literals(arity), lambda support: None)
+            root = ET.fromstring(f'<math xmlns="http://www.w3.org/1998/Math/MathML">{expression}</math>')[0]
+            for assignment in range(2 ** arity):
+                values = {f'X{i}': (assignment >> i) & 1 for i in range(arity)}
+                assert evaluate(root, values) == bool((table >> assignment) & 1)
+
+
+@pytest.mark.parametrize('kind', ['random', 'canalising', 'monotone'])
+def test_sbml_functions_depend_on_every_regulator_by_its_sign(loc, kind):
+    gen.generate_bn(30, 4, probability=0.15, random=True, loc=loc, n=1, functions=kind, uninterpreted_frac=0,
+                    in_degree_cap=6)
+    root = ET.parse(f'{loc}bn_rand_0.15_{kind}0_s4_l2_u4_f0.8_n30_0.sbml').getroot()
+    checked = 0
+    for transition in root.iter(f'{QUAL}transition'):
+        inputs = [(node.get(f'{QUAL}qualitativeSpecies'), node.get(f'{QUAL}sign'))
+                  for node in transition.iter(f'{QUAL}input')]
+        expression = next(transition.iter(f'{MATHML}math'))[0]
+        for regulator, sign in inputs:
+            others = [name for name, _ in inputs if name != regulator]
+            effects = set()
+            for bits in itertools.product([0, 1], repeat=len(others)):
+                values = dict(zip(others, bits))
+                effects.add(evaluate(expression, dict(values, **{regulator: 1})) -
+                            evaluate(expression, dict(values, **{regulator: 0})))
+            assert effects - {0}, (regulator, sign)
+            assert effects - {0} == {'positive': {1}, 'negative': {-1}, 'dual': {1, -1}}[sign]
+            checked += 1
+    assert checked > 30
+
+
+def test_random_tables_are_capped(loc):
+    with pytest.raises(ValueError, match='at most 10'):
+        gen.generate_bn(12, 1, probability=1, random=True, loc=loc, n=1, functions='random')
+
+
+def test_truth_tables_reject_workers(loc):
+    with pytest.raises(ValueError, match='parallel workers'):
+        gen.generate_bn(5, 1, probability=0.5, random=True, loc=loc, n=1, functions='monotone', workers=2)
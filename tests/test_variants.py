@@ -0,0 +1,37 @@
+from os import listdir, makedirs, path
+
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+VARIANTS = [{'l_bound': 1, 'u_bound': 3}, {'frac_reg': 0.5}, {'l_bound': 2, 'u_bound': 2, 'frac_reg': 0.3}]
+
+
+def read_all(loc):
+    result = {}
+    for name in sorted(listdir(loc)):
+        with open(path.join(loc, name)) as f:
+            result[name] = f.read()
+    return result
+
+
+@pytest.mark.parametrize('workers, write_buffers', [(None, 8), (None, 0), (2, 8)])
+def test_variants_match_separate_runs(tmp_path, workers, write_buffers):
+    variants_loc = path.join(str(tmp_path), 'variants', '')
+    separate_loc = path.join(str(tmp_path), 'separate', '')
+    makedirs(variants_loc)
+    makedirs(separate_loc)
+    gen.generate_bn(60, 7, probability=0.1, random=True, loc=variants_loc, n=3, workers=workers,
+                    write_buffers=write_buffers, variants=VARIANTS)
+    for variant in VARIANTS:
+        gen.generate_bn(60, 7, probability=0.1, random=True, loc=separate_loc, n=3,
+                        **dict({'l_bound': 2, 'u_bound': 4, 'frac_reg': 0.8}, **variant))
+    assert len(listdir(variants_loc)) == 9
+    assert read_all(variants_loc) == read_all(separate_loc)
+
+
+@pytest.mark.parametrize('options', [{'out_format': 'npz'}, {'max_in_degree': 3}, {'max_log2_params': 10},
+                                     {'max_functions': 100}, {'memory_budget': 2 ** 20}])
+def test_variants_reject_unsupported_options(loc, options):
+    with pytest.raises(ValueError):
+        gen.generate_bn(20, 1, probability=0.1, random=True, loc=loc, variants=VARIANTS, **options)
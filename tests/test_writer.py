@@ -0,0 +1,55 @@
+import errno
+import threading
+from os import listdir
+
+import pytest
+
+from parametrised_bn_gen import generator_of_parametrised_bn as gen
+
+
+def failing_open(fail_at):
+    """'open' whose files fail with full disk at the 'fail_at'-th write of all the files"""
+    writes = []
+    real_open = open
+
+    class FailingFile:
+        def __init__(self, file_name, mode):
+            self.f = real_open(file_name, mode)
+
+        def write(self, text):
+            writes.append(threading.current_thread())
+            if len(writes) == fail_at:
+                raise OSError(errno.ENOSPC, 'No space left on device')
+            return self.f.write(text)
+
+        def close(self):
+            self.f.close()
+
+    return FailingFile, writes
+
+
+def test_error_of_the_writer_thread_is_raised_by_the_next_call(tmp_path, monkeypatch):
+    fake_open, writes = failing_open(2)
+    monkeypatch.setattr(gen, 'open', fake_open, raising=False)
+    writer = gen.BackgroundWriter(max_buffers=2, buffer_size=10)
+    name = str(tmp_path / 'net.sbml')
+    f = writer.open(name)
+    with pytest.raises(OSError) as error:
+        for _ in range(100):  # the failure is raised in this thread once the writer thread gets to it
+            f.write('x' * 10)
+        writer.wait()
+    assert error.value.errno == errno.ENOSPC
+    assert all(thread is writer.thread for thread in writes)
+    writer.wait(raise_errors=False)  # rest of the queue is drained, not written
+    assert len(writes) == 2
+    assert listdir(tmp_path) == []  # partially written file is removed
+    writer.close()
+    assert not writer.thread.is_alive()
+
+
+def test_generation_stops_when_the_writer_thread_fails(loc, monkeypatch):
+    fake_open, _ = failing_open(3)  # small networks are written by a single write each
+    monkeypatch.setattr(gen, 'open', fake_open, raising=False)
+    with pytest.raises(OSError):
+        gen.generate_bn(30, 1, probability=0.1, random=True, loc=loc, n=5)
+    assert sorted(listdir(loc)) == [f'bn_rand_0.1_s1_l2_u4_f0.8_n30_{i}.sbml' for i in range(2)]
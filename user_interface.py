@@ -6,6 +6,8 @@ from tkinter import filedialog as fd
 
 import json
 import numpy
+import queue
+import threading
 import time
 import tkinter as tk
 
@@ -16,11 +18,18 @@ num_of_nodes_ = 0
 l_bound = 0
 u_bound = 0
 act_frac_reg = 0
+in_degree_cap = None
 MAXSIZE = 2**31-1
 
+# state of the background generation
+progress_queue = queue.Queue()
+cancel_event = threading.Event()
+worker = None
+start_time = 0
+
 
 def export():
-    if selected.get() in [1, 2, 3]:
+    if selected.get() in [1, 2, 3, 5]:
         if run_checks_and_get_vals(True):
             name = fd.askdirectory()
             if name != "":
@@ -34,6 +43,9 @@ def export_json(loc_to_save_string: str):
     ba_ = False
     ws_ = False
     rand_ = False
+    sbm_ = False
+    sbm_modules = "rand"
+    sbm_probs = "rand"
     if selected.get() == 1:
         ba_ = True
         if check_ba_arg():
@@ -52,6 +64,17 @@ def export_json(loc_to_save_string: str):
             rand_prob = "rand"
         else:
             return None
+    elif selected.get() == 5:
+        sbm_ = True
+        if check_sbm_args():
+            sbm_modules = int(sbm_entry_1.get())
+            sbm_probs = [float(sbm_entry_2.get()), float(sbm_entry_3.get())]
+            ba_conns = "rand"
+            ws_conns = "rand"
+            ws_prob = "rand"
+            rand_prob = "rand"
+        else:
+            return None
     else:  # else is sufficient here, because the only option left is selected.get() == 3
         rand_ = True
         if check_prob_for_rand_model():
@@ -71,6 +94,9 @@ def export_json(loc_to_save_string: str):
             "lower bound": l_bound,
             "upper bound": u_bound
         },
+        "in-degree": {
+            "cap": in_degree_cap
+        },
         "generator": {
             "Barabasi-Albert": {
                 "use": ba_,
@@ -84,6 +110,11 @@ def export_json(loc_to_save_string: str):
             "Random Network": {
                 "use": rand_,
                 "connection probability": rand_prob
+            },
+            "Stochastic block model": {
+                "use": sbm_,
+                "modules": sbm_modules,
+                "probabilities": sbm_probs
             }
         }
     }
@@ -165,6 +196,21 @@ def check_vertices():
     return True
 
 
+def check_in_degree_cap():
+    if max_in_degree.get() != "":
+        try:
+            if int(max_in_degree.get()) < 0:
+                messagebox.showerror('In-degree Error', "Maximal in-degree is lower than 0.")
+                return False
+            elif int(max_in_degree.get()) > MAXSIZE:
+                messagebox.showerror('In-degree Error', "Maximal in-degree exceeds 2^32-1")
+                return False
+        except ValueError:
+            messagebox.showerror('In-degree Error', "Maximal in-degree is invalid.")
+            return False
+    return True
+
+
 def check_networks():
     if num_of_networks.get() != "":
         try:
@@ -237,6 +283,33 @@ def check_ws_arg_2():
     return True
 
 
+def check_sbm_args():
+    try:
+        if int(sbm_entry_1.get()) < 1:
+            messagebox.showerror('Stochastic Block Model Error', "Number of modules is less than 1.")
+            return False
+        if num_of_vertices_entry.get() != "":
+            if int(sbm_entry_1.get()) > int(num_of_vertices_entry.get()):
+                messagebox.showerror('Stochastic Block Model Error', "Number of vertices is lower than number of "
+                                                                     "modules.")
+                return False
+        if int(sbm_entry_1.get()) > MAXSIZE:
+            messagebox.showerror('Stochastic Block Model Error', "Number of modules exceeds 2^31-1")
+            return False
+    except ValueError:
+        messagebox.showerror('Stochastic Block Model Error', "Number of modules is invalid.")
+        return False
+    for entry in [sbm_entry_2, sbm_entry_3]:
+        try:
+            if float(entry.get()) < 0 or float(entry.get()) > 1:
+                messagebox.showerror('Stochastic Block Model Error', "Probability is out of range [0,1].")
+                return False
+        except ValueError:
+            messagebox.showerror('Stochastic Block Model Error', "Probability is invalid.")
+            return False
+    return True
+
+
 def check_frac_reg():
     if frac_reg.get() != "":
         try:
@@ -292,9 +365,9 @@ def check_frac_and_or():
 
 def run_checks_and_get_vals(export: bool):
     # w3schools.com/python/python_variables_global.asp
-    global seed_val, num_of_nodes_, l_bound, u_bound, act_frac_reg
-    if check_select() and check_seed() and check_boundaries() and \
-            check_vertices() and check_networks() and (export or check_location()) and check_frac_reg():
+    global seed_val, num_of_nodes_, l_bound, u_bound, act_frac_reg, in_degree_cap
+    if check_select() and check_seed() and check_boundaries() and check_vertices() and check_networks() and \
+            (export or check_location()) and check_frac_reg() and check_in_degree_cap():
         if seed.get() != "":
             seed_val = int(seed.get())
         elif export and seed_val == 0:
@@ -322,6 +395,14 @@ def run_checks_and_get_vals(export: bool):
                                                                  high=int(ws_entry_1.get()) * 10))
                 else:
                     return False
+            elif selected.get() == 5:
+                if check_sbm_args():
+                    if num_of_nodes_ == 0:
+                        numpy.random.seed(seed_val)
+                        num_of_nodes_ = int(numpy.random.randint(low=int(sbm_entry_1.get()) + 1,
+                                                                 high=int(sbm_entry_1.get()) * 10 + 2))
+                else:
+                    return False
             else:
                 if num_of_nodes_ == 0:
                     numpy.random.seed(seed_val)
@@ -348,6 +429,7 @@ def run_checks_and_get_vals(export: bool):
         elif not export:
             numpy.random.seed(seed_val)
             act_frac_reg = round(numpy.random.random(), 2)
+        in_degree_cap = int(max_in_degree.get()) if max_in_degree.get() != "" else None
         return True
     return False
 
@@ -371,10 +453,14 @@ def parse_json():
                     frac_reg.delete(0, "end")
                     seed.delete(0, "end")
                     upper_bound.delete(0, "end")
+                    max_in_degree.delete(0, "end")
                     ba_entry.delete(0, "end")
                     ws_entry_1.delete(0, "end")
                     ws_entry_2.delete(0, "end")
                     rand_entry.delete(0, "end")
+                    sbm_entry_1.delete(0, "end")
+                    sbm_entry_2.delete(0, "end")
+                    sbm_entry_3.delete(0, "end")
                     if jsn['number of networks'] != 'rand':
                         num_of_networks.insert(0, jsn['number of networks'])
                     if jsn['vertices'] != 'rand':
@@ -387,6 +473,8 @@ def parse_json():
                         lower_bound.insert(0, jsn['uninterpreted function arity']['lower bound'])
                     if jsn['uninterpreted function arity']['upper bound'] != 'rand':
                         upper_bound.insert(0, jsn['uninterpreted function arity']['upper bound'])
+                    if jsn.get('in-degree', {}).get('cap') is not None:
+                        max_in_degree.insert(0, jsn['in-degree']['cap'])
                     if jsn['generator']['Barabasi-Albert']['use']:
                         ba.invoke()
                         if jsn['generator']['Barabasi-Albert']['connections'] != 'rand':
@@ -401,6 +489,15 @@ def parse_json():
                         rand.invoke()
                         if jsn['generator']['Random Network']['connection probability'] != 'rand':
                             rand_entry.insert(0, jsn['generator']['Random Network']['connection probability'])
+                    if jsn['generator'].get('Stochastic block model', {}).get('use'):
+                        sbm.invoke()
+                        sbm_conf = jsn['generator']['Stochastic block model']
+                        if isinstance(sbm_conf['modules'], int):
+                            sbm_entry_1.insert(0, sbm_conf['modules'])
+                        if len(sbm_conf['probabilities']) == 2 and \
+                                not isinstance(sbm_conf['probabilities'][0], list):  # a matrix can't be shown
+                            sbm_entry_2.insert(0, sbm_conf['probabilities'][0])
+                            sbm_entry_3.insert(0, sbm_conf['probabilities'][1])
 
             except FileNotFoundError:
                 messagebox.showerror('File Error', f"File not found {name}")
@@ -412,54 +509,45 @@ def generate():
     global u_bound, l_bound
     if selected.get() == 1:
         if run_checks_and_get_vals(False):
-            try:
-                # measuring speed
-                # start = timer()
-                generator_of_parametrised_bn.generate_bn(num_of_nodes_, seed=seed_val,
-                                                         num_of_connections=int(ba_entry.get()), ba=True,
-                                                         l_bound=l_bound, u_bound=u_bound,
-                                                         frac_reg=act_frac_reg,
-                                                         loc=loc_file['text'] + '/',
-                                                         n=int(num_of_networks.get()))
-                # end = timer()
-                # print(end - start)
-                messagebox.showinfo('Info', "Network(s) generated successfully!")
-            except Exception:
-                messagebox.showerror('Unknown Error', "Unknown error occurred within the generator. "
-                                                      "See log file. (logging is not implemented yet)")
+            run_in_background(generator_of_parametrised_bn.generate_bn, int(num_of_networks.get()),
+                              num_of_vertices=num_of_nodes_, seed=seed_val,
+                              num_of_connections=int(ba_entry.get()), ba=True,
+                              l_bound=l_bound, u_bound=u_bound,
+                              frac_reg=act_frac_reg, in_degree_cap=in_degree_cap,
+                              loc=loc_file['text'] + '/',
+                              n=int(num_of_networks.get()))
     elif selected.get() == 2:
         if run_checks_and_get_vals(False):
             if check_ws_arg_2():
-                try:
-                    # start = timer()
-                    generator_of_parametrised_bn.generate_bn(num_of_nodes_, seed=seed_val,
-                                                             num_of_connections=int(ws_entry_1.get()), ws=True,
-                                                             l_bound=l_bound, u_bound=u_bound, frac_reg=act_frac_reg,
-                                                             probability=float(ws_entry_2.get()),
-                                                             loc=loc_file['text'] + '/',
-                                                             n=int(num_of_networks.get()))
-                    # end = timer()
-                    # print(end - start)
-                    messagebox.showinfo('Info', "Network(s) generated successfully!")
-                except Exception:
-                    messagebox.showerror('Unknown Error', "Unknown error occurred within the generator. "
-                                                          "See log file. (logging is not implemented yet)")
+                run_in_background(generator_of_parametrised_bn.generate_bn, int(num_of_networks.get()),
+                                  num_of_vertices=num_of_nodes_, seed=seed_val,
+                                  num_of_connections=int(ws_entry_1.get()), ws=True,
+                                  l_bound=l_bound, u_bound=u_bound, frac_reg=act_frac_reg,
+                                  probability=float(ws_entry_2.get()),
+                                  in_degree_cap=in_degree_cap,
+                                  loc=loc_file['text'] + '/',
+                                  n=int(num_of_networks.get()))
     elif selected.get() == 3:
         if run_checks_and_get_vals(False):
             if check_prob_for_rand_model():
-                try:
-                    start = timer()
-                    generator_of_parametrised_bn.generate_bn(num_of_nodes_, seed=seed_val,
-                                                             probability=float(rand_entry.get()), random=True,
-                                                             l_bound=l_bound, u_bound=u_bound, frac_reg=act_frac_reg,
-                                                             loc=loc_file['text'] + '/',
-                                                             n=int(num_of_networks.get()))
-                    end = timer()
-                    print(end - start)
-                    messagebox.showinfo('Info', "Network(s) generated successfully!")
-                except Exception:
-                    messagebox.showerror('Unknown Error', "Unknown error occurred within the generator. "
-                                                          "See log file. (logging is not implemented yet)")
+                run_in_background(generator_of_parametrised_bn.generate_bn, int(num_of_networks.get()),
+                                  num_of_vertices=num_of_nodes_, seed=seed_val,
+                                  probability=float(rand_entry.get()), random=True,
+                                  l_bound=l_bound, u_bound=u_bound, frac_reg=act_frac_reg,
+                                  in_degree_cap=in_degree_cap,
+                                  loc=loc_file['text'] + '/',
+                                  n=int(num_of_networks.get()))
+    elif selected.get() == 5:
+        if run_checks_and_get_vals(False):
+            if check_sbm_args():
+                run_in_background(generator_of_parametrised_bn.generate_bn, int(num_of_networks.get()),
+                                  num_of_vertices=num_of_nodes_, seed=seed_val,
+                                  block_model=(int(sbm_entry_1.get()),
+                                               (float(sbm_entry_2.get()), float(sbm_entry_3.get()))),
+                                  l_bound=l_bound, u_bound=u_bound, frac_reg=act_frac_reg,
+                                  in_degree_cap=in_degree_cap,
+                                  loc=loc_file['text'] + '/',
+                                  n=int(num_of_networks.get()))
     elif selected.get() == 4:
         if check_location():
             if check_seed() and check_frac_and_or():
@@ -471,21 +559,87 @@ def generate():
                     par_seed = int(seed.get())
                 else:
                     par_seed = int(time.time())
-                generator_of_parametrised_bn.modify_network(file['text'], parametrisation_frac=frac_and_or_,
-                                                            seed=par_seed, loc=loc_file['text'] + '/')
+                run_in_background(generator_of_parametrised_bn.modify_network, 1, network=file['text'],
+                                  parametrisation_frac=frac_and_or_, seed=par_seed, loc=loc_file['text'] + '/')
+
+
+def confirm_estimate(kwargs: dict) -> bool:
+    # the batch isn't started if it doesn't fit on the disk, running out of memory is only a warning, since the
+    # estimate of the memory is rougher and the system can swap
+    estimate = generator_of_parametrised_bn.generate_bn(dry_run=True, **kwargs)['estimate']
+    exceeded = generator_of_parametrised_bn.exceeded_resources(estimate, kwargs['loc'])
+    text = generator_of_parametrised_bn.format_estimate(estimate)
+    if 'disk' in exceeded:
+        messagebox.showerror('Disk Space Error', f"{text}\n\nOnly {exceeded['disk'][1] / 2**30:.2f} GB of disk space "
+                                                 f"is free.")
+        return False
+    if 'memory' in exceeded:
+        return messagebox.askyesno('Memory Warning', f"{text}\n\nOnly {exceeded['memory'][1] / 2**20:.0f} MB of "
+                                                     f"memory is available. Generate anyway?", icon='warning')
+    return messagebox.askokcancel('Estimate', f"{text}\n\nGenerate?")
+
+
+# Generation runs in a background thread, so the window doesn't freeze. Tkinter isn't thread-safe, thus the worker
+# only puts messages to the queue and the main loop polls it using after().
+# https://docs.python.org/3/library/queue.html
+def run_in_background(target, total, **kwargs):
+    global worker, start_time
+    if target is generator_of_parametrised_bn.generate_bn and not confirm_estimate(kwargs):
+        return
+    cancel_event.clear()
+    btn['state'] = tk.DISABLED
+    cancel_btn['state'] = tk.NORMAL
+    progress_bar.configure(maximum=total, value=0)
+    progress_label.configure(text=f"0/{total} networks")
+    start_time = timer()
+
+    def work():
+        try:
+            report = target(progress=lambda *args: progress_queue.put(('progress',) + args),
+                            cancel=cancel_event, **kwargs)
+            if report['cancelled']:
+                progress_queue.put(('cancelled',))
+            else:
+                progress_queue.put(('done',))
+        except Exception as e:
+            progress_queue.put(('error', e))
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    window.after(100, poll_progress)
+
+
+def poll_progress():
+    finished = False
+    while not progress_queue.empty():
+        msg = progress_queue.get_nowait()
+        if msg[0] == 'progress':
+            done, total, bytes_written = msg[1], msg[2], msg[4]
+            elapsed = timer() - start_time
+            speed = done / elapsed if elapsed > 0 else 0
+            eta = (total - done) / speed if speed > 0 else 0
+            progress_bar.configure(value=done)
+            progress_label.configure(text=f"{done}/{total} networks, {speed:.2f} networks/s, ETA {eta:.0f} s, "
+                                          f"{bytes_written / 2**20:.1f} MB written")
+        else:
+            finished = True
+            btn['state'] = tk.NORMAL
+            cancel_btn['state'] = tk.DISABLED
+            if msg[0] == 'done':
                 messagebox.showinfo('Info', "Network(s) generated successfully!")
+            elif msg[0] == 'cancelled':
+                messagebox.showinfo('Info', "Generation cancelled.")
+            else:
+                messagebox.showerror('Unknown Error', f"Unknown error occurred within the generator.\n\n{msg[1]}")
+    if not finished:
+        window.after(100, poll_progress)
 
 
-# an attempt to improve generating multiple networks
-# def generate_networks():
-#     if check_networks() and check_seed():
-#         n = int(num_of_networks.get())
-#         numpy.random.seed(int(seed.get()))
-#         network_seeds = list(numpy.random.randint(MAXSIZE, size=n))
-#         for i in range(n):
-#             curr_seed = int(network_seeds[i])
-#             generate(curr_seed)
-#         messagebox.showinfo('Info', "Network(s) generated successfully!")
+def cancel():
+    # generator stops within CALLBACK_INTERVAL written vertices and removes the partially written network
+    cancel_event.set()
+    cancel_btn['state'] = tk.DISABLED
+    progress_label.configure(text=progress_label['text'] + " (cancelling)")
 
 
 def choose_location():
@@ -512,6 +666,7 @@ def ba_btn():
     num_of_vertices_entry['state'] = tk.NORMAL
     seed['state'] = tk.NORMAL
     frac_reg['state'] = tk.NORMAL
+    max_in_degree['state'] = tk.NORMAL
     frac_and_or['state'] = tk.DISABLED
 
 
@@ -522,6 +677,7 @@ def ws_btn():
     num_of_vertices_entry['state'] = tk.NORMAL
     seed['state'] = tk.NORMAL
     frac_reg['state'] = tk.NORMAL
+    max_in_degree['state'] = tk.NORMAL
     frac_and_or['state'] = tk.DISABLED
 
 
@@ -532,6 +688,18 @@ def rand_btn():
     num_of_vertices_entry['state'] = tk.NORMAL
     seed['state'] = tk.NORMAL
     frac_reg['state'] = tk.NORMAL
+    max_in_degree['state'] = tk.NORMAL
+    frac_and_or['state'] = tk.DISABLED
+
+
+def sbm_btn():
+    num_of_networks['state'] = tk.NORMAL
+    lower_bound['state'] = tk.NORMAL
+    upper_bound['state'] = tk.NORMAL
+    num_of_vertices_entry['state'] = tk.NORMAL
+    seed['state'] = tk.NORMAL
+    frac_reg['state'] = tk.NORMAL
+    max_in_degree['state'] = tk.NORMAL
     frac_and_or['state'] = tk.DISABLED
 
 
@@ -542,6 +710,7 @@ def choose_json_btn():
     num_of_vertices_entry['state'] = tk.DISABLED
     seed['state'] = tk.DISABLED
     frac_reg['state'] = tk.DISABLED
+    max_in_degree['state'] = tk.DISABLED
     frac_and_or['state'] = tk.DISABLED
 
 
@@ -552,6 +721,7 @@ def choose_net_btn():
     num_of_vertices_entry['state'] = tk.DISABLED
     seed['state'] = tk.NORMAL
     frac_reg['state'] = tk.DISABLED
+    max_in_degree['state'] = tk.DISABLED
     frac_and_or['state'] = tk.NORMAL
 
 
@@ -621,6 +791,22 @@ file.grid(column=1, row=1, sticky=tk.N)
 group_6.grid(column=0, row=9, sticky=tk.N)
 group_6.columnconfigure(0, weight=1)
 
+sbm = tk.Radiobutton(content, text="Stochastic block model", command=sbm_btn,
+                     var='sbm', value=5, variable=selected)
+
+group_7 = tk.LabelFrame(content, padx=15, pady=10)
+tk.Label(group_7, text="Number of modules:").grid(row=0, sticky=tk.E)
+tk.Label(group_7, text="Probability of a regulation within a module (e.g. 0.1):").grid(row=1, sticky=tk.E)
+tk.Label(group_7, text="Probability of a regulation between modules (e.g. 0.001):").grid(row=2, sticky=tk.E)
+sbm_entry_1 = tk.Entry(group_7)
+sbm_entry_1.grid(column=1, row=0, sticky=tk.W)
+sbm_entry_2 = tk.Entry(group_7)
+sbm_entry_2.grid(column=1, row=1, sticky=tk.W)
+sbm_entry_3 = tk.Entry(group_7)
+sbm_entry_3.grid(column=1, row=2, sticky=tk.W)
+group_7.grid(column=0, row=11, sticky=tk.N)
+group_7.columnconfigure(0, weight=1)
+
 import_json = tk.Button(content, text="Import configuration from JSON", height=2, width=25, command=parse_json)
 
 group_8 = tk.LabelFrame(content, padx=15, pady=10)
@@ -654,6 +840,13 @@ upper_bound.grid(column=1, row=1, sticky=tk.W)
 group_5.grid(column=2, row=5, sticky=tk.N)
 group_5.columnconfigure(0, weight=1)
 
+group_25 = tk.LabelFrame(content, padx=15, pady=10)
+tk.Label(group_25, text="*Maximal in-degree of a vertex (e.g. 4):").grid(row=0, sticky=tk.E)
+max_in_degree = tk.Entry(group_25)
+max_in_degree.grid(column=1, row=0, sticky=tk.W)
+group_25.grid(column=2, row=8, sticky=tk.N)
+group_25.columnconfigure(0, weight=1)
+
 group_24 = tk.LabelFrame(content, padx=15, pady=10)
 tk.Label(group_24, text="*Fraction of ANDs and ORs replaced for parameters (e.g. 0.5):").grid(row=0, sticky=tk.E)
 frac_and_or = tk.Entry(group_24)
@@ -685,6 +878,16 @@ separator = ttk.Separator(content, orient='vertical')
 ex_btn = tk.Button(content, height=2, width=22, text="Export configuration to JSON", command=export)
 btn = tk.Button(content, height=2, width=20, text="Generate Network(s)", command=generate)
 
+group_26 = tk.LabelFrame(content, text="Progress", padx=15, pady=10)
+progress_bar = ttk.Progressbar(group_26, orient='horizontal', length=300, mode='determinate')
+progress_bar.grid(column=0, row=0, sticky=tk.W)
+cancel_btn = tk.Button(group_26, text="Cancel", width=10, command=cancel, state=tk.DISABLED)
+cancel_btn.grid(column=1, row=0, sticky=tk.E)
+progress_label = tk.Label(group_26)
+progress_label.grid(column=0, row=1, columnspan=2, sticky=tk.W)
+group_26.grid(column=2, row=12, sticky=tk.N)
+group_26.columnconfigure(0, weight=1)
+
 
 separator.grid(column=1, row=0, rowspan=15, padx=10, pady=10, sticky=(tk.N, tk.S))
 ba.grid(column=0, row=2, sticky=tk.S)
@@ -694,7 +897,8 @@ ex_btn.grid(column=2, row=11, sticky=tk.W)
 btn.grid(column=2, row=11, sticky=tk.E)
 content.grid(column=0, row=0, sticky=(tk.N, tk.S, tk.E, tk.W))
 choose_file_opt.grid(column=0, row=8, sticky=tk.S)
-import_json.grid(column=0, row=10, sticky=tk.S)
+sbm.grid(column=0, row=10, sticky=tk.S)
+import_json.grid(column=0, row=12, sticky=tk.S)
 
 group_2.columnconfigure(0, weight=1)
 group_2.rowconfigure(0, weight=1)